@@ -14,6 +14,92 @@ class Settings(BaseSettings):
     SENDER_NAME: str
     SMTP_SERVER: str = "smtp.gmail.com"
     SMTP_PORT: int = 587
+    # Authenticated SMTP sessions kept open between emails
+    SMTP_POOL_SIZE: int = 2
+    # Seconds before a pooled session is closed and replaced
+    SMTP_MAX_AGE: float = 300.0
+    # Idle seconds after which a pooled session is checked with NOOP before reuse
+    SMTP_NOOP_AFTER: float = 30.0
+    SMTP_TIMEOUT: float = 30.0
+    # Upgrade SMTP sessions with STARTTLS; false only for local test servers
+    SMTP_STARTTLS: bool = True
+    # Jinja bytecode cache directory; empty uses a directory under the system temp dir
+    TEMPLATE_CACHE_DIR: str = ""
+    # Rendered case detail / cause list fragments kept for reuse across emails
+    FRAGMENT_CACHE_SIZE: int = 128
+    # Default for requests without notify_mode: "always", or "on_change" to skip
+    # emails whose results match the last email for the same search and date
+    NOTIFY_MODE: str = "always"
+    # Seconds the active judges list is reused before it is fetched again
+    JUDGE_CACHE_TTL: float = 3600.0
+    # Seconds the shared HTTP session (and its kept-alive connections) is reused
+    HTTP_SESSION_MAX_AGE: float = 300.0
+    # "record" to save all outgoing HTTP traffic to HTTP_CASSETTE_DIR, "replay" to
+    # answer requests from it instead of the network; empty for neither
+    HTTP_CASSETTE_MODE: str = ""
+    HTTP_CASSETTE_DIR: str = "data/cassette"
+    # Replayed responses wait this multiple of their recorded time; 0 for none
+    HTTP_CASSETTE_LATENCY_SCALE: float = 0.0
+    # Downloaded cause list PDFs and their page text, reused for PDF_CACHE_TTL
+    # seconds; an empty directory uses one under the system temp dir
+    PDF_CACHE_DIR: str = ""
+    PDF_CACHE_TTL: float = 1800.0
+    PDF_CACHE_MAX_MB: int = 256
+    # Dates a Lambda invocation scrapes and searches at once; 1 runs them in turn
+    LAMBDA_MAX_WORKERS: int = 4
+    # Load dependencies, templates, the CA bundle and the judges list while a
+    # Lambda container initialises, instead of during its first invocation
+    LAMBDA_INIT_WARMUP: bool = False
+    # Journal of undelivered emails; set empty to keep the outbox in memory only
+    OUTBOX_DB_PATH: str = "data/outbox.sqlite3"
+    # Seconds a new email waits for others to the same recipients to join it
+    OUTBOX_BATCH_WINDOW: float = 2.0
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_RETRY_BASE_DELAY: float = 30.0
+    OUTBOX_RETRY_MAX_DELAY: float = 600.0
+    # Seconds to wait for queued emails on shutdown (and at the end of a Lambda run)
+    OUTBOX_FLUSH_TIMEOUT: float = 60.0
+    QUEUE_RETRY_BASE_DELAY: float = 30.0
+    QUEUE_RETRY_MAX_DELAY: float = 300.0
+    QUEUE_BATCH_WINDOW: float = 5.0
+    QUEUE_DB_PATH: str = "data/queue.sqlite3"
+    QUEUE_VISIBILITY_TIMEOUT: float = 900.0
+    # What to do with a task still queued after its deadline: "drop" or "downgrade"
+    QUEUE_STALE_TASK_POLICY: str = "drop"
+    # End-to-end time budget for one attempt at a task, in seconds
+    QUEUE_TASK_TIMEOUT: float = 900.0
+    LOG_LEVEL: str = "INFO"
+    # "text" or "json"; empty logs JSON on Lambda and text elsewhere
+    LOG_FORMAT: str = ""
+    # Messages marked as sampled: at most LOG_SAMPLE_BURST per LOG_SAMPLE_WINDOW seconds
+    LOG_SAMPLE_BURST: int = 5
+    LOG_SAMPLE_WINDOW: float = 60.0
+    # Profile every queued task, not only requests with "profile": true
+    PROFILE_TASKS: bool = False
+    # Seconds between stack samples of a profiled task
+    PROFILE_SAMPLE_INTERVAL: float = 0.01
+    # Task profiles kept for GET /search/tasks/{task_id}/profile
+    PROFILE_DIR: str = "data/profiles"
+    PROFILE_MAX_FILES: int = 50
+    # Seconds a scraped cause list stays fresh enough for GET /search/lookup
+    LOOKUP_MAX_AGE: float = 900.0
+    # Poll the court for the next working day's cause lists and prefetch them
+    WATCHER_ENABLED: bool = False
+    # Seconds between polls: the minimum while lists are awaited or appearing,
+    # backing off to the maximum once they stop changing and outside the window
+    WATCHER_MIN_INTERVAL: float = 120.0
+    WATCHER_MAX_INTERVAL: float = 1800.0
+    # Hours (IST, 24h clock) in which the court usually publishes the next day's lists
+    WATCHER_WINDOW_START: int = 15
+    WATCHER_WINDOW_END: int = 23
+    # Most searches accepted by one POST /search/bulk
+    BULK_MAX_SEARCHES: int = 500
+    # Bulk jobs kept for GET /search/bulk/{job_id}
+    BULK_MAX_JOBS: int = 100
+    # Seconds a finished task's progress events stay available to late subscribers
+    PROGRESS_RETENTION: float = 600.0
+    # Seconds between keep-alive comments on an idle event stream
+    PROGRESS_KEEPALIVE: float = 15.0
 
     class Config:
         env_file = ".env"
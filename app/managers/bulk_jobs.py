@@ -0,0 +1,118 @@
+"""
+Bulk Jobs
+
+Searches submitted together through POST /search/bulk. A job only records
+which queue tasks each submitted search became, or why it was rejected; the
+tasks are ordinary search
+tasks, so searches for the same date are batched into one scrape and PDF
+pass by the queue. Their status and results are read from the progress hub.
+
+Jobs are kept in memory, the newest BULK_MAX_JOBS of them; the tasks behind
+a job survive a restart through the queue store, the job itself does not.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.managers.progress import progress_hub
+
+
+@dataclass
+class BulkItem:
+    search_terms: Any
+    dates: List[str]
+    task_ids: List[str]
+    # Validation errors of an item that was not queued
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+@dataclass
+class BulkJob:
+    items: List[BulkItem]
+    job_id: str = field(default_factory=lambda: f"bulk_{uuid.uuid4().hex}")
+    created_at: float = field(default_factory=time.time)
+
+    def status(self) -> Dict[str, Any]:
+        """Each item's status, and its result count per date."""
+        items = []
+        counts: Dict[str, int] = {}
+        for index, item in enumerate(self.items):
+            if item.errors is not None:
+                counts["invalid"] = counts.get("invalid", 0) + 1
+                items.append(
+                    {
+                        "index": index,
+                        "search_terms": item.search_terms,
+                        "status": "invalid",
+                        "errors": item.errors,
+                    }
+                )
+                continue
+            tasks = {}
+            for task_id in item.task_ids:
+                tasks[task_id] = progress_hub.status(task_id) or {
+                    "status": "unknown",
+                    "results": {},
+                }
+            statuses = {task["status"] for task in tasks.values()}
+            # An item is as far along as its least advanced task
+            status = next(
+                (
+                    name
+                    for name in ("queued", "retrying", "running")
+                    if name in statuses
+                ),
+                # done, failed, cancelled or expired; "mixed" when they differ
+                statuses.pop() if len(statuses) == 1 else "mixed",
+            )
+            counts[status] = counts.get(status, 0) + 1
+            results: Dict[str, int] = {}
+            for task in tasks.values():
+                results.update(task["results"])
+            items.append(
+                {
+                    "index": index,
+                    "search_terms": item.search_terms,
+                    "dates": item.dates,
+                    "task_ids": item.task_ids,
+                    "status": status,
+                    "results": results,
+                }
+            )
+        return {
+            "job_id": self.job_id,
+            "created_at": self.created_at,
+            "counts": counts,
+            "items": items,
+        }
+
+
+class BulkJobRegistry:
+    def __init__(self, max_jobs: int) -> None:
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BulkJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, job: BulkJob) -> None:
+        """Keep a job, and have its tasks followed as one event stream."""
+        members: Dict[str, Dict[str, Any]] = {}
+        for index, item in enumerate(job.items):
+            for task_id in item.task_ids:
+                members.setdefault(task_id, {"items": []})["items"].append(index)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        progress_hub.group(job.job_id, members)
+
+    def get(self, job_id: str) -> Optional[BulkJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+bulk_jobs = BulkJobRegistry(settings.BULK_MAX_JOBS)
@@ -0,0 +1,448 @@
+"""
+Email Outbox
+
+Search tasks hand their rendered emails to the outbox and move on; a
+background thread delivers them over SMTP. Failed sends are retried with
+jittered exponential backoff, independently of the search queue, so an SMTP
+outage never causes a cause list to be scraped again. Messages are journaled
+to SQLite (OUTBOX_DB_PATH) so undelivered mail survives a restart.
+
+Messages to the same recipients rendered from the same template that are
+waiting together (within OUTBOX_BATCH_WINDOW of each other, or piled up
+during an SMTP outage) are delivered as one combined email.
+"""
+
+import json
+import os
+import random
+import re
+import smtplib
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.emailer import Emailer
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+BODY_PATTERN = re.compile(r"<body[^>]*>(.*)</body>", re.IGNORECASE | re.DOTALL)
+
+
+@dataclass
+class OutboxMessage:
+    recipients: List[str]
+    subject: str
+    html: str
+    template_name: str
+    message_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    next_attempt_at: float = field(default_factory=time.time)
+
+    @property
+    def group_key(self) -> Tuple[Tuple[str, ...], str]:
+        recipients = tuple(sorted(email.lower() for email in self.recipients))
+        return recipients, self.template_name
+
+
+class OutboxStore:
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                message_id TEXT PRIMARY KEY,
+                recipients TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                html TEXT NOT NULL,
+                template_name TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                next_attempt_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def save(self, message: OutboxMessage) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO outbox VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    message.message_id,
+                    json.dumps(message.recipients),
+                    message.subject,
+                    message.html,
+                    message.template_name,
+                    message.attempts,
+                    message.created_at,
+                    message.next_attempt_at,
+                ),
+            )
+            self._conn.commit()
+
+    def remove(self, message_ids: List[str]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM outbox WHERE message_id = ?",
+                [(message_id,) for message_id in message_ids],
+            )
+            self._conn.commit()
+
+    def load(self) -> List[OutboxMessage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message_id, recipients, subject, html, template_name, "
+                "attempts, created_at, next_attempt_at FROM outbox "
+                "ORDER BY created_at"
+            ).fetchall()
+        return [
+            OutboxMessage(
+                message_id=row[0],
+                recipients=json.loads(row[1]),
+                subject=row[2],
+                html=row[3],
+                template_name=row[4],
+                attempts=row[5],
+                created_at=row[6],
+                next_attempt_at=row[7],
+            )
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Whether retrying a failed send cannot help (e.g. a rejected address)."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def combine_messages(messages: List[OutboxMessage]) -> Tuple[str, str]:
+    """
+    Merge messages to the same recipients into one subject and HTML body.
+
+    The first message's document (and its styles) is kept; the bodies of the
+    others are appended to it, separated by a rule.
+    """
+    first = messages[0]
+    if len(messages) == 1:
+        return first.subject, first.html
+
+    subject = f"{first.subject} (+{len(messages) - 1} more)"
+    extra_bodies = []
+    for message in messages[1:]:
+        match = BODY_PATTERN.search(message.html)
+        extra_bodies.append(match.group(1) if match else message.html)
+    extra = "".join(f"\n<hr>\n{body}" for body in extra_bodies)
+
+    closing = first.html.lower().rfind("</body>")
+    if closing == -1:
+        return subject, first.html + extra
+    return subject, first.html[:closing] + extra + "\n" + first.html[closing:]
+
+
+class Outbox:
+    """Singleton email outbox for the application."""
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Outbox, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            # Messages waiting for delivery, keyed by message id
+            self.messages: Dict[str, OutboxMessage] = {}
+            # Messages taken out of self.messages by the send in progress
+            self.in_flight: List[OutboxMessage] = []
+            self.condition = threading.Condition()
+            self.worker: Optional[threading.Thread] = None
+            self.stopping = False
+            self.flushing = 0
+            self.store: Optional[OutboxStore] = None
+            self.emailer: Optional[Emailer] = None
+            self.sent_count = 0
+            self.combined_count = 0
+            self.failed_count = 0
+            # Called with (message_id, error) once a message is sent or given up on
+            self.listeners: List[Callable[[str, Optional[Exception]], None]] = []
+            self._initialized = True
+
+    def _open_store(self) -> Optional[OutboxStore]:
+        """
+        Open the outbox journal, unless disabled with OUTBOX_DB_PATH='' or
+        running on Lambda, whose filesystem does not outlive the invocation.
+        """
+        if (
+            self.store is None
+            and settings.OUTBOX_DB_PATH
+            and os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is None
+        ):
+            self.store = OutboxStore(settings.OUTBOX_DB_PATH)
+        return self.store
+
+    def start(self) -> None:
+        """Recover undelivered messages and start the delivery thread."""
+        with self.condition:
+            if self.worker and self.worker.is_alive():
+                return
+            if self._open_store() is not None:
+                recovered = [
+                    message
+                    for message in self.store.load()
+                    if message.message_id not in self.messages
+                ]
+                for message in recovered:
+                    self.messages[message.message_id] = message
+                if recovered:
+                    logger.info(
+                        "Outbox: Recovered %s undelivered email(s)", len(recovered)
+                    )
+            self.stopping = False
+            self.worker = threading.Thread(
+                target=self._deliver_loop, name="email-outbox", daemon=True
+            )
+            self.worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the delivery thread after giving queued messages up to timeout
+        seconds to go out. Anything left stays journaled for the next start.
+        """
+        if timeout:
+            self.flush(timeout)
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+            worker = self.worker
+        if worker:
+            worker.join(timeout=settings.SMTP_TIMEOUT)
+        with self.condition:
+            self.worker = None
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+
+    def add_listener(
+        self, listener: Callable[[str, Optional[Exception]], None]
+    ) -> None:
+        """Have listener told when each message is delivered or given up on."""
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def send_email(
+        self,
+        recipients: List[str],
+        subject: str,
+        template_name: str,
+        context: Dict[str, Any],
+    ) -> str:
+        """
+        Render an email now and queue it for delivery.
+
+        Takes the same arguments as Emailer.send_email, so the outbox can be
+        used wherever an emailer is expected. Template errors are raised
+        immediately; delivery errors are retried in the background.
+
+        Returns:
+            The id of the queued message
+        """
+        html = self._get_emailer().render(template_name, context)
+        message = OutboxMessage(
+            recipients=list(recipients),
+            subject=subject,
+            html=html,
+            template_name=template_name,
+            next_attempt_at=time.time() + settings.OUTBOX_BATCH_WINDOW,
+        )
+        with self.condition:
+            self.messages[message.message_id] = message
+            if self._open_store() is not None:
+                self.store.save(message)
+            self.condition.notify_all()
+        self.start()
+        return message.message_id
+
+    def flush(self, timeout: float) -> bool:
+        """
+        Deliver queued messages now, skipping the batch window, and wait up
+        to timeout seconds for the outbox to empty.
+
+        Returns:
+            True if every message was delivered (or permanently failed)
+        """
+        self.start()
+        deadline = time.time() + timeout
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                while self.messages or self.in_flight:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                return not (self.messages or self.in_flight)
+            finally:
+                self.flushing -= 1
+
+    def _get_emailer(self) -> Emailer:
+        if self.emailer is None:
+            self.emailer = Emailer()
+        return self.emailer
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(
+            settings.OUTBOX_RETRY_MAX_DELAY,
+            settings.OUTBOX_RETRY_BASE_DELAY * (2 ** (attempts - 1)),
+        )
+        return random.uniform(delay / 2, delay)
+
+    def _next_batch(self) -> Optional[List[OutboxMessage]]:
+        """
+        Wait for a message to fall due and take it together with every other
+        queued message for the same recipients and template. Called with the
+        condition held; returns None once the outbox is stopping.
+        """
+        while not self.stopping:
+            now = time.time()
+            due = [
+                message
+                for message in self.messages.values()
+                if message.next_attempt_at <= now
+                or (self.flushing and message.attempts == 0)
+            ]
+            if due:
+                first = min(due, key=lambda message: message.created_at)
+                return sorted(
+                    (
+                        message
+                        for message in self.messages.values()
+                        if message.group_key == first.group_key
+                    ),
+                    key=lambda message: message.created_at,
+                )
+            wait = None
+            if self.messages:
+                wait = min(m.next_attempt_at for m in self.messages.values()) - now
+            self.condition.wait(wait)
+        return None
+
+    def _deliver_loop(self) -> None:
+        while True:
+            with self.condition:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                for message in batch:
+                    del self.messages[message.message_id]
+                self.in_flight = batch
+
+            error = self._deliver(batch)
+
+            with self.condition:
+                self.in_flight = []
+                if error is None:
+                    self.sent_count += 1
+                    if len(batch) > 1:
+                        self.combined_count += len(batch) - 1
+                    self._forget(batch)
+                    finished = batch
+                else:
+                    finished = self._handle_failure(batch, error)
+                self.condition.notify_all()
+            self._notify_listeners(finished, error)
+
+    def _notify_listeners(
+        self, messages: List[OutboxMessage], error: Optional[Exception]
+    ) -> None:
+        for message in messages:
+            for listener in self.listeners:
+                try:
+                    listener(message.message_id, error)
+                except Exception as e:
+                    logger.error("Outbox: Error in delivery listener: %s", e)
+
+    def _deliver(self, batch: List[OutboxMessage]) -> Optional[Exception]:
+        subject, html = combine_messages(batch)
+        try:
+            self._get_emailer().send_html(batch[0].recipients, subject, html)
+        except Exception as e:
+            return e
+        if len(batch) > 1:
+            logger.info("Outbox: Sent %s emails as one: %s", len(batch), subject)
+        return None
+
+    def _handle_failure(
+        self, batch: List[OutboxMessage], error: Exception
+    ) -> List[OutboxMessage]:
+        """Schedule retries; returns the messages that were given up on."""
+        retry = []
+        for message in batch:
+            message.attempts += 1
+            if _is_permanent(error) or message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                self.failed_count += 1
+                logger.error(
+                    "Outbox: Giving up on '%s' after %s attempt(s): %s",
+                    message.subject,
+                    message.attempts,
+                    error,
+                )
+            else:
+                retry.append(message)
+        given_up = [message for message in batch if message not in retry]
+        self._forget(given_up)
+
+        for message in retry:
+            delay = self._retry_delay(message.attempts)
+            message.next_attempt_at = time.time() + delay
+            self.messages[message.message_id] = message
+            if self.store is not None:
+                self.store.save(message)
+            logger.warning(
+                "Outbox: Send of '%s' failed (attempt %s/%s), retrying in %.1fs: %s",
+                message.subject,
+                message.attempts,
+                settings.OUTBOX_MAX_ATTEMPTS,
+                delay,
+                error,
+            )
+        return given_up
+
+    def _forget(self, messages: List[OutboxMessage]) -> None:
+        if self.store is not None and messages:
+            self.store.remove([message.message_id for message in messages])
+
+    def get_status(self) -> Dict[str, Any]:
+        with self.condition:
+            return {
+                "pending": len(self.messages) + len(self.in_flight),
+                "worker_running": bool(self.worker and self.worker.is_alive()),
+                "sent_count": self.sent_count,
+                "combined_count": self.combined_count,
+                "failed_count": self.failed_count,
+            }
+
+
+# Create a singleton instance
+outbox = Outbox()
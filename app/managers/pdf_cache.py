@@ -0,0 +1,183 @@
+"""
+PDF Cache
+
+Keeps downloaded cause list PDFs, and the text extracted from each of their
+pages, on local disk (PDF_CACHE_DIR, by default under the system temp dir,
+which is /tmp on Lambda). A cause list searched again within PDF_CACHE_TTL
+seconds, for other terms, another date's batch or the next invocation of a
+warm Lambda container, is then neither downloaded nor parsed again.
+
+Entries are keyed by a hash of the PDF URL and expire by file age. Once the
+cache grows past PDF_CACHE_MAX_MB the oldest files are removed.
+
+The list of cause lists scraped for each date is kept alongside, so
+GET /search/lookup can answer from the cache without scraping.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.log import get_logger
+from app.utils.reuse import reuse_stats
+
+logger = get_logger(__name__)
+
+
+class PDFCache:
+    def __init__(self, directory: str, ttl: float, max_bytes: int) -> None:
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def _path(self, pdf_url: str, suffix: str) -> str:
+        key = hashlib.sha256(pdf_url.encode()).hexdigest()[:32]
+        return os.path.join(self.directory, key + suffix)
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            if time.time() - os.path.getmtime(path) >= self.ttl:
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, path: str, data: bytes) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary name first so readers never see half a file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error("PDF Cache: Error writing %s: %s", path, e)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove expired files, then the oldest ones while over max_bytes."""
+        with self._lock:
+            try:
+                entries = []
+                for name in os.listdir(self.directory):
+                    if name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(self.directory, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                return
+
+            now = time.time()
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if total <= self.max_bytes and now - mtime < self.ttl:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def get_pdf(self, pdf_url: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        content = self._read(self._path(pdf_url, ".pdf"))
+        if content is None:
+            reuse_stats.fresh("pdf_bytes")
+        else:
+            reuse_stats.reused("pdf_bytes")
+        return content
+
+    def put_pdf(self, pdf_url: str, content: bytes) -> None:
+        if self.enabled:
+            self._write(self._path(pdf_url, ".pdf"), content)
+
+    def get_pages(self, pdf_url: str) -> Optional[List[str]]:
+        """Text of each page of a PDF extracted earlier, or None."""
+        if not self.enabled:
+            return None
+        data = self._read(self._path(pdf_url, ".json"))
+        pages = None
+        if data is not None:
+            try:
+                pages = json.loads(data)
+            except ValueError:
+                pages = None
+        if pages is None:
+            reuse_stats.fresh("pdf_text")
+        else:
+            reuse_stats.reused("pdf_text")
+        return pages
+
+    def has_pages(self, pdf_url: str) -> bool:
+        """Whether the text of a PDF is cached and not expired, without reading it."""
+        if not self.enabled:
+            return False
+        try:
+            age = time.time() - os.path.getmtime(self._path(pdf_url, ".json"))
+        except OSError:
+            return False
+        return age < self.ttl
+
+    def put_pages(self, pdf_url: str, pages: List[str]) -> None:
+        if self.enabled:
+            self._write(self._path(pdf_url, ".json"), json.dumps(pages).encode())
+
+    def put_cause_list(self, date: str, pdfs: List[Dict[str, str]]) -> None:
+        """Record the cause lists scraped for a date."""
+        if self.enabled:
+            data = {"fetched_at": time.time(), "pdfs": pdfs}
+            self._write(
+                self._path(f"cause_list:{date}", ".list"), json.dumps(data).encode()
+            )
+
+    def get_cause_list(
+        self, date: str, max_age: float
+    ) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """The cause lists of a date and when they were scraped, if within max_age."""
+        if not self.enabled:
+            return None
+        data = self._read(self._path(f"cause_list:{date}", ".list"))
+        if data is None:
+            return None
+        try:
+            entry = json.loads(data)
+        except ValueError:
+            return None
+        if time.time() - entry["fetched_at"] >= max_age:
+            return None
+        return entry["pdfs"], entry["fetched_at"]
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+pdf_cache = PDFCache(
+    settings.PDF_CACHE_DIR
+    or os.path.join(tempfile.gettempdir(), "cause-list-checker-pdfs"),
+    settings.PDF_CACHE_TTL,
+    settings.PDF_CACHE_MAX_MB * 1024 * 1024,
+)
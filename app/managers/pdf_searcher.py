@@ -1,107 +1,223 @@
+import contextvars
 import random
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from io import BytesIO
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed
+from typing import Any, Callable, Dict, List, Optional
 
-import fitz
 import requests
 
+from app.managers.pdf_cache import pdf_cache
+from app.utils.budget import BudgetExhausted, TaskBudget, TaskCancelled, current_budget
+from app.utils.http_session import get_session, reset_session
+from app.utils.log import SAMPLED, get_logger
+from app.utils.metrics import PDF_BYTES, PDF_PAGES, span
+
+logger = get_logger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 16 * 1024
+
 
 class PDFSearcher:
     def __init__(self, search_terms: List[str]) -> None:
         self.search_terms = search_terms
 
-    def fetch_and_search_pdf(self, pdf: Dict[str, str]) -> Optional[Dict[str, Any]]:
-        # Add a random delay between 0.5 and 1 seconds
-        time.sleep(random.uniform(0.5, 1))
+    def _download(self, response: requests.Response, budget: TaskBudget) -> bytes:
+        """Read a streamed response, stopping as soon as the task is cancelled."""
+        chunks = []
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            budget.check()
+            chunks.append(chunk)
+        return b"".join(chunks)
 
-        pdf_name = pdf["pdf_name"]
-        pdf_url = pdf["pdf_url"]
+    def _fetch(self, pdf_name: str, pdf_url: str, budget: TaskBudget) -> bytes:
+        """
+        Download a PDF, bounded by the task's remaining time.
 
-        try:
-            # Fetch the PDF content with timeout
-            response = requests.get(pdf_url, timeout=(10, 30))
+        Raises:
+            requests.exceptions.RequestException: If the PDF could not be fetched
+        """
+        # Add a random delay between 0.5 and 1 seconds
+        budget.sleep(random.uniform(0.5, 1))
 
-            # Log the headers of the response
+        session = get_session()
+        try:
+            response = session.get(
+                pdf_url, timeout=budget.timeout((10, 30)), stream=True
+            )
+        except requests.exceptions.ConnectionError:
+            reset_session(session)
+            raise
+        try:
             if response.status_code != 200:
-                print(
-                    f"Failed to fetch PDF {pdf_name}: HTTP {response.status_code}",
-                    flush=True,
+                raise requests.exceptions.HTTPError(
+                    f"HTTP {response.status_code}", response=response
                 )
-                return None
-
-            found_pages = {term: [] for term in self.search_terms}
-            num_pages = 0
-            # Read the PDF from memory
-            try:
-                with BytesIO(response.content) as pdf_file:
-                    with fitz.open(stream=pdf_file.read(), filetype="pdf") as document:
-                        num_pages = len(document)
-                        # Search for the terms in each page
-                        for page_num in range(num_pages):
-                            try:
-                                page = document.load_page(page_num)
-                                text = page.get_text()
-                                if text:
-                                    for term in self.search_terms:
-                                        if term.lower() in text.lower():
-                                            found_pages[term].append(
-                                                page_num + 1
-                                            )  # Page numbers are 1-based
-                            except Exception as page_error:
-                                print(
-                                    f"Error reading page {page_num + 1} of PDF {pdf_name}: {page_error}",
-                                    flush=True,
-                                )
-                                continue
-
-                response.close()
-
-                pdf["num_pages"] = num_pages
-
-                if any(found_pages.values()):
-                    return {
-                        "pdf_name": pdf_name,
-                        "pdf_url": pdf_url,
-                        "found_pages": found_pages,
-                        "num_pages": num_pages,
-                    }
-                else:
-                    # Log when no terms found for debugging
-                    print(
-                        f"No search terms found in PDF {pdf_name} (searched {num_pages} pages, terms: {self.search_terms})",
-                        flush=True,
+            return self._download(response, budget)
+        finally:
+            response.close()
+
+    def _extract_pages(
+        self, pdf_name: str, content: bytes, budget: TaskBudget
+    ) -> List[str]:
+        """Extract the text of each page; unreadable pages are left empty."""
+        # PyMuPDF is only loaded once there is a cause list to search
+        import fitz
+
+        pages = []
+        with fitz.open(stream=content, filetype="pdf") as document:
+            for page_num in range(len(document)):
+                budget.check()
+                try:
+                    pages.append(document.load_page(page_num).get_text() or "")
+                except Exception as page_error:
+                    logger.warning(
+                        "Error reading page %s of PDF %s: %s",
+                        page_num + 1,
+                        pdf_name,
+                        page_error,
+                        extra=SAMPLED,
                     )
-                return None
-            except Exception as pdf_error:
-                print(
-                    f"Error parsing PDF {pdf_name}: {pdf_error}",
-                    flush=True,
-                )
-                return None
+                    pages.append("")
+        return pages
+
+    def _get_pages(self, pdf_name: str, pdf_url: str, budget: TaskBudget) -> List[str]:
+        """Page texts of a PDF, from the PDF cache when it was seen recently."""
+        pages = pdf_cache.get_pages(pdf_url)
+        if pages is not None:
+            return pages
+
+        content = pdf_cache.get_pdf(pdf_url)
+        if content is None:
+            with span("pdf_download", pdf=pdf_name) as fields:
+                content = self._fetch(pdf_name, pdf_url, budget)
+                fields["bytes"] = len(content)
+            PDF_BYTES.inc(len(content))
+            pdf_cache.put_pdf(pdf_url, content)
+
+        with span("pdf_parse", pdf=pdf_name, bytes=len(content)) as fields:
+            pages = self._extract_pages(pdf_name, content, budget)
+            fields["pages"] = len(pages)
+        PDF_PAGES.inc(len(pages))
+        pdf_cache.put_pages(pdf_url, pages)
+        return pages
+
+    def fetch_and_search_pdf(self, pdf: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        budget = current_budget()
+
+        pdf_name = pdf["pdf_name"]
+        pdf_url = pdf["pdf_url"]
+
+        try:
+            pages = self._get_pages(pdf_name, pdf_url, budget)
+        except TaskCancelled:
+            raise
+        except requests.exceptions.HTTPError as e:
+            logger.warning("Failed to fetch PDF %s: %s", pdf_name, e)
+            return None
         except requests.exceptions.RequestException as e:
-            print(
-                f"Error fetching PDF {pdf_name} from {pdf_url}: {e}",
-                flush=True,
-            )
+            logger.warning("Error fetching PDF %s from %s: %s", pdf_name, pdf_url, e)
             return None
-        except Exception as e:
-            print(
-                f"Unexpected error processing PDF {pdf_name}: {e}",
-                flush=True,
-            )
+        except Exception as pdf_error:
+            logger.error("Error parsing PDF %s: %s", pdf_name, pdf_error)
             return None
 
-    def search_pdf(self, pdfs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-        results = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_pdf = {
-                executor.submit(self.fetch_and_search_pdf, pdf): pdf for pdf in pdfs
+        num_pages = len(pages)
+        pdf["num_pages"] = num_pages
+
+        found_pages = self.find_terms(pages, self.search_terms)
+        if any(found_pages.values()):
+            return {
+                "pdf_name": pdf_name,
+                "pdf_url": pdf_url,
+                "found_pages": found_pages,
+                "num_pages": num_pages,
             }
-            for future in as_completed(future_to_pdf):
+        # Log when no terms found for debugging
+        logger.debug(
+            "No search terms found in PDF %s (searched %s pages, terms: %s)",
+            pdf_name,
+            num_pages,
+            self.search_terms,
+        )
+        return None
+
+    def search_pdf(
+        self,
+        pdfs: List[Dict[str, str]],
+        on_result: Optional[
+            Callable[[Dict[str, str], Optional[Dict[str, Any]]], None]
+        ] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search PDFs concurrently.
+
+        Args:
+            pdfs: Cause lists to search
+            on_result: Called with each PDF and its result (None without hits)
+                as soon as that PDF has been searched, in completion order
+
+        Returns:
+            Results for the PDFs with hits, in the order of pdfs
+        """
+        budget = current_budget()
+        results_by_index = {}
+        executor = ThreadPoolExecutor(max_workers=10)
+        try:
+            # Each worker runs in a copy of this context so it sees the budget
+            future_to_index = {
+                executor.submit(
+                    contextvars.copy_context().run, self.fetch_and_search_pdf, pdf
+                ): index
+                for index, pdf in enumerate(pdfs)
+            }
+            for future in as_completed(future_to_index, timeout=budget.remaining()):
                 result = future.result()
+                index = future_to_index[future]
                 if result:
-                    results.append(result)
-                del future_to_pdf[future]
-        return results
+                    results_by_index[index] = result
+                if on_result is not None:
+                    on_result(pdfs[index], result)
+        except FuturesTimeoutError:
+            raise BudgetExhausted("Task ran out of time while searching PDFs")
+        finally:
+            # Workers stop at their next budget check once the task is done for
+            executor.shutdown(wait=False, cancel_futures=True)
+        # Same order as the cause lists, whichever download finished first
+        return [results_by_index[index] for index in sorted(results_by_index)]
+
+    @staticmethod
+    def find_terms(pages: List[str], search_terms: List[str]) -> Dict[str, List[int]]:
+        """The 1-based numbers of the pages each term appears on, case-insensitively."""
+        found_pages = {term: [] for term in search_terms}
+        for page_num, text in enumerate(pages):
+            if not text:
+                continue
+            text = text.lower()
+            for term in search_terms:
+                if term.lower() in text:
+                    found_pages[term].append(page_num + 1)
+        return found_pages
+
+    @staticmethod
+    def filter_results(
+        results: List[Dict[str, Any]], search_terms: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Narrow results of a search over several term sets down to one of them.
+
+        Args:
+            results: Results from search_pdf over a superset of search_terms
+            search_terms: The terms to keep
+
+        Returns:
+            Results for PDFs where at least one of search_terms was found
+        """
+        filtered = []
+        for result in results:
+            found_pages = {
+                term: result["found_pages"].get(term, []) for term in search_terms
+            }
+            if any(found_pages.values()):
+                filtered.append({**result, "found_pages": found_pages})
+        return filtered
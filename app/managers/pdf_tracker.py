@@ -7,11 +7,16 @@ Automatically resets when the physical date changes.
 """
 
 import hashlib
-import json
 import os
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Set, Tuple
 
+from app.utils.log import get_logger
+from app.utils.ssm import UNCHANGED, SSMParameter
+
+logger = get_logger(__name__)
+
 IST = timezone(timedelta(hours=5, minutes=30))
 SSM_PARAM_NAME = os.environ.get("SSM_PDF_TRACKER_PARAM", "")
 
@@ -20,65 +25,44 @@ class PDFTracker:
     def __init__(self):
         self._existing_pdfs: Set[str] = set()
         self._current_physical_date: str = ""
+        # Concurrent searches must not interleave the SSM read-modify-write
+        self._lock = threading.Lock()
         self._use_ssm = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
-        self._ssm_client = None
+        self._ssm_param = SSMParameter(SSM_PARAM_NAME, "PDF Tracker", "pdf_tracker_ssm")
 
-    def _get_ssm_client(self):
-        if self._ssm_client is None:
-            import boto3
+    def _load_from_ssm(self) -> None:
+        data = self._ssm_param.read()
+        if data is UNCHANGED:
+            # This container's copy is current; only the day may have changed
+            self._check_and_clear_if_new_physical_day()
+            return
 
-            self._ssm_client = boto3.client("ssm")
-        return self._ssm_client
+        current_date = datetime.now(IST).strftime("%d/%m/%Y")
+        if data is None:
+            self._existing_pdfs = set()
+            self._current_physical_date = current_date
+            return
 
-    def _load_from_ssm(self) -> None:
-        try:
-            client = self._get_ssm_client()
-            response = client.get_parameter(Name=SSM_PARAM_NAME)
-            data = json.loads(response["Parameter"]["Value"])
-            stored_date = data.get("date", "")
-            current_date = datetime.now(IST).strftime("%d/%m/%Y")
-            if stored_date == current_date:
-                self._existing_pdfs = set(data.get("pdfs", []))
-                self._current_physical_date = stored_date
-            else:
-                print(
-                    f"PDF Tracker: SSM date mismatch ({stored_date} -> {current_date}). Starting fresh.",
-                    flush=True,
-                )
-                self._existing_pdfs = set()
-                self._current_physical_date = current_date
-        except Exception as e:
-            if "ParameterNotFound" in str(
-                type(e).__name__
-            ) or "ParameterNotFound" in str(e):
-                print(
-                    "PDF Tracker: No SSM parameter found. Starting fresh.", flush=True
-                )
-            else:
-                print(
-                    f"PDF Tracker: Error reading SSM: {e}. Falling back to empty.",
-                    flush=True,
-                )
+        stored_date = data.get("date", "")
+        if stored_date == current_date:
+            self._existing_pdfs = set(data.get("pdfs", []))
+            self._current_physical_date = stored_date
+        else:
+            logger.info(
+                "PDF Tracker: SSM date mismatch (%s -> %s). Starting fresh.",
+                stored_date,
+                current_date,
+            )
             self._existing_pdfs = set()
-            self._current_physical_date = datetime.now(IST).strftime("%d/%m/%Y")
+            self._current_physical_date = current_date
 
     def _save_to_ssm(self) -> None:
-        try:
-            client = self._get_ssm_client()
-            data = json.dumps(
-                {
-                    "date": self._current_physical_date,
-                    "pdfs": list(self._existing_pdfs),
-                }
-            )
-            client.put_parameter(
-                Name=SSM_PARAM_NAME,
-                Value=data,
-                Type="String",
-                Overwrite=True,
-            )
-        except Exception as e:
-            print(f"PDF Tracker: Error writing SSM: {e}", flush=True)
+        self._ssm_param.write(
+            {
+                "date": self._current_physical_date,
+                "pdfs": list(self._existing_pdfs),
+            }
+        )
 
     def _create_pdf_identifier(
         self, pdf_name: str, pdf_url: str, search_terms: List[str]
@@ -94,9 +78,10 @@ class PDFTracker:
 
         if self._current_physical_date != current_physical_date:
             if self._current_physical_date:
-                print(
-                    f"PDF Tracker: New physical day detected ({self._current_physical_date} -> {current_physical_date}). Clearing memory.",
-                    flush=True,
+                logger.info(
+                    "PDF Tracker: New physical day detected (%s -> %s). Clearing memory.",
+                    self._current_physical_date,
+                    current_physical_date,
                 )
             self._existing_pdfs.clear()
             self._current_physical_date = current_physical_date
@@ -104,33 +89,35 @@ class PDFTracker:
     def separate_existing_and_new_pdfs(
         self, pdfs: List[Dict[str, str]], search_terms: List[str]
     ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
-        if self._use_ssm:
-            self._load_from_ssm()
-        else:
-            self._check_and_clear_if_new_physical_day()
+        with self._lock:
+            if self._use_ssm:
+                self._load_from_ssm()
+            else:
+                self._check_and_clear_if_new_physical_day()
 
-        existing_pdfs = []
-        new_pdfs = []
+            existing_pdfs = []
+            new_pdfs = []
 
-        for pdf in pdfs:
-            identifier = self._create_pdf_identifier(
-                pdf["pdf_name"], pdf["pdf_url"], search_terms
-            )
+            for pdf in pdfs:
+                identifier = self._create_pdf_identifier(
+                    pdf["pdf_name"], pdf["pdf_url"], search_terms
+                )
 
-            if identifier in self._existing_pdfs:
-                existing_pdfs.append(pdf)
-            else:
-                new_pdfs.append(pdf)
-                self._existing_pdfs.add(identifier)
+                if identifier in self._existing_pdfs:
+                    existing_pdfs.append(pdf)
+                else:
+                    new_pdfs.append(pdf)
+                    self._existing_pdfs.add(identifier)
 
-        if self._use_ssm:
-            self._save_to_ssm()
+            if self._use_ssm:
+                self._save_to_ssm()
 
         return existing_pdfs, new_pdfs
 
     def clear_existing_pdfs(self) -> None:
-        self._existing_pdfs.clear()
-        self._current_physical_date = ""
+        with self._lock:
+            self._existing_pdfs.clear()
+            self._current_physical_date = ""
 
 
 pdf_tracker = PDFTracker()
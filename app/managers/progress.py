@@ -0,0 +1,265 @@
+"""
+Search Progress
+
+Stage events of queued tasks, for clients that follow a search as it runs
+(GET /search/tasks/{task_id}/events) instead of waiting for its email: the
+cause lists found, each PDF as soon as it has been searched, the case
+details, the email being queued and then sent.
+
+Events are published from the event loop and from worker threads alike and
+kept per task id, so a client that connects after the search started is sent
+what it missed first. A task's stream ends once the task is over and its
+emails have been delivered or given up on; its events are then kept for
+PROGRESS_RETENTION seconds.
+
+Several tasks can also be followed as a group (a bulk submission): each of
+their events is repeated on the group's stream with the task id and the
+group's labels for it, and the group ends once all of them have.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+
+# Oldest events are dropped beyond this; a late subscriber then misses them
+MAX_EVENTS = 1000
+# Events that change a task's status, and the status they change it to
+STATUS_EVENTS = {"queued": "queued", "started": "running", "retrying": "retrying"}
+
+
+@dataclass
+class TaskProgress:
+    task_id: str
+    events: Deque[Dict[str, Any]] = field(
+        default_factory=lambda: deque(maxlen=MAX_EVENTS)
+    )
+    next_id: int = 1
+    # queued, running, retrying, or the final state
+    status: str = "queued"
+    # Number of results of each date searched
+    results: Dict[str, int] = field(default_factory=dict)
+    # Final queue state, once the task is over
+    state: Optional[str] = None
+    error: Optional[str] = None
+    # Emails queued by the task that the outbox has not delivered yet
+    pending_emails: Set[str] = field(default_factory=set)
+    ended_at: Optional[float] = None
+    subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = field(
+        default_factory=list
+    )
+    # Ids of the groups following this task
+    groups: Set[str] = field(default_factory=set)
+    # For a group: labels of each member task, and the members not ended yet
+    members: Dict[str, Any] = field(default_factory=dict)
+    remaining: Set[str] = field(default_factory=set)
+
+
+class ProgressHub:
+    def __init__(self) -> None:
+        self._tasks: Dict[str, TaskProgress] = {}
+        # Outbox message id -> task id
+        self._emails: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _progress(self, task_id: str) -> TaskProgress:
+        """The task's progress, starting afresh if an earlier run has ended."""
+        progress = self._tasks.get(task_id)
+        if progress is None or progress.ended_at is not None:
+            self._prune()
+            # Event ids keep counting up, so a resumed stream skips nothing new
+            next_id = progress.next_id if progress is not None else 1
+            progress = self._tasks[task_id] = TaskProgress(task_id, next_id=next_id)
+        return progress
+
+    def _prune(self) -> None:
+        cutoff = time.time() - settings.PROGRESS_RETENTION
+        for task_id, progress in list(self._tasks.items()):
+            if progress.ended_at is not None and progress.ended_at < cutoff:
+                del self._tasks[task_id]
+
+    def _append(self, progress: TaskProgress, event: str, data: Dict[str, Any]) -> None:
+        entry = {"id": progress.next_id, "event": event, "data": data}
+        progress.next_id += 1
+        progress.events.append(entry)
+        for subscriber in list(progress.subscribers):
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, entry)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                progress.subscribers.remove(subscriber)
+
+        if event in STATUS_EVENTS:
+            progress.status = STATUS_EVENTS[event]
+        elif event == "end":
+            progress.status = data["state"]
+        elif event == "search_complete":
+            progress.results[data["date"]] = data["results"]
+        for group_id in progress.groups:
+            self._forward(group_id, progress, event, data)
+
+    def _forward(
+        self, group_id: str, progress: TaskProgress, event: str, data: Dict[str, Any]
+    ) -> None:
+        """Repeat a member task's event on its group's stream."""
+        group = self._tasks.get(group_id)
+        if group is None or group.ended_at is not None:
+            return
+        labels = group.members[progress.task_id]
+        # The group's own "end" comes once every member has ended
+        name = "task_end" if event == "end" else event
+        self._append(group, name, {"task_id": progress.task_id, **labels, **data})
+        if event == "end":
+            group.remaining.discard(progress.task_id)
+            self._end_group(group)
+
+    def _end_group(self, group: TaskProgress) -> None:
+        if group.remaining or group.ended_at is not None:
+            return
+        states: Dict[str, int] = {}
+        for task_id in group.members:
+            member = self._tasks.get(task_id)
+            state = member.status if member is not None else "unknown"
+            states[state] = states.get(state, 0) + 1
+        group.status = "done"
+        self._append(group, "end", {"state": "done", "tasks": states})
+        group.ended_at = time.time()
+
+    def _end_if_done(self, progress: TaskProgress) -> None:
+        if (
+            progress.state is not None
+            and not progress.pending_emails
+            and progress.ended_at is None
+        ):
+            data = {"state": progress.state}
+            if progress.error is not None:
+                data["error"] = progress.error
+            self._append(progress, "end", data)
+            progress.ended_at = time.time()
+
+    def publish(self, task_id: Optional[str], event: str, **data: Any) -> None:
+        """Record an event for a task and send it to the task's subscribers."""
+        if task_id is None:
+            return
+        with self._lock:
+            self._append(self._progress(task_id), event, data)
+
+    def finish(self, task_id: str, state: str, error: Optional[str] = None) -> None:
+        """Mark a task as over; its stream ends once its emails are out."""
+        with self._lock:
+            progress = self._progress(task_id)
+            progress.state = state
+            progress.error = error
+            self._end_if_done(progress)
+
+    def email_queued(
+        self, task_id: Optional[str], message_id: str, **data: Any
+    ) -> None:
+        if task_id is None:
+            return
+        with self._lock:
+            progress = self._progress(task_id)
+            progress.pending_emails.add(message_id)
+            self._emails[message_id] = task_id
+            self._append(progress, "email_queued", {"message_id": message_id, **data})
+
+    def email_outcome(self, message_id: str, error: Optional[Exception]) -> None:
+        """Outbox listener: an email was delivered, or given up on."""
+        with self._lock:
+            task_id = self._emails.pop(message_id, None)
+            progress = self._tasks.get(task_id)
+            if progress is None or message_id not in progress.pending_emails:
+                return
+            progress.pending_emails.discard(message_id)
+            if error is None:
+                self._append(progress, "email_sent", {"message_id": message_id})
+            else:
+                self._append(
+                    progress,
+                    "email_failed",
+                    {"message_id": message_id, "error": str(error)},
+                )
+            self._end_if_done(progress)
+
+    def group(self, group_id: str, members: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Follow several tasks as one stream.
+
+        Args:
+            group_id: Id to subscribe to the group by
+            members: Labels of each member task id, added to its forwarded events
+        """
+        with self._lock:
+            self._prune()
+            group = self._tasks[group_id] = TaskProgress(group_id, members=members)
+            for task_id in members:
+                progress = self._tasks.get(task_id)
+                if progress is None:
+                    progress = self._tasks[task_id] = TaskProgress(task_id)
+                progress.groups.add(group_id)
+                if progress.ended_at is None:
+                    group.remaining.add(task_id)
+            self._append(group, "queued", {"tasks": len(members)})
+            self._end_group(group)
+
+    def status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """A task's status and result counts per date, if it is known."""
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            if progress is None:
+                return None
+            return {"status": progress.status, "results": dict(progress.results)}
+
+    def has_task(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._tasks
+
+    async def subscribe(
+        self, task_id: str, after: int = 0
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Events of a task with an id above after, as they happen, up to and
+        including its "end" event. Yields None every PROGRESS_KEEPALIVE
+        seconds without an event.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            if progress is None:
+                progress = self._tasks[task_id] = TaskProgress(task_id)
+            backlog = [entry for entry in progress.events if entry["id"] > after]
+            ended = progress.ended_at is not None
+            progress.subscribers.append(subscriber)
+
+        try:
+            for entry in backlog:
+                yield entry
+                if entry["event"] == "end":
+                    return
+            if ended:
+                # Resumed after the end event
+                return
+            while True:
+                try:
+                    entry = await asyncio.wait_for(
+                        queue.get(), timeout=settings.PROGRESS_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield entry
+                if entry["event"] == "end":
+                    return
+        finally:
+            with self._lock:
+                if subscriber in progress.subscribers:
+                    progress.subscribers.remove(subscriber)
+
+
+progress_hub = ProgressHub()
@@ -1,7 +1,25 @@
 import asyncio
-from dataclasses import dataclass
+import itertools
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config import settings
+from app.managers.progress import progress_hub
+from app.managers.queue_store import QueueStore
+from app.utils.budget import BudgetExhausted, TaskBudget, TaskCancelled, use_budget
+from app.utils.log import get_logger
+from app.utils.profiler import SamplingProfiler, profile_store
+
+logger = get_logger(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
 
 
 @dataclass
@@ -14,6 +32,37 @@ class QueuedTask:
     attempts: int = 0
     max_attempts: int = 3
     task_id: Optional[str] = None
+    # Tasks sharing a batch_key may be run together through batch_method
+    batch_key: Optional[str] = None
+    batch_method: Optional[Callable] = None
+    enqueued_at: float = field(default_factory=time.time)
+    # Lower priorities run first; order_key breaks ties (defaults to enqueued_at)
+    priority: int = PRIORITY_NORMAL
+    order_key: Optional[float] = None
+    # Epoch seconds after which the task is stale (see QUEUE_STALE_TASK_POLICY)
+    deadline: Optional[float] = None
+    # One of: queued, scheduled, running, done, failed, expired, cancelled
+    state: str = "queued"
+    cancel_requested: bool = False
+    # Record a sampling profile of each run (not kept across restarts)
+    profile: bool = False
+    # Bumped on every enqueue and claim; queue entries carry the value they
+    # were made with, so older entries left behind (such as those of batch
+    # members claimed early) are skipped
+    generation: int = 0
+
+    def __post_init__(self):
+        if self.order_key is None:
+            self.order_key = self.enqueued_at
+
+
+@dataclass
+class ScheduledRetry:
+    """A failed task waiting for its backoff delay to elapse."""
+
+    task: QueuedTask
+    due_at: float
+    handle: asyncio.TimerHandle
 
 
 class QueueManager:
@@ -29,26 +78,160 @@ class QueueManager:
 
     def __init__(self):
         if not self._initialized:
-            self.queue = asyncio.Queue()
+            self.queue = asyncio.PriorityQueue()
+            self._sequence = itertools.count()
             self.processor_task = None
             self.lock = asyncio.Lock()
+            self.scheduled_retries: Dict[str, ScheduledRetry] = {}
+            # Tasks waiting in the queue or for a retry, keyed by task id
+            self.pending_tasks: Dict[str, QueuedTask] = {}
+            self.running_tasks: Dict[str, QueuedTask] = {}
+            self.coalesced_count = 0
+            self.batched_count = 0
+            self.expired_count = 0
+            self.cancelled_count = 0
+            # Budget and asyncio task of the run in progress, for cancellation
+            self.running_budget: Optional[TaskBudget] = None
+            self.running_runner: Optional[asyncio.Task] = None
+            self.store: Optional[QueueStore] = None
+            self.keeper_task = None
             self._initialized = True
 
     async def start_processor(self):
         """Start the queue processor if not already running."""
         if self.processor_task is None or self.processor_task.done():
+            if self._open_store() is not None:
+                self._recover()
+                self.keeper_task = asyncio.create_task(self._lease_keeper())
             self.processor_task = asyncio.create_task(self._queue_processor())
-            print("Queue processor started", flush=True)
+            logger.info("Queue processor started")
 
     async def stop_processor(self):
         """Stop the queue processor."""
-        if self.processor_task and not self.processor_task.done():
-            self.processor_task.cancel()
+        for retry in self.scheduled_retries.values():
+            retry.handle.cancel()
+        self.scheduled_retries.clear()
+        self.pending_tasks.clear()
+        # Pending work stays in the store and is recovered on the next start
+        self.queue = asyncio.PriorityQueue()
+
+        for background_task in (self.keeper_task, self.processor_task):
+            if background_task and not background_task.done():
+                background_task.cancel()
+                try:
+                    await background_task
+                except asyncio.CancelledError:
+                    pass
+        if self.processor_task:
+            logger.info("Queue processor stopped")
+
+        # Interrupted tasks are handed out again on restart without waiting
+        # for their lease to expire
+        for task in self.running_tasks.values():
+            task.state = "queued"
+            self._persist(task)
+        self.running_tasks.clear()
+
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _open_store(self) -> Optional[QueueStore]:
+        """Open the durable queue store, unless disabled with QUEUE_DB_PATH=''."""
+        if self.store is None and settings.QUEUE_DB_PATH:
+            self.store = QueueStore(settings.QUEUE_DB_PATH)
+        return self.store
+
+    def _persist(self, task: QueuedTask, available_at: Optional[float] = None) -> None:
+        if self._open_store() is None:
+            return
+        lease_expires_at = None
+        if task.state == "running":
+            lease_expires_at = time.time() + settings.QUEUE_VISIBILITY_TIMEOUT
+        try:
+            self.store.save(
+                task_id=task.task_id,
+                method=task.method,
+                method_args=task.method_args,
+                method_kwargs=task.method_kwargs,
+                batch_key=task.batch_key,
+                batch_method=task.batch_method,
+                attempts=task.attempts,
+                max_attempts=task.max_attempts,
+                priority=task.priority,
+                order_key=task.order_key,
+                deadline=task.deadline,
+                state=task.state,
+                available_at=available_at or task.enqueued_at,
+                lease_expires_at=lease_expires_at,
+            )
+        except (TypeError, ValueError) as e:
+            logger.error("Task %s could not be persisted: %s", task.task_id, e)
+
+    @contextmanager
+    def bulk_writes(self) -> Iterator[None]:
+        """Journal every task queued inside the block in one store transaction."""
+        store = self._open_store()
+        with store.transaction() if store is not None else nullcontext():
+            yield
+
+    def _forget(self, task: QueuedTask) -> None:
+        if self.store is not None:
+            self.store.remove(task.task_id)
+
+    def checkpoint(self, task_id: Optional[str]) -> None:
+        """
+        Persist a task's current arguments.
+
+        Task methods call this after recording progress on their payload, so a
+        task recovered after a restart resumes from the last checkpoint.
+        """
+        task = self.running_tasks.get(task_id) or self.pending_tasks.get(task_id)
+        if task is not None:
+            self._persist(task)
+
+    def _recover(self) -> None:
+        """Re-queue stored tasks that were pending or whose lease expired."""
+        now = time.time()
+        for record in self.store.load_recoverable(now):
+            task_id = record["task_id"]
+            if task_id in self.pending_tasks or task_id in self.running_tasks:
+                continue
+
+            task = QueuedTask(
+                method=record["method"],
+                method_args=record["method_args"],
+                method_kwargs=record["method_kwargs"],
+                attempts=record["attempts"],
+                max_attempts=record["max_attempts"],
+                task_id=task_id,
+                batch_key=record["batch_key"],
+                batch_method=record["batch_method"],
+                priority=record["priority"],
+                order_key=record["order_key"],
+                deadline=record["deadline"],
+            )
+            if record["state"] == "scheduled" and record["available_at"] > now:
+                self._schedule(task, record["available_at"] - now)
+            else:
+                self.pending_tasks[task_id] = task
+                self._enqueue(task)
+                self._persist(task)
+            progress_hub.publish(task_id, "queued", recovered=True)
+            logger.info("Task %s recovered from queue store", task_id)
+
+    async def _lease_keeper(self):
+        """Renew leases of running tasks and pick up tasks whose lease expired."""
+        while True:
+            await asyncio.sleep(settings.QUEUE_VISIBILITY_TIMEOUT / 3)
             try:
-                await self.processor_task
-            except asyncio.CancelledError:
-                pass
-            print("Queue processor stopped", flush=True)
+                self.store.renew_leases(
+                    list(self.running_tasks),
+                    time.time() + settings.QUEUE_VISIBILITY_TIMEOUT,
+                )
+                self._recover()
+            except Exception as e:
+                logger.error("Error in queue lease keeper: %s", e)
 
     async def add_task(
         self,
@@ -56,87 +239,429 @@ class QueueManager:
         *args,
         max_attempts: int = 3,
         task_id: Optional[str] = None,
+        on_duplicate: Optional[Callable[[QueuedTask], None]] = None,
+        batch_key: Optional[str] = None,
+        batch_method: Optional[Callable] = None,
+        priority: int = PRIORITY_NORMAL,
+        order_key: Optional[float] = None,
+        deadline: Optional[float] = None,
+        profile: bool = False,
         **kwargs,
-    ):
-        """Add a task to the queue."""
+    ) -> QueuedTask:
+        """
+        Add a task to the queue.
+
+        If a task with the same task_id is still pending and on_duplicate is
+        given, no new task is queued: on_duplicate is called with the pending
+        task so it can absorb the new request, and the pending task is returned.
+        If it is already running, the new task is queued as a follow-up under
+        the id from follow_up_id.
+
+        Tasks with the same batch_key that are queued within
+        QUEUE_BATCH_WINDOW seconds of each other are run as one batch:
+        batch_method is called once with the list of every member's first
+        positional argument.
+
+        Tasks run in (priority, order_key) order. A task still waiting when its
+        deadline passes is dropped or downgraded to PRIORITY_LOW, depending on
+        QUEUE_STALE_TASK_POLICY.
+
+        With profile set, each run of the task is profiled (see
+        app.utils.profiler).
+        """
+        if task_id is not None:
+            task_id = self.follow_up_id(task_id)
+        if on_duplicate is not None and task_id in self.pending_tasks:
+            existing = self.pending_tasks[task_id]
+            on_duplicate(existing)
+            existing.profile = existing.profile or profile
+            self._persist(existing)
+            self.coalesced_count += 1
+            logger.info("Task %s coalesced into pending task", task_id)
+            return existing
+
         task = QueuedTask(
             method=method,
             method_args=args,
             method_kwargs=kwargs,
             max_attempts=max_attempts,
             task_id=task_id or f"task_{datetime.now().timestamp()}",
+            batch_key=batch_key,
+            batch_method=batch_method,
+            priority=priority,
+            order_key=order_key,
+            deadline=deadline,
+            profile=profile,
+        )
+        self.pending_tasks[task.task_id] = task
+        self._persist(task)
+        self._enqueue(task)
+        progress_hub.publish(
+            task.task_id, "queued", priority=PRIORITY_NAMES.get(priority)
+        )
+        logger.info("Task %s added to queue", task.task_id)
+        return task
+
+    def follow_up_id(self, task_id: str) -> str:
+        """
+        The id to queue a task under: task_id itself, unless a task with that
+        id is running. The running task has its own journal row and retry
+        state, so a request that arrives too late to join it is queued as a
+        follow-up with an id of its own (coalescing with an earlier follow-up).
+        """
+        follow_up_id = task_id
+        sequence = 1
+        while follow_up_id in self.running_tasks:
+            sequence += 1
+            follow_up_id = f"{task_id}~{sequence}"
+        return follow_up_id
+
+    def _enqueue(self, task: QueuedTask) -> None:
+        task.generation += 1
+        # The sequence number keeps equal keys FIFO and never compares tasks
+        self.queue.put_nowait(
+            (task.priority, task.order_key, next(self._sequence), task.generation, task)
+        )
+
+    def _is_stale(self, task: QueuedTask) -> bool:
+        return task.deadline is not None and time.time() > task.deadline
+
+    def _expire(self, task: QueuedTask) -> None:
+        """Drop or downgrade a task whose deadline passed while it waited."""
+        if (
+            settings.QUEUE_STALE_TASK_POLICY == "downgrade"
+            and task.priority != PRIORITY_LOW
+        ):
+            task.priority = PRIORITY_LOW
+            task.deadline = None
+            self._persist(task)
+            self._enqueue(task)
+            logger.info("Task %s passed its deadline, downgraded", task.task_id)
+            return
+
+        task.state = "expired"
+        self.expired_count += 1
+        if self.pending_tasks.get(task.task_id) is task:
+            del self.pending_tasks[task.task_id]
+        self._forget(task)
+        progress_hub.finish(task.task_id, "expired")
+        logger.info("Task %s passed its deadline, dropped", task.task_id)
+
+    def cancel_task(self, task_id: str) -> Optional[str]:
+        """
+        Cancel a task.
+
+        A pending task is removed from the queue. A running task is asked to
+        stop: once every task in its run is cancelled, the run's budget is
+        cancelled, which stops in-flight downloads and parsing at their next
+        check.
+
+        Returns:
+            The state the task was in, or None if no such task is pending or running
+        """
+        task = self.pending_tasks.pop(task_id, None)
+        if task is not None:
+            previous_state = task.state
+            retry = self.scheduled_retries.pop(task_id, None)
+            if retry is not None:
+                retry.handle.cancel()
+            task.state = "cancelled"
+            self.cancelled_count += 1
+            self._forget(task)
+            progress_hub.finish(task_id, "cancelled")
+            logger.info("Task %s cancelled", task_id)
+            return previous_state
+
+        task = self.running_tasks.get(task_id)
+        if task is None:
+            return None
+        task.cancel_requested = True
+        if self.running_budget is not None and all(
+            member.cancel_requested for member in self.running_tasks.values()
+        ):
+            self.running_budget.cancel()
+            self.running_runner.cancel()
+        logger.info("Task %s cancellation requested", task_id)
+        return task.state
+
+    def is_cancelled(self, task_id: Optional[str]) -> bool:
+        """Whether a running task has been asked to stop."""
+        task = self.running_tasks.get(task_id)
+        return task is not None and task.cancel_requested
+
+    def _budget_for(self, members: List[QueuedTask]) -> TaskBudget:
+        """Give a run QUEUE_TASK_TIMEOUT seconds, but no more than its tasks' deadlines."""
+        deadline = time.time() + settings.QUEUE_TASK_TIMEOUT
+        deadlines = [member.deadline for member in members]
+        if None not in deadlines:
+            deadline = min(deadline, max(deadlines))
+        budget = TaskBudget(deadline=deadline)
+        if all(member.cancel_requested for member in members):
+            budget.cancel()
+        return budget
+
+    async def _run(self, members: List[QueuedTask]) -> Optional[Exception]:
+        """Run a task or batch within its time budget and return its error, if any."""
+        budget = self._budget_for(members)
+        with use_budget(budget):
+            # The runner copies this context, so budget is current inside it
+            if len(members) > 1:
+                runner = asyncio.create_task(self._run_batch(members))
+            else:
+                runner = asyncio.create_task(self._run_task(members[0]))
+        self.running_budget = budget
+        self.running_runner = runner
+
+        profiled = [
+            member.task_id
+            for member in members
+            if member.profile or settings.PROFILE_TASKS
+        ]
+        profiler = None
+        if profiled:
+            profiler = SamplingProfiler(settings.PROFILE_SAMPLE_INTERVAL)
+            profiler.start()
+
+        try:
+            await asyncio.wait_for(runner, timeout=budget.remaining())
+        except asyncio.TimeoutError:
+            return BudgetExhausted(
+                f"Task ran out of time ({settings.QUEUE_TASK_TIMEOUT:.0f}s budget)"
+            )
+        except asyncio.CancelledError:
+            if not budget.cancel_requested:
+                raise
+            return TaskCancelled("Task was cancelled")
+        except Exception as e:
+            return e
+        finally:
+            self.running_budget = None
+            self.running_runner = None
+            if profiler is not None:
+                profile_store.save(profiled, profiler.stop())
+        return None
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter: uniform in [delay / 2, delay]."""
+        delay = min(
+            settings.QUEUE_RETRY_MAX_DELAY,
+            settings.QUEUE_RETRY_BASE_DELAY * (2 ** (attempts - 1)),
+        )
+        return random.uniform(delay / 2, delay)
+
+    def _schedule(self, task: QueuedTask, delay: float) -> None:
+        """Put a task back on the queue once delay seconds have elapsed."""
+        handle = asyncio.get_running_loop().call_later(
+            delay, self._release_retry, task.task_id
+        )
+        task.state = "scheduled"
+        due_at = time.time() + delay
+        self.scheduled_retries[task.task_id] = ScheduledRetry(
+            task=task, due_at=due_at, handle=handle
+        )
+        self.pending_tasks[task.task_id] = task
+        self._persist(task, available_at=due_at)
+
+    def _schedule_retry(self, task: QueuedTask) -> float:
+        """Schedule a failed task for another attempt after its backoff delay."""
+        delay = self._retry_delay(task.attempts)
+        self._schedule(task, delay)
+        return delay
+
+    def _release_retry(self, task_id: str) -> None:
+        retry = self.scheduled_retries.pop(task_id, None)
+        if retry is not None:
+            retry.task.state = "queued"
+            retry.task.enqueued_at = time.time()
+            self._persist(retry.task)
+            self._enqueue(retry.task)
+            logger.info("Task %s re-queued for retry", task_id)
+
+    def _claim(self, task: QueuedTask) -> None:
+        """Take a queued task off the pending list so it can be run."""
+        task.state = "running"
+        task.attempts += 1
+        task.generation += 1
+        if self.pending_tasks.get(task.task_id) is task:
+            del self.pending_tasks[task.task_id]
+        self.running_tasks[task.task_id] = task
+        self._persist(task)
+        progress_hub.publish(
+            task.task_id,
+            "started",
+            attempt=task.attempts,
+            max_attempts=task.max_attempts,
         )
-        await self.queue.put(task)
-        print(f"Task {task.task_id} added to queue", flush=True)
+
+    def _batch_candidates(self, task: QueuedTask) -> List[QueuedTask]:
+        return [
+            other
+            for other in self.pending_tasks.values()
+            if other is not task
+            and other.state == "queued"
+            and other.batch_key == task.batch_key
+            and not self._is_stale(other)
+        ]
+
+    async def _collect_batch(self, task: QueuedTask) -> List[QueuedTask]:
+        """
+        Claim every queued task in the batch, first waiting out the batching
+        window if there is anything to batch with. A task with no queued
+        batch mates runs at once rather than holding up the queue.
+        """
+        if not self._batch_candidates(task):
+            return [task]
+        wait = task.enqueued_at + settings.QUEUE_BATCH_WINDOW - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        members = [task]
+        for other in self._batch_candidates(task):
+            self._claim(other)
+            members.append(other)
+        return members
+
+    async def _run_task(self, task: QueuedTask) -> None:
+        if asyncio.iscoroutinefunction(task.method):
+            await task.method(*task.method_args, **task.method_kwargs)
+        else:
+            await asyncio.to_thread(
+                task.method, *task.method_args, **task.method_kwargs
+            )
+
+    async def _run_batch(self, members: List[QueuedTask]) -> None:
+        batch_method = members[0].batch_method
+        payloads = [member.method_args[0] for member in members]
+        if asyncio.iscoroutinefunction(batch_method):
+            await batch_method(payloads)
+        else:
+            await asyncio.to_thread(batch_method, payloads)
+
+    def _finish(self, task: QueuedTask, error: Optional[Exception]) -> None:
+        """Record the outcome of a run, scheduling a retry if attempts remain."""
+        if self.running_tasks.get(task.task_id) is task:
+            del self.running_tasks[task.task_id]
+
+        if error is None:
+            # A cancel that arrived too late to stop the run changes nothing
+            task.state = "done"
+            self._forget(task)
+            progress_hub.finish(task.task_id, "done")
+            logger.info("Task %s completed successfully", task.task_id)
+            return
+
+        # The run stopped (TaskCancelled) or failed after a cancel was asked for
+        if task.cancel_requested:
+            task.state = "cancelled"
+            self.cancelled_count += 1
+            self._forget(task)
+            progress_hub.finish(task.task_id, "cancelled")
+            logger.info("Task %s cancelled", task.task_id)
+            return
+
+        logger.warning("Task %s failed: %s", task.task_id, error)
+        if task.attempts < task.max_attempts:
+            # Reschedule off the worker so other tasks keep flowing
+            wait_time = self._schedule_retry(task)
+            progress_hub.publish(
+                task.task_id, "retrying", error=str(error), delay=round(wait_time, 1)
+            )
+            logger.warning(
+                "Task %s failed, retrying in %.0f seconds...", task.task_id, wait_time
+            )
+        else:
+            task.state = "failed"
+            self._forget(task)
+            progress_hub.finish(task.task_id, "failed", error=str(error))
+            logger.error(
+                "Task %s failed after %s attempts", task.task_id, task.max_attempts
+            )
 
     async def _queue_processor(self):
         """Background task that processes queued tasks one by one."""
         while True:
             try:
                 # Wait for a task to be queued
-                task = await self.queue.get()
-
-                # Wait for the lock to be available
-                while self.lock.locked():
-                    await asyncio.sleep(15)
-
-                # Process the task with retry logic
-                success = False
-                while task.attempts < task.max_attempts and not success:
-                    task.attempts += 1
-
-                    print(
-                        f"Executing task {task.task_id} (attempt {task.attempts}/{task.max_attempts})",
-                        flush=True,
-                    )
-
-                    try:
-                        # Execute the method
-                        if asyncio.iscoroutinefunction(task.method):
-                            await task.method(*task.method_args, **task.method_kwargs)
-                        else:
-                            await asyncio.to_thread(
-                                task.method, *task.method_args, **task.method_kwargs
-                            )
-                        success = True
-                        print(f"Task {task.task_id} completed successfully", flush=True)
-
-                    except Exception as e:
-                        print(f"Task {task.task_id} failed: {e}", flush=True)
-                        success = False
-
-                        if task.attempts < task.max_attempts:
-                            # Wait before retry: 45 seconds for first retry, 15 seconds for subsequent
-                            wait_time = 45 if task.attempts == 1 else 15
-                            print(
-                                f"Task {task.task_id} failed, retrying in {wait_time} seconds...",
-                                flush=True,
-                            )
-                            await asyncio.sleep(wait_time)
-
-                if not success:
-                    print(
-                        f"Task {task.task_id} failed after {task.max_attempts} attempts",
-                        flush=True,
-                    )
+                *_, generation, task = await self.queue.get()
+
+                # Skip entries superseded by a later enqueue or claim, such as
+                # those of tasks already run as part of a batch
+                if task.state != "queued" or generation != task.generation:
+                    self.queue.task_done()
+                    continue
+
+                if self._is_stale(task):
+                    self._expire(task)
+                    self.queue.task_done()
+                    continue
+
+                # Waits on the lock's release instead of polling it
+                async with self.lock:
+                    self._claim(task)
+                    members = [task]
+                    if task.batch_key and task.batch_method:
+                        members = await self._collect_batch(task)
+
+                    for member in members:
+                        logger.info(
+                            "Executing task %s (attempt %s/%s)",
+                            member.task_id,
+                            member.attempts,
+                            member.max_attempts,
+                        )
+
+                    if len(members) > 1:
+                        self.batched_count += len(members) - 1
+                        logger.info(
+                            "Running %s tasks as batch %s", len(members), task.batch_key
+                        )
+                    error = await self._run(members)
+
+                    for member in members:
+                        self._finish(member, error)
 
                 # Mark the task as done
                 self.queue.task_done()
 
             except Exception as e:
-                print(f"Error in queue processor: {e}", flush=True)
+                logger.error("Error in queue processor: %s", e)
                 await asyncio.sleep(5)  # Wait before continuing
 
     def get_queue_status(self) -> Dict[str, Any]:
         """Get the current status of the queue."""
         return {
-            "queue_size": self.queue.qsize(),
+            "queue_size": sum(
+                1 for task in self.pending_tasks.values() if task.state == "queued"
+            ),
             "processor_running": self.processor_task is not None
             and not self.processor_task.done(),
             "processor_done": (
                 self.processor_task.done() if self.processor_task else None
             ),
             "lock_locked": self.lock.locked(),
+            "coalesced_count": self.coalesced_count,
+            "batched_count": self.batched_count,
+            "expired_count": self.expired_count,
+            "cancelled_count": self.cancelled_count,
+            "queue_depth_by_priority": {
+                name: sum(
+                    1
+                    for task in self.pending_tasks.values()
+                    if task.state == "queued" and task.priority == priority
+                )
+                for priority, name in PRIORITY_NAMES.items()
+            },
+            "scheduled_retries": [
+                {
+                    "task_id": task_id,
+                    "attempts": retry.task.attempts,
+                    "max_attempts": retry.task.max_attempts,
+                    "due_at": datetime.fromtimestamp(retry.due_at).isoformat(),
+                }
+                for task_id, retry in sorted(
+                    self.scheduled_retries.items(), key=lambda item: item[1].due_at
+                )
+            ],
         }
 
 
@@ -0,0 +1,251 @@
+"""
+Queue Store
+
+SQLite journal behind the in-memory task queue. Every task is written when it
+is queued and deleted once it finishes, so a restart picks up whatever was
+pending or in flight (at-least-once delivery). A running task holds a lease
+that is renewed while it runs; once a lease expires the task is handed out
+again. Task ids are primary keys, so writing the same task twice is a no-op
+update rather than a duplicate.
+"""
+
+import dataclasses
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    method_args TEXT NOT NULL,
+    method_kwargs TEXT NOT NULL,
+    batch_key TEXT,
+    batch_method TEXT,
+    attempts INTEGER NOT NULL,
+    max_attempts INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    available_at REAL NOT NULL,
+    lease_expires_at REAL,
+    updated_at REAL NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 1,
+    order_key REAL,
+    deadline REAL
+)
+"""
+
+
+def qualified_name(obj: Any) -> str:
+    """Return an importable 'module:qualname' reference for a function or class."""
+    return f"{obj.__module__}:{obj.__qualname__}"
+
+
+def resolve(name: str) -> Any:
+    """Import the object behind a qualified_name reference."""
+    module_name, _, qualname = name.partition(":")
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _encode(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            "__dataclass__": qualified_name(type(value)),
+            "fields": {
+                f.name: _encode(getattr(value, f.name))
+                for f in dataclasses.fields(value)
+            },
+        }
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "__dataclass__" in value:
+            cls = resolve(value["__dataclass__"])
+            return cls(**{k: _decode(v) for k, v in value["fields"].items()})
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+class QueueStore:
+    def __init__(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+        # Open transaction() blocks; writes are committed when the last one ends
+        self._deferred = 0
+
+    def _commit(self) -> None:
+        if not self._deferred:
+            self._conn.commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Commit every write made inside the block at once, at its end."""
+        with self._lock:
+            self._deferred += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._deferred -= 1
+                if not self._deferred:
+                    self._conn.commit()
+
+    def save(
+        self,
+        task_id: str,
+        method: Callable,
+        method_args: tuple,
+        method_kwargs: dict,
+        batch_key: Optional[str],
+        batch_method: Optional[Callable],
+        attempts: int,
+        max_attempts: int,
+        priority: int,
+        order_key: Optional[float],
+        deadline: Optional[float],
+        state: str,
+        available_at: float,
+        lease_expires_at: Optional[float] = None,
+    ) -> None:
+        """
+        Insert or update a task.
+
+        Raises:
+            TypeError: If the task's method or arguments cannot be serialised
+        """
+        row = (
+            task_id,
+            qualified_name(method),
+            json.dumps(_encode(list(method_args))),
+            json.dumps(_encode(method_kwargs)),
+            batch_key,
+            qualified_name(batch_method) if batch_method else None,
+            attempts,
+            max_attempts,
+            state,
+            available_at,
+            lease_expires_at,
+            time.time(),
+            priority,
+            order_key,
+            deadline,
+        )
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO tasks (
+                    task_id, method, method_args, method_kwargs, batch_key,
+                    batch_method, attempts, max_attempts, state, available_at,
+                    lease_expires_at, updated_at, priority, order_key, deadline
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(task_id) DO UPDATE SET
+                    method = excluded.method,
+                    method_args = excluded.method_args,
+                    method_kwargs = excluded.method_kwargs,
+                    batch_key = excluded.batch_key,
+                    batch_method = excluded.batch_method,
+                    attempts = excluded.attempts,
+                    max_attempts = excluded.max_attempts,
+                    state = excluded.state,
+                    available_at = excluded.available_at,
+                    lease_expires_at = excluded.lease_expires_at,
+                    updated_at = excluded.updated_at,
+                    priority = excluded.priority,
+                    order_key = excluded.order_key,
+                    deadline = excluded.deadline
+                """,
+                row,
+            )
+            self._commit()
+
+    def renew_leases(self, task_ids: List[str], lease_expires_at: float) -> None:
+        """Extend the lease of tasks that are still running."""
+        if not task_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE tasks SET lease_expires_at = ?, updated_at = ? WHERE task_id = ?",
+                [(lease_expires_at, time.time(), task_id) for task_id in task_ids],
+            )
+            self._commit()
+
+    def remove(self, task_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+            self._commit()
+
+    def load_recoverable(self, now: float) -> List[Dict[str, Any]]:
+        """
+        Return tasks that should be (re)delivered: everything queued or waiting
+        for a retry, plus running tasks whose lease has expired.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                SELECT task_id, method, method_args, method_kwargs, batch_key,
+                       batch_method, attempts, max_attempts, state, available_at,
+                       priority, order_key, deadline
+                FROM tasks
+                WHERE state IN ('queued', 'scheduled')
+                   OR (state = 'running' AND lease_expires_at < ?)
+                ORDER BY available_at
+                """,
+                (now,),
+            )
+            rows = cursor.fetchall()
+
+        tasks = []
+        for row in rows:
+            try:
+                tasks.append(
+                    {
+                        "task_id": row[0],
+                        "method": resolve(row[1]),
+                        "method_args": tuple(_decode(json.loads(row[2]))),
+                        "method_kwargs": _decode(json.loads(row[3])),
+                        "batch_key": row[4],
+                        "batch_method": resolve(row[5]) if row[5] else None,
+                        "attempts": row[6],
+                        "max_attempts": row[7],
+                        "state": row[8],
+                        "available_at": row[9],
+                        "priority": row[10],
+                        "order_key": row[11],
+                        "deadline": row[12],
+                    }
+                )
+            except Exception as e:
+                logger.warning(
+                    "Queue Store: Skipping unreadable task %s: %s", row[0], e
+                )
+        return tasks
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
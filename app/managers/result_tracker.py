@@ -0,0 +1,131 @@
+"""
+Result Tracker
+
+Remembers a fingerprint of the last results emailed for each (search, date),
+so notify-on-change searches can skip emails when nothing is different from
+the previous run. A fingerprint covers the cause lists published for the
+date, the pages each term was found on, the case status and judge cause list
+details, and the recipients; it is a hash of data the search already has, so
+comparing it needs no rendering.
+
+Uses in-memory storage for Docker (long-lived process) and SSM Parameter
+Store for Lambda (stateless), like the PDF tracker. Entries for dates that
+have passed are dropped.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.utils.ssm import UNCHANGED, SSMParameter
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SSM_PARAM_NAME = os.environ.get("SSM_RESULT_TRACKER_PARAM", "")
+
+NOTIFY_ALWAYS = "always"
+NOTIFY_ON_CHANGE = "on_change"
+NOTIFY_MODES = (NOTIFY_ALWAYS, NOTIFY_ON_CHANGE)
+
+
+def search_key(
+    search_terms: List[str],
+    date: str,
+    case_details: Optional[Dict[str, str]] = None,
+) -> str:
+    """Key a search by date, case-insensitive term set and case details."""
+    terms = sorted({term.strip().lower() for term in search_terms if term.strip()})
+    key = f"{date}_{'_'.join(terms)}"
+    if case_details:
+        key += f"_{case_details['type']}-{case_details['no']}-{case_details['year']}"
+    return key
+
+
+def result_fingerprint(
+    pdfs: List[Dict[str, Any]],
+    results: List[Dict[str, Any]],
+    case_result: Optional[Sequence[Any]],
+    recipient_emails: List[str],
+) -> str:
+    """
+    Hash what a results email would report.
+
+    Whether a PDF counts as new or already seen is left out on purpose: it
+    changes between runs on its own, while the set of published PDFs does not.
+    """
+    payload = {
+        "pdfs": sorted(pdf["pdf_url"] for pdf in pdfs),
+        "hits": sorted(
+            (result["pdf_url"], json.dumps(result["found_pages"], sort_keys=True))
+            for result in results
+        ),
+        "case": list(case_result) if case_result is not None else None,
+        "recipients": sorted(email.lower() for email in recipient_emails),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+class ResultTracker:
+    def __init__(self):
+        # key -> {"fingerprint": ..., "date": DD/MM/YYYY}
+        self._fingerprints: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._use_ssm = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
+        self._ssm_param = SSMParameter(
+            SSM_PARAM_NAME, "Result Tracker", "result_tracker_ssm"
+        )
+
+    def _load_from_ssm(self) -> None:
+        data = self._ssm_param.read()
+        if data is not UNCHANGED:
+            self._fingerprints = data or {}
+
+    def _save_to_ssm(self) -> None:
+        self._ssm_param.write(self._fingerprints)
+
+    def _key(self, search_key: str) -> str:
+        if self._use_ssm:
+            # Keep the SSM parameter small
+            return hashlib.md5(search_key.encode()).hexdigest()[:12]
+        return search_key
+
+    def _drop_past_dates(self) -> None:
+        today = datetime.now(IST).date()
+        for key, entry in list(self._fingerprints.items()):
+            try:
+                date = datetime.strptime(entry["date"], "%d/%m/%Y").date()
+            except (KeyError, ValueError):
+                date = None
+            if date is None or date < today:
+                del self._fingerprints[key]
+
+    def has_changed(self, search_key: str, fingerprint: str) -> bool:
+        """Whether fingerprint differs from the last one recorded for search_key."""
+        with self._lock:
+            if self._use_ssm:
+                self._load_from_ssm()
+            entry = self._fingerprints.get(self._key(search_key))
+            return entry is None or entry["fingerprint"] != fingerprint
+
+    def record(self, search_key: str, date: str, fingerprint: str) -> None:
+        """Remember the fingerprint of results that were just emailed."""
+        with self._lock:
+            if self._use_ssm:
+                self._load_from_ssm()
+            self._fingerprints[self._key(search_key)] = {
+                "fingerprint": fingerprint,
+                "date": date,
+            }
+            self._drop_past_dates()
+            if self._use_ssm:
+                self._save_to_ssm()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fingerprints.clear()
+
+
+result_tracker = ResultTracker()
@@ -1,18 +1,43 @@
 import re
+import threading
 import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 
-import certifi
 import requests
 from bs4 import BeautifulSoup
-from requests.adapters import HTTPAdapter
 from urllib3.exceptions import IncompleteRead
-from urllib3.util.retry import Retry
 
 from app.config import settings
+from app.managers.pdf_cache import pdf_cache
 from app.managers.pdf_tracker import pdf_tracker
+from app.services.emailer.fragments import render_fragment
+from app.utils.budget import current_budget
+from app.utils.http_session import get_session, reset_session
+from app.utils.log import SAMPLED, get_logger
+from app.utils.metrics import HTTP_REQUESTS, HTTP_SECONDS, log_span
+from app.utils.reuse import reuse_stats
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def _format_api_date(date_str: str, fmt: str) -> str:
+    # Cached: a case's judgment and listing rows repeat the same few dates
+    try:
+        # Handle both date-only strings and datetime strings
+        clean = date_str.replace("+05:30", "").split("T")[0]
+        dt = datetime.strptime(clean, "%Y-%m-%d")
+        return dt.strftime(fmt)
+    except ValueError:
+        return date_str
+
+
+# Active judges list shared by every Scraper in the process, with its fetch time
+_active_judges: Dict[str, Any] = {"judges": None, "fetched_at": 0.0}
+_active_judges_lock = threading.Lock()
 
 
 class Scraper:
@@ -24,23 +49,52 @@ class Scraper:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
 
-    def _create_session(self) -> requests.Session:
-        """Create a new session with retry logic and SSL verification"""
-        session = requests.Session()
-        retry = Retry(
-            total=3,
-            backoff_factor=1.0,
-            status_forcelist=[500, 502, 503, 504],
-            allowed_methods=["GET", "POST"],
-            raise_on_status=False,
-        )
-        adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=20)
-        session.mount("https://", adapter)
-        session.verify = certifi.where()
-        return session
+    def _send(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        route: Optional[str] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Send one request, recording its time and outcome for the endpoint."""
+        method = method.upper()
+        endpoint = urlparse(route or url).path or "/"
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            if method == "GET":
+                response = session.get(url, stream=False, **kwargs)
+            elif method == "POST":
+                response = session.post(url, stream=False, **kwargs)
+            else:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+
+            outcome = str(response.status_code)
+            response.raise_for_status()
+            return response
+        except (IncompleteRead, requests.exceptions.ConnectionError):
+            outcome = "connection_error"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_SECONDS.observe(duration, method=method, endpoint=endpoint)
+            HTTP_REQUESTS.inc(method=method, endpoint=endpoint, outcome=outcome)
+            log_span(
+                "http_request",
+                duration,
+                method=method,
+                endpoint=endpoint,
+                outcome=outcome,
+            )
 
     def _make_request(
-        self, method: str, url: str, max_retries: int = 3, **kwargs
+        self,
+        method: str,
+        url: str,
+        max_retries: int = 3,
+        route: Optional[str] = None,
+        **kwargs,
     ) -> Optional[requests.Response]:
         """
         Make an HTTP request with error handling and session management.
@@ -49,43 +103,53 @@ class Scraper:
             method: HTTP method ('GET' or 'POST')
             url: URL to request
             max_retries: Maximum number of retry attempts for connection errors
+            route: URL to label the request's metrics with, when url has
+                case-specific parts (defaults to url)
             **kwargs: Additional arguments for requests
 
         Returns:
             Response object if successful, None if failed
+
+        Raises:
+            TaskCancelled: If the current task is cancelled or out of time
         """
-        if "timeout" not in kwargs:
-            kwargs["timeout"] = (10, 30)
+        timeout = kwargs.pop("timeout", (10, 30))
+        budget = current_budget()
 
         for attempt in range(max_retries):
+            # Every attempt only gets whatever is left of the task's budget
+            kwargs["timeout"] = budget.timeout(timeout)
+            session = get_session()
             try:
-                with self._create_session() as session:
-                    if method.upper() == "GET":
-                        response = session.get(url, stream=False, **kwargs)
-                    elif method.upper() == "POST":
-                        response = session.post(url, stream=False, **kwargs)
-                    else:
-                        raise ValueError(f"Unsupported HTTP method: {method}")
-
-                    response.raise_for_status()
-                    return response
+                return self._send(session, method, url, route, **kwargs)
             except (IncompleteRead, requests.exceptions.ConnectionError) as e:
+                # Retry on fresh connections in case the pooled ones went stale
+                reset_session(session)
                 if attempt < max_retries - 1:
                     wait_time = (attempt + 1) * 2
-                    print(
-                        f"Connection error on attempt {attempt + 1}/{max_retries} for {method} {url}: {e}. Retrying in {wait_time}s...",
-                        flush=True,
+                    logger.warning(
+                        "Connection error on attempt %s/%s for %s %s: %s. Retrying in %ss...",
+                        attempt + 1,
+                        max_retries,
+                        method,
+                        url,
+                        e,
+                        wait_time,
+                        extra=SAMPLED,
                     )
-                    time.sleep(wait_time)
+                    budget.sleep(wait_time)
                     continue
                 else:
-                    print(
-                        f"Error making {method} request to {url} after {max_retries} attempts: {e}",
-                        flush=True,
+                    logger.error(
+                        "Error making %s request to %s after %s attempts: %s",
+                        method,
+                        url,
+                        max_retries,
+                        e,
                     )
                     return None
             except requests.exceptions.RequestException as e:
-                print(f"Error making {method} request to {url}: {e}", flush=True)
+                logger.error("Error making %s request to %s: %s", method, url, e)
                 return None
 
         return None
@@ -108,20 +172,22 @@ class Scraper:
             raise requests.exceptions.RequestException("Failed to submit view CL form")
         return response.text
 
-    def parse_table_and_download_pdfs(
-        self, date: str, search_terms: List[str] = None
-    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    def fetch_cause_list_pdfs(self, date: str) -> List[Dict[str, str]]:
         """
-        Parse the cause list table and separate PDFs into existing and new.
+        Parse the cause list table for a date into a list of PDFs.
 
         Args:
             date: The date for which to parse the cause list
-            search_terms: List of search terms used (optional for backward compatibility)
 
         Returns:
-            Tuple of (existing_pdfs, new_pdfs)
+            List of {"pdf_name", "pdf_url"} dicts
         """
-        page_html = self.submit_view_cl_form(date)
+        pdfs = self.parse_cause_list_pdfs(self.submit_view_cl_form(date))
+        pdf_cache.put_cause_list(date, pdfs)
+        return pdfs
+
+    def parse_cause_list_pdfs(self, page_html: str) -> List[Dict[str, str]]:
+        """Parse the cause list table of a submitted view cause list form."""
         soup = BeautifulSoup(page_html, "html.parser")
 
         rows = soup.select("table#tables11 tr")
@@ -140,6 +206,23 @@ class Scraper:
                     pdf_name = f"{list_type} | {main_sup}"
                     pdfs.append({"pdf_name": pdf_name, "pdf_url": pdf_url})
 
+        return pdfs
+
+    def parse_table_and_download_pdfs(
+        self, date: str, search_terms: List[str] = None
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Parse the cause list table and separate PDFs into existing and new.
+
+        Args:
+            date: The date for which to parse the cause list
+            search_terms: List of search terms used (optional for backward compatibility)
+
+        Returns:
+            Tuple of (existing_pdfs, new_pdfs)
+        """
+        pdfs = self.fetch_cause_list_pdfs(date)
+
         if search_terms is None:
             search_terms = []
         existing_pdfs, new_pdfs = pdf_tracker.separate_existing_and_new_pdfs(
@@ -157,6 +240,7 @@ class Scraper:
         endpoint: str,
         params: Optional[Dict[str, str]] = None,
         timeout: tuple = (10, 30),
+        route: Optional[str] = None,
     ) -> Optional[Any]:
         """
         Make a GET request to the PHHC API and return parsed JSON.
@@ -165,20 +249,26 @@ class Scraper:
             endpoint: API endpoint path (e.g., '/cis_filing/public/getCase')
             params: Query parameters
             timeout: (connect_timeout, read_timeout) tuple
+            route: Endpoint path without its path parameters, for metrics
 
         Returns:
             Parsed JSON (dict or list) if successful, None if failed
         """
         url = f"{self.phhc_api_base_url}{endpoint}"
         response = self._make_request(
-            "GET", url, headers=self.headers, params=params, timeout=timeout
+            "GET",
+            url,
+            route=f"{self.phhc_api_base_url}{route}" if route else None,
+            headers=self.headers,
+            params=params,
+            timeout=timeout,
         )
         if response is None:
             return None
         try:
             return response.json()
         except ValueError as e:
-            print(f"Error parsing JSON from {url}: {e}", flush=True)
+            logger.error("Error parsing JSON from %s: %s", url, e)
             return None
 
     def _fetch_case_info(
@@ -190,8 +280,8 @@ class Scraper:
             params={"case_no": case_no, "case_type": case_type, "case_year": case_year},
         )
         if not data or isinstance(data, list):
-            print(
-                f"No case data found for {case_type}-{case_no}-{case_year}", flush=True
+            logger.warning(
+                "No case data found for %s-%s-%s", case_type, case_no, case_year
             )
             return None
         return data
@@ -212,8 +302,26 @@ class Scraper:
         return data
 
     def _fetch_active_judges(self) -> Optional[List[Dict]]:
-        """Fetch list of active judges from the PHHC API."""
-        return self._api_get("/cis/judges/active-bench")
+        """
+        Fetch list of active judges from the PHHC API.
+
+        The list is kept for JUDGE_CACHE_TTL seconds and shared across
+        scrapers; a failed fetch is not cached.
+        """
+        with _active_judges_lock:
+            judges = _active_judges["judges"]
+            age = time.monotonic() - _active_judges["fetched_at"]
+            if judges is not None and age < settings.JUDGE_CACHE_TTL:
+                reuse_stats.reused("judges")
+                return judges
+
+        reuse_stats.fresh("judges")
+        judges = self._api_get("/cis/judges/active-bench")
+        if judges:
+            with _active_judges_lock:
+                _active_judges["judges"] = judges
+                _active_judges["fetched_at"] = time.monotonic()
+        return judges
 
     def _normalize_judge_name(self, name: str) -> str:
         """Strip HON'BLE prefix, court room suffix, and normalize whitespace."""
@@ -249,7 +357,7 @@ class Scraper:
             if cleaned in judge_name or judge_name in cleaned:
                 return judge.get("judge_code")
 
-        print(f"Could not match judge code for bench '{bench_name}'", flush=True)
+        logger.warning("Could not match judge code for bench '%s'", bench_name)
         return None
 
     def _fetch_regular_cause_list(
@@ -269,7 +377,7 @@ class Scraper:
             dt = datetime.strptime(date, "%d/%m/%Y")
             api_date = dt.strftime("%Y-%m-%d")
         except ValueError:
-            print(f"Invalid date format: {date}", flush=True)
+            logger.warning("Invalid date format: %s", date)
             return None
 
         return self._api_get(
@@ -304,13 +412,7 @@ class Scraper:
         """Convert API datetime string like '2026-01-14T00:00:00' to display format."""
         if not date_str:
             return ""
-        try:
-            # Handle both date-only strings and datetime strings
-            clean = str(date_str).replace("+05:30", "").split("T")[0]
-            dt = datetime.strptime(clean, "%Y-%m-%d")
-            return dt.strftime(fmt)
-        except (ValueError, AttributeError):
-            return str(date_str)
+        return _format_api_date(str(date_str), fmt)
 
     def _fetch_related_cases(
         self, case_type: str, case_no: str, case_year: str
@@ -333,6 +435,7 @@ class Scraper:
         return self._api_get(
             f"/cis_filing/public/judgmentDetails/{case_no}/{case_year}/{case_type}",
             params={"skip": "0", "limit": "1000"},
+            route="/cis_filing/public/judgmentDetails",
         )
 
     def _fetch_copy_petition(
@@ -357,12 +460,6 @@ class Scraper:
         """Build a link to the case status page on the new PHHC site."""
         return f"https://new.phhc.gov.in/case-status/case-no?case_no={case_no}&case_type={case_type}&case_year={case_year}"
 
-    def _case_link(self, case_type: str, case_no: str, case_year) -> str:
-        """Build an <a> tag linking to the case status page."""
-        label = f"{case_type}-{case_no}-{case_year}"
-        url = self._case_status_url(case_type, case_no, case_year)
-        return f'<a href="{url}">{label}</a>'
-
     def _build_case_details_html(
         self,
         case_data: Dict,
@@ -382,15 +479,46 @@ class Scraper:
         4. Copy Petition Details
         5. Judgment Details
         6. Impugned Orders
+
+        Rendered from templates/fragments/case_details.html; the same API
+        payload is only rendered once while it stays in the fragment cache.
         """
-        # Style constants matching the dark navy theme from the site
-        hdr = 'style="background-color: #1a2a4a; color: white; padding: 8px; text-align: center;"'
-        sub_hdr = 'style="background-color: #2a3a5a; color: white; padding: 6px; text-align: center; font-weight: bold;"'
-        lbl = 'style="font-weight: bold; padding: 8px; text-align: left; width: 22%;"'
-        val = 'style="padding: 8px; text-align: left;"'
-        tbl = 'border="0" cellpadding="0" cellspacing="0" style="border-collapse: collapse; width: 100%; max-width: 900px; border: 1px solid #ddd;"'
-        hl = 'style="background-color: #ffff00; padding: 8px; text-align: left;"'
+        return render_fragment(
+            "fragments/case_details.html",
+            {
+                "case_data": case_data,
+                "listing_history": listing_history,
+                "related_cases": related_cases,
+                "judgments": judgments,
+                "copy_petition": copy_petition,
+                "impugned_orders": impugned_orders,
+            },
+            prepare=self._case_details_context,
+        )
 
+    def _api_url(self, path: str) -> str:
+        """Make a document path returned by the API absolute."""
+        if path and not path.startswith("http"):
+            return f"{self.phhc_api_base_url}{path}"
+        return path
+
+    def _case_ref(self, case_type: str, case_no: str, case_year) -> Dict[str, str]:
+        """Label and case status URL for linking to a case."""
+        return {
+            "label": f"{case_type}-{case_no}-{case_year}",
+            "url": self._case_status_url(case_type, case_no, case_year),
+        }
+
+    def _case_details_context(
+        self,
+        case_data: Dict,
+        listing_history: Optional[List[Dict]] = None,
+        related_cases: Optional[List[Dict]] = None,
+        judgments: Optional[List[Dict]] = None,
+        copy_petition: Optional[Dict] = None,
+        impugned_orders: Optional[Dict] = None,
+    ) -> Dict[str, Any]:
+        """Turn raw case API payloads into the case_details.html template context."""
         case_type = case_data.get("case_type", "")
         case_no = case_data.get("case_no", "")
         case_year = case_data.get("case_year", "")
@@ -409,8 +537,6 @@ class Scraper:
         if bench_name:
             status_full += f" by {bench_name}"
 
-        reg_date = self._format_api_date(case_data.get("reg_date"))
-        diary_no = case_data.get("case_diary_no", "")
         category = case_data.get("category", "")
         cat_desc = case_data.get("cat_desc", "")
         category_full = f"{category} {cat_desc}".strip() if category else cat_desc
@@ -437,178 +563,125 @@ class Scraper:
             else ""
         )
         list_type = case_data.get("list_type", "")
-        list_type_full = {"R": "REGULAR", "O": "ORDINARY", "U": "URGENT"}.get(
-            list_type, list_type
-        )
-        final_order_date = self._format_api_date(
-            case_data.get("final_order_date_uploaded_on")
-        )
-
-        # Final order link
-        final_order_url = case_data.get("order", "")
-        if final_order_url and not final_order_url.startswith("http"):
-            final_order_url = f"{self.phhc_api_base_url}{final_order_url}"
 
         # Main case detail as a link
-        main_case_raw = case_data.get("main_case_filling_no", "")
-        main_case_html = ""
-        if main_case_raw:
-            parts = main_case_raw.split(",")
+        main_case = case_data.get("main_case_filling_no", "")
+        if main_case:
+            parts = main_case.split(",")
             if len(parts) == 3:
-                main_case_html = self._case_link(
-                    parts[0].strip(), parts[1].strip(), parts[2].strip()
-                )
-            else:
-                main_case_html = main_case_raw
-
-        next_date = self._format_api_date(case_data.get("listing_or_proposal_date"))
-
-        # --- Links at the top ---
-        html = "<center>\n"
-        if final_order_url and final_order_date:
-            html += f'<p><a href="{final_order_url}" style="color: #0066cc; font-weight: bold;">View Judgement Final Order (Dated {final_order_date})</a></p>\n'
-
-        # --- Section 1: Case Details ---
-        html += f"""<table {tbl}>
-  <tr><td colspan="4" {hdr}>Case Details For Case {case_type}-{case_no}-{case_year}</td></tr>
-  <tr><td {lbl}>Diary Number</td><td {val}>{diary_no}</td><td {lbl}>Registration Date</td><td {val}>{reg_date}</td></tr>
-  <tr><td {lbl}>Category</td><td colspan="3" {val}>{category_full}</td></tr>
-  <tr><td {lbl}>Party Detail</td><td colspan="3" {val}>{party_detail}</td></tr>
-  <tr><td {lbl}>Advocate Name</td><td {val}>{pet_adv}</td><td {lbl}>District</td><td {val}>{district}</td></tr>
-  <tr><td {lbl}>Respondent Advocate Name</td><td {val}>{res_adv}</td><td {lbl}>List Type</td><td {val}>{list_type_full}</td></tr>
-  <tr><td {lbl} {hl}>Status</td><td colspan="3" {hl}>{status_full}</td></tr>
-  <tr><td {lbl}>Final Order Uploaded On</td><td colspan="3" {val}>{final_order_date}</td></tr>
-  <tr><td {lbl}>Main Case Detail</td><td {val}>{main_case_html}</td><td colspan="2"></td></tr>
-  <tr><td {lbl} {hl}>Next Date</td><td colspan="3" {hl}>{next_date}</td></tr>
-</table>
-"""
-
-        # --- Section 2: Related Cases/Miscellaneous Applications ---
-        if related_cases:
-            html += f"""<br/>
-<table {tbl}>
-  <tr><td colspan="2" {hdr}>Related Cases/Miscellaneous Applications</td></tr>
-"""
-            for rc in related_cases:
-                doc = rc.get("case_documents", {}) if isinstance(rc, dict) else {}
-                rc_type = doc.get("case_type", "")
-                rc_no = doc.get("case_no", "")
-                rc_year = doc.get("case_year", "")
-                rc_link = self._case_link(rc_type, rc_no, rc_year) if rc_type else ""
-
-                order_details = rc.get("order_details", [])
-                order_link_html = ""
-                if order_details:
-                    for od in order_details:
-                        od_url = od.get("order", "")
-                        if od_url and not od_url.startswith("http"):
-                            od_url = f"{self.phhc_api_base_url}{od_url}"
-                        od_date = self._format_api_date(od.get("orderdate"))
-                        if od_url:
-                            date_label = f" Dated {od_date}" if od_date else ""
-                            order_link_html += (
-                                f' &nbsp;<a href="{od_url}">View Order{date_label}</a>'
-                            )
-
-                rc_main = f"IN {case_type}-{case_no}-{case_year}"
-                html += f"  <tr><td {val}>{rc_link}{order_link_html}</td><td {val}>{rc_main}</td></tr>\n"
-            html += "</table>\n"
-
-        # --- Section 3: Case Listing Details ---
-        if listing_history:
-            html += f"""<br/>
-<table {tbl}>
-  <tr><td colspan="3" {hdr}>Case Listing Details</td></tr>
-  <tr><td {sub_hdr}>Cause List Date</td><td {sub_hdr}>List Type-Sr. No.</td><td {sub_hdr}>Bench</td></tr>
-"""
-            for i, entry in enumerate(listing_history):
-                cl_date = self._format_api_date(entry.get("cl_date"))
-                cl_type = entry.get("cl_type", "")
-                sr_no = entry.get("sr_no", "")
-                type_sr = f"{cl_type}:{sr_no}"
-                bench = (
+                main_case = self._case_ref(*(part.strip() for part in parts))
+
+        related = []
+        for rc in related_cases or []:
+            doc = rc.get("case_documents", {}) if isinstance(rc, dict) else {}
+            rc_type = doc.get("case_type", "")
+            orders = []
+            for od in rc.get("order_details", []) or []:
+                od_url = self._api_url(od.get("order", ""))
+                if od_url:
+                    orders.append(
+                        {
+                            "url": od_url,
+                            "date": self._format_api_date(od.get("orderdate")),
+                        }
+                    )
+            related.append(
+                {
+                    "case": (
+                        self._case_ref(
+                            rc_type, doc.get("case_no", ""), doc.get("case_year", "")
+                        )
+                        if rc_type
+                        else None
+                    ),
+                    "orders": orders,
+                }
+            )
+
+        listings = [
+            {
+                "cl_date": self._format_api_date(entry.get("cl_date")),
+                "cl_type": entry.get("cl_type", ""),
+                "sr_no": entry.get("sr_no", ""),
+                "bench": (
                     entry.get("benchDetails", {}).get("bench_name", "")
                     if isinstance(entry.get("benchDetails"), dict)
                     else ""
-                )
-                row_style = hl if i == 0 else val
-                html += f"  <tr><td {row_style}>{cl_date}</td><td {row_style}>{type_sr}</td><td {row_style}>{bench}</td></tr>\n"
-            html += "</table>\n"
-
-        # --- Section 4: Copy Petition Details ---
-        if copy_petition:
-            items = (
-                copy_petition.get("items", [])
-                if isinstance(copy_petition, dict)
-                else []
-            )
-            if items:
-                html += f"""<br/>
-<table {tbl}>
-  <tr><td colspan="4" {hdr}>Details of Copy Petition Applied in {case_type}-{case_no}-{case_year}</td></tr>
-  <tr><td {sub_hdr}>Petition Type/No</td><td {sub_hdr}>Petition Date</td><td {sub_hdr}>Applied By</td><td {sub_hdr}>Petition Status</td></tr>
-"""
-                for item in items:
-                    pet_code = item.get("pet_code", "")
-                    petrf_no = item.get("petrf_no", "")
-                    pet_label = f"{pet_code}:{petrf_no}" if pet_code else str(petrf_no)
-                    pet_type_no = f'<a href="https://new.phhc.gov.in/copy_petition_search_page?app_no={petrf_no}">{pet_label}</a>'
-                    pet_date = item.get("pet_date", "")
-                    pet_type = item.get("pet_type", "")
-                    applname = item.get("applname", "")
-                    applied_by = (
-                        f"<strong>{pet_type}</strong><br/>{applname}"
-                        if pet_type
-                        else applname
-                    )
-                    pet_status = item.get("pet_status", "")
-                    html += f"  <tr><td {val}>{pet_type_no}</td><td {val}>{pet_date}</td><td {val}>{applied_by}</td><td {val}>{pet_status}</td></tr>\n"
-                html += "</table>\n"
-
-        # --- Section 5: Judgment Details ---
-        if judgments:
-            html += f"""<br/>
-<table {tbl}>
-  <tr><td colspan="4" {hdr}>Judgment Details For Case: {case_type}-{case_no}-{case_year}</td></tr>
-  <tr><td {sub_hdr}>Order Date</td><td {sub_hdr}>Order and Case ID</td><td {sub_hdr}>Bench</td><td {sub_hdr}>Judgment Link</td></tr>
-"""
-            for j in judgments:
-                order_date = self._format_api_date(j.get("orderdate"))
-                order_type_code = j.get("order_type", "")
-                order_type = {"I": "Interim Order", "F": "Final Order"}.get(
-                    order_type_code, order_type_code
-                )
-                j_bench = j.get("bench_name", "")
-                order_url = j.get("order", "")
-                if order_url and not order_url.startswith("http"):
-                    order_url = f"{self.phhc_api_base_url}{order_url}"
-                link_html = f'<a href="{order_url}">View Order</a>' if order_url else ""
-                html += f"  <tr><td {val}>{order_date}</td><td {val}>{order_type}</td><td {val}>{j_bench}</td><td {val}>{link_html}</td></tr>\n"
-            html += "</table>\n"
-
-        # --- Section 6: Impugned Orders ---
-        if (
-            impugned_orders
-            and isinstance(impugned_orders, dict)
-            and impugned_orders.get("authority")
-        ):
-            imp_date = self._format_api_date(impugned_orders.get("order_date"))
-            if not imp_date or imp_date == "":
-                imp_date = "Invalid date"
-            imp_type_code = impugned_orders.get("order_type", "")
-            imp_type = {"I": "Interim", "F": "Final"}.get(imp_type_code, imp_type_code)
-            imp_authority = impugned_orders.get("authority", "")
-            imp_district = impugned_orders.get("district", "")
-            html += f"""<br/>
-<table {tbl}>
-  <tr><td colspan="4" {hdr}>Impugned Orders</td></tr>
-  <tr><td {sub_hdr}>Order Date</td><td {sub_hdr}>Order Type</td><td {sub_hdr}>Authority</td><td {sub_hdr}>District</td></tr>
-  <tr><td {val}>{imp_date}</td><td {val}>{imp_type}</td><td {val}>{imp_authority}</td><td {val}>{imp_district}</td></tr>
-</table>
-"""
-
-        html += "</center>"
-        return html
+                ),
+            }
+            for entry in listing_history or []
+        ]
+
+        items = (
+            copy_petition.get("items", []) if isinstance(copy_petition, dict) else []
+        )
+        copy_petitions = [
+            {
+                "label": (
+                    f"{item.get('pet_code', '')}:{item.get('petrf_no', '')}"
+                    if item.get("pet_code")
+                    else str(item.get("petrf_no", ""))
+                ),
+                "petrf_no": item.get("petrf_no", ""),
+                "pet_date": item.get("pet_date", ""),
+                "pet_type": item.get("pet_type", ""),
+                "applname": item.get("applname", ""),
+                "pet_status": item.get("pet_status", ""),
+            }
+            for item in items
+        ]
+
+        order_types = {"I": "Interim Order", "F": "Final Order"}
+        judgment_rows = [
+            {
+                "order_date": self._format_api_date(j.get("orderdate")),
+                "order_type": order_types.get(
+                    j.get("order_type", ""), j.get("order_type", "")
+                ),
+                "bench": j.get("bench_name", ""),
+                "url": self._api_url(j.get("order", "")),
+            }
+            for j in judgments or []
+        ]
+
+        impugned_order = None
+        if isinstance(impugned_orders, dict) and impugned_orders.get("authority"):
+            imp_type = impugned_orders.get("order_type", "")
+            impugned_order = {
+                "order_date": self._format_api_date(impugned_orders.get("order_date"))
+                or "Invalid date",
+                "order_type": {"I": "Interim", "F": "Final"}.get(imp_type, imp_type),
+                "authority": impugned_orders.get("authority", ""),
+                "district": impugned_orders.get("district", ""),
+            }
+
+        return {
+            "case_label": f"{case_type}-{case_no}-{case_year}",
+            "final_order_url": self._api_url(case_data.get("order", "")),
+            "final_order_date": self._format_api_date(
+                case_data.get("final_order_date_uploaded_on")
+            ),
+            "diary_no": case_data.get("case_diary_no", ""),
+            "reg_date": self._format_api_date(case_data.get("reg_date")),
+            "category_full": category_full,
+            "party_detail": party_detail,
+            "pet_adv": pet_adv,
+            "res_adv": res_adv,
+            "district": district,
+            "list_type_full": {"R": "REGULAR", "O": "ORDINARY", "U": "URGENT"}.get(
+                list_type, list_type
+            ),
+            "status_full": status_full,
+            "main_case": main_case,
+            "next_date": self._format_api_date(
+                case_data.get("listing_or_proposal_date")
+            ),
+            "related_cases": related,
+            "listing_history": listings,
+            "copy_petitions": copy_petitions,
+            "judgments": judgment_rows,
+            "impugned_order": impugned_order,
+        }
 
     def _build_judge_cause_list_html(
         self, matching_entries: List[Dict], judge_name: str, date: str
@@ -627,25 +700,10 @@ class Scraper:
         if not matching_entries:
             return None
 
-        html = f"""<center>
-<table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; width: 100%; max-width: 700px;" class="case-listing-details">
-  <tr><td colspan="7" style="text-align:center; font-weight:bold; background-color: #f2f2f2;">
-    CAUSE LIST FOR {judge_name} ON {date}
-  </td></tr>
-  <tr><th>Sr No</th><th>Case</th><th>Petitioner</th><th>Respondent</th><th>Pet. Advocate</th><th>Res. Advocate</th><th>Hearing</th></tr>
-"""
-        for entry in matching_entries:
-            sr_no = entry.get("sr_no", "")
-            case = f"{entry.get('case_type', '')}-{entry.get('case_no', '')}-{entry.get('case_year', '')}"
-            pet = entry.get("pet_name", "") or ""
-            res = entry.get("res_name", "") or ""
-            pet_adv = entry.get("pet_adv_name", "") or ""
-            res_adv = entry.get("res_adv_name", "") or ""
-            hearing = "Yes" if entry.get("hearing_status") == "Y" else "No"
-            html += f"  <tr><td>{sr_no}</td><td>{case}</td><td>{pet}</td><td>{res}</td><td>{pet_adv}</td><td>{res_adv}</td><td>{hearing}</td></tr>\n"
-
-        html += "</table></center>"
-        return html
+        return render_fragment(
+            "fragments/judge_cause_list.html",
+            {"entries": matching_entries, "judge_name": judge_name, "date": date},
+        )
 
     def _build_listing_found_html(
         self, listing_entry: Dict, judge_name: str, date: str
@@ -662,42 +720,37 @@ class Scraper:
         Returns:
             HTML string confirming the listing
         """
-        cl_type = listing_entry.get("cl_type", "REGULAR")
-        sr_no = listing_entry.get("sr_no", "N/A")
         bench = (
             listing_entry.get("benchDetails", {}).get("bench_name", judge_name)
             if isinstance(listing_entry.get("benchDetails"), dict)
             else judge_name
         )
+        return render_fragment(
+            "fragments/listing_found.html",
+            {
+                "cl_type": listing_entry.get("cl_type", "REGULAR"),
+                "sr_no": listing_entry.get("sr_no", "N/A"),
+                "bench": bench,
+                "date": date,
+            },
+        )
 
-        return f"""<center>
-<table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; width: 100%; max-width: 700px;" class="case-listing-details">
-  <tr><td colspan="4" style="text-align:center; font-weight:bold; background-color: #f2f2f2;">
-    {cl_type} CAUSE LIST — {bench} — {date}
-  </td></tr>
-  <tr><th>Date</th><th>List Type</th><th>Sr No</th><th>Bench</th></tr>
-  <tr style="background-color: #ffff00;">
-    <td>{date}</td><td>{cl_type}</td><td>{sr_no}</td><td>{bench}</td>
-  </tr>
-</table></center>"""
-
-    def get_case_details_and_judge_details(
-        self,
-        case_details: Optional[Dict[str, str]] = None,
-        search_terms: List[str] = None,
-        date: str = None,
-    ) -> Optional[Tuple[str, str, str]]:
+    def fetch_case_bundle(
+        self, case_details: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
         """
-        Get case details and judge-wise cause list info via the PHHC API.
+        Fetch everything about a case that does not depend on the cause list date.
+
+        The result can be reused for several dates with get_judge_details_for_date,
+        so a multi-date search fetches the case only once.
 
         Args:
             case_details: Dict with keys "type", "no", "year"
-            search_terms: List of search terms to look for in the cause list
-            date: Cause list date in DD/MM/YYYY format
 
         Returns:
-            Tuple of (case_details_html, cause_list_table_html, case_status_url)
-            if successful, None if case_details not provided or case not found.
+            Dict with case_details_html, case_status_url, bench_name, judge_code
+            and listing_history, or None if case_details not provided or case
+            not found.
         """
         if not case_details:
             return None
@@ -709,16 +762,12 @@ class Scraper:
         # Step 1: Fetch case info (required)
         case_data = self._fetch_case_info(case_type, case_no, case_year)
         if not case_data:
-            print(
-                f"Failed to fetch case info for {case_type}-{case_no}-{case_year}",
-                flush=True,
+            logger.error(
+                "Failed to fetch case info for %s-%s-%s", case_type, case_no, case_year
             )
             return None
 
-        print(
-            f"PROGRESS! Case info fetched for {case_type}-{case_no}-{case_year}",
-            flush=True,
-        )
+        logger.info("Case info fetched for %s-%s-%s", case_type, case_no, case_year)
 
         # Step 2: Fetch all supplementary data (all optional, failures don't block)
         listing_history = self._fetch_case_listing_history(
@@ -739,9 +788,46 @@ class Scraper:
             impugned_orders=impugned_orders,
         )
 
-        # Step 4: Check if case is listed for the target date
-        combined_table_html = None
+        # Step 4: Match the case's bench to a judge code for the regular cause list
         bench_name = case_data.get("bench_name", "")
+        judge_code = None
+        if bench_name:
+            active_judges = self._fetch_active_judges()
+            if active_judges:
+                judge_code = self._match_judge_code(bench_name, active_judges)
+                if judge_code:
+                    logger.info("Matched judge '%s' to code %s", bench_name, judge_code)
+
+        return {
+            "case_label": f"{case_type}-{case_no}-{case_year}",
+            "case_details_html": case_details_html,
+            "case_status_url": self._case_status_url(case_type, case_no, case_year),
+            "bench_name": bench_name,
+            "judge_code": judge_code,
+            "listing_history": listing_history,
+        }
+
+    def get_judge_details_for_date(
+        self,
+        case_bundle: Dict[str, Any],
+        search_terms: List[str] = None,
+        date: str = None,
+    ) -> Optional[str]:
+        """
+        Look for a case in the judge-wise regular cause list for one date.
+
+        Args:
+            case_bundle: Result of fetch_case_bundle
+            search_terms: List of search terms to look for in the cause list
+            date: Cause list date in DD/MM/YYYY format
+
+        Returns:
+            HTML table of matching cause list entries (or of the listing history
+            entry when the full cause list is unavailable), None if not listed.
+        """
+        combined_table_html = None
+        bench_name = case_bundle["bench_name"]
+        listing_history = case_bundle["listing_history"]
         matching_listing = None
 
         if listing_history and date:
@@ -759,37 +845,67 @@ class Scraper:
                         break
 
             if matching_listing:
-                print(
-                    f"PROGRESS! Case {case_type}-{case_no}-{case_year} found in listing for {date}",
-                    flush=True,
+                logger.info(
+                    "Case %s found in listing for %s", case_bundle["case_label"], date
                 )
 
-        # Step 5: Try to get judge-wise regular cause list
-        if bench_name and search_terms and date:
-            active_judges = self._fetch_active_judges()
-            if active_judges:
-                judge_code = self._match_judge_code(bench_name, active_judges)
-                if judge_code:
-                    print(
-                        f"PROGRESS! Matched judge '{bench_name}' to code {judge_code}",
-                        flush=True,
-                    )
-                    cause_list = self._fetch_regular_cause_list(judge_code, date)
-                    if cause_list:
-                        matching = self._search_cause_list_entries(
-                            cause_list, search_terms
-                        )
-                        combined_table_html = self._build_judge_cause_list_html(
-                            matching, bench_name, date
-                        )
-                    elif matching_listing:
-                        print(
-                            f"PROGRESS! Full cause list unavailable, using listing history as fallback",
-                            flush=True,
-                        )
-                        combined_table_html = self._build_listing_found_html(
-                            matching_listing, bench_name, date
-                        )
+        # Try to get judge-wise regular cause list
+        judge_code = case_bundle["judge_code"]
+        if judge_code and search_terms and date:
+            cause_list = self._fetch_regular_cause_list(judge_code, date)
+            if cause_list:
+                matching = self._search_cause_list_entries(cause_list, search_terms)
+                combined_table_html = self._build_judge_cause_list_html(
+                    matching, bench_name, date
+                )
+            elif matching_listing:
+                logger.info(
+                    "Full cause list unavailable, using listing history as fallback"
+                )
+                combined_table_html = self._build_listing_found_html(
+                    matching_listing, bench_name, date
+                )
+
+        return combined_table_html
+
+    def get_case_details_and_judge_details(
+        self,
+        case_details: Optional[Dict[str, str]] = None,
+        search_terms: List[str] = None,
+        date: str = None,
+    ) -> Optional[Tuple[str, str, str]]:
+        """
+        Get case details and judge-wise cause list info via the PHHC API.
 
-        case_status_url = self._case_status_url(case_type, case_no, case_year)
-        return case_details_html, combined_table_html, case_status_url
+        Args:
+            case_details: Dict with keys "type", "no", "year"
+            search_terms: List of search terms to look for in the cause list
+            date: Cause list date in DD/MM/YYYY format
+
+        Returns:
+            Tuple of (case_details_html, cause_list_table_html, case_status_url)
+            if successful, None if case_details not provided or case not found.
+        """
+        case_bundle = self.fetch_case_bundle(case_details)
+        if case_bundle is None:
+            return None
+        return self.case_result_for_date(case_bundle, search_terms, date)
+
+    def case_result_for_date(
+        self,
+        case_bundle: Dict[str, Any],
+        search_terms: List[str] = None,
+        date: str = None,
+    ) -> Tuple[str, str, str]:
+        """
+        Build the get_case_details_and_judge_details result for one date from a
+        case bundle fetched earlier.
+        """
+        combined_table_html = self.get_judge_details_for_date(
+            case_bundle, search_terms, date
+        )
+        return (
+            case_bundle["case_details_html"],
+            combined_table_html,
+            case_bundle["case_status_url"],
+        )
@@ -0,0 +1,228 @@
+"""
+Publication Watcher
+
+The court publishes the next working day's cause lists some time in the
+evening, and supplementary lists after that. Instead of every search scraping
+and downloading them on its own, the watcher polls the view cause list form
+for the next working date and fingerprints its cause list table. When the
+table changes it downloads the new PDFs and extracts their text into the PDF
+cache at once, so searches for that date (queued or still to come) run
+against warm data and hit the court site for the cause list page only. Cache
+entries expire after PDF_CACHE_TTL, so every poll also fetches again any of
+the date's PDFs that are no longer cached.
+
+Polling adapts to publication: every WATCHER_MIN_INTERVAL seconds while the
+lists are awaited within the publication window or have just changed,
+backing off towards WATCHER_MAX_INTERVAL once they stop changing, and at the
+maximum outside the window or while the site is failing.
+
+Enabled with WATCHER_ENABLED; it runs in the Docker app's event loop.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from app.config import settings
+from app.managers.pdf_cache import pdf_cache
+from app.managers.pdf_searcher import PDFSearcher
+from app.managers.scraper import Scraper
+from app.utils.budget import TaskBudget, use_budget
+from app.utils.helpers import Weekday
+from app.utils.log import get_logger
+from app.utils.metrics import span
+
+logger = get_logger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+CAUSE_LIST_TABLE = re.compile(
+    r"<table[^>]*id=['\"]?tables11\b.*?</table>", re.IGNORECASE | re.DOTALL
+)
+# Interval growth per poll without changes, and per failed poll
+BACKOFF = 1.5
+ERROR_BACKOFF = 2.0
+
+
+def next_working_date(now: datetime) -> str:
+    """The next weekday after now, in DD/MM/YYYY format."""
+    date = now + timedelta(days=1)
+    while date.weekday() in (Weekday.SATURDAY.value, Weekday.SUNDAY.value):
+        date += timedelta(days=1)
+    return date.strftime("%d/%m/%Y")
+
+
+def table_fingerprint(page_html: str) -> Optional[str]:
+    """Hash of the cause list table, without parsing the page; None if it has none."""
+    match = CAUSE_LIST_TABLE.search(page_html)
+    if match is None:
+        return None
+    return hashlib.sha256(match.group(0).encode()).hexdigest()
+
+
+class PublicationWatcher:
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Task] = None
+        self.date: Optional[str] = None
+        self.fingerprint: Optional[str] = None
+        # Cause lists of self.date, and those of them in the cache at the last poll
+        self.pdfs: List[Dict[str, str]] = []
+        self.prefetched_urls: Set[str] = set()
+        self.interval = settings.WATCHER_MIN_INTERVAL
+        self.polls = 0
+        self.changes = 0
+        self.prefetched_count = 0
+        self.last_poll_at: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if not pdf_cache.enabled:
+            logger.warning("Publication watcher needs the PDF cache, not started")
+            return
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+            logger.info("Publication watcher started")
+
+    async def stop(self) -> None:
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Publication watcher stopped")
+        self.task = None
+
+    async def _run(self) -> None:
+        while True:
+            failed = False
+            try:
+                changed = await self.poll()
+            except Exception as e:
+                changed, failed = False, True
+                self.last_error = str(e)
+                logger.warning("Publication watcher: Poll failed: %s", e)
+            await asyncio.sleep(self._next_interval(changed, failed))
+
+    async def poll(self) -> bool:
+        """
+        Check the next working date's cause lists once, prefetching new ones.
+
+        Returns:
+            True if new cause lists were found
+        """
+        date = next_working_date(datetime.now(IST))
+        if date != self.date:
+            self.date = date
+            self.fingerprint = None
+            self.pdfs = []
+            self.prefetched_urls = set()
+
+        scraper = Scraper()
+        page_html = await asyncio.to_thread(scraper.submit_view_cl_form, date)
+        self.polls += 1
+        self.last_poll_at = time.time()
+        fingerprint = table_fingerprint(page_html)
+        new_count = 0
+        if fingerprint is not None and fingerprint != self.fingerprint:
+            # Parsing the page would hold up the event loop
+            pdfs = await asyncio.to_thread(self._record_pdfs, scraper, date, page_html)
+            known_urls = {pdf["pdf_url"] for pdf in self.pdfs}
+            new_count = sum(1 for pdf in pdfs if pdf["pdf_url"] not in known_urls)
+            self.pdfs = pdfs
+            self.fingerprint = fingerprint
+        if new_count:
+            self.changes += 1
+            self.last_change_at = time.time()
+
+        # New cause lists, those not fetched before and those whose cache
+        # entries have expired since
+        self.prefetched_urls = await asyncio.to_thread(self._cached_urls)
+        missing = [
+            pdf for pdf in self.pdfs if pdf["pdf_url"] not in self.prefetched_urls
+        ]
+        if missing:
+            logger.info(
+                "Publication watcher: Prefetching %s Cause List(s) for %s (%s new)",
+                len(missing),
+                date,
+                new_count,
+            )
+            await self._prefetch(date, missing)
+        return new_count > 0
+
+    def _record_pdfs(
+        self, scraper: Scraper, date: str, page_html: str
+    ) -> List[Dict[str, str]]:
+        pdfs = scraper.parse_cause_list_pdfs(page_html)
+        pdf_cache.put_cause_list(date, pdfs)
+        return pdfs
+
+    def _cached_urls(self) -> Set[str]:
+        return {
+            pdf["pdf_url"] for pdf in self.pdfs if pdf_cache.has_pages(pdf["pdf_url"])
+        }
+
+    async def _prefetch(self, date: str, pdfs: List[Dict[str, str]]) -> None:
+        """Download and extract PDFs into the cache."""
+        # Copies: the searcher adds page counts to the PDFs it reads
+        pdfs = [dict(pdf) for pdf in pdfs]
+        searcher = PDFSearcher(search_terms=[])
+        budget = TaskBudget(deadline=time.time() + settings.QUEUE_TASK_TIMEOUT)
+        with use_budget(budget), span("prefetch", date=date, pdfs=len(pdfs)):
+            await asyncio.to_thread(searcher.search_pdf, pdfs)
+
+        # The searcher notes the page count of each PDF it could read; the
+        # rest are tried again on the next poll
+        fetched = [pdf for pdf in pdfs if "num_pages" in pdf]
+        self.prefetched_urls.update(pdf["pdf_url"] for pdf in fetched)
+        self.prefetched_count += len(fetched)
+        if len(fetched) < len(pdfs):
+            logger.warning(
+                "Publication watcher: %s of %s Cause List(s) for %s not prefetched",
+                len(pdfs) - len(fetched),
+                len(pdfs),
+                date,
+            )
+
+    def _in_window(self) -> bool:
+        hour = datetime.now(IST).hour
+        return settings.WATCHER_WINDOW_START <= hour < settings.WATCHER_WINDOW_END
+
+    def _next_interval(self, changed: bool, failed: bool) -> float:
+        """Seconds until the next poll."""
+        if failed:
+            interval = self.interval * ERROR_BACKOFF
+        elif not self._in_window():
+            interval = settings.WATCHER_MAX_INTERVAL
+        elif changed or not self.pdfs:
+            # Lists are appearing, or still awaited
+            interval = settings.WATCHER_MIN_INTERVAL
+        else:
+            interval = self.interval * BACKOFF
+        self.interval = min(
+            settings.WATCHER_MAX_INTERVAL, max(settings.WATCHER_MIN_INTERVAL, interval)
+        )
+        # Jitter, so instances started together do not poll together
+        return self.interval * random.uniform(0.9, 1.1)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.task is not None and not self.task.done(),
+            "date": self.date,
+            "cause_lists_prefetched": len(self.prefetched_urls),
+            "interval_seconds": round(self.interval, 1),
+            "polls": self.polls,
+            "changes": self.changes,
+            "prefetched_count": self.prefetched_count,
+            "last_poll_at": self.last_poll_at,
+            "last_change_at": self.last_change_at,
+            "last_error": self.last_error,
+        }
+
+
+publication_watcher = PublicationWatcher()
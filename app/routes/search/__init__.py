@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 
+from app.routes.search.bulk import router as bulk_router
 from app.routes.search.cause_list import router as cause_list_router
+from app.routes.search.lookup import router as lookup_router
+from app.routes.search.tasks import router as tasks_router
 
 router = APIRouter()
 
 router.include_router(cause_list_router, prefix="/cause-list")
+router.include_router(lookup_router, prefix="/lookup")
+router.include_router(bulk_router, prefix="/bulk")
+router.include_router(tasks_router, prefix="/tasks")
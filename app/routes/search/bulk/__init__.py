@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+
+from app.managers.bulk_jobs import bulk_jobs
+from app.routes.search.bulk.controllers import submit_bulk
+from app.routes.search.bulk.validators import BulkSearchRequest
+from app.routes.search.tasks import progress_events
+
+router = APIRouter()
+
+
+@router.post("")
+async def search_bulk(body: BulkSearchRequest):
+    return await submit_bulk(body.searches)
+
+
+@router.get("/{job_id}")
+async def get_bulk_job(job_id: str):
+    """Status and result counts of each search in a bulk job."""
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Bulk job {job_id} not found")
+    return job.status()
+
+
+@router.get("/{job_id}/events")
+async def stream_bulk_job_events(
+    job_id: str, last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-sent events of every task in a bulk job, each tagged with its
+    task id and the indices of the submitted searches it serves.
+    """
+    if bulk_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Bulk job {job_id} not found")
+    return progress_events(job_id, last_event_id)
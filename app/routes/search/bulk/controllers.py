@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.config import settings
+from app.managers.bulk_jobs import BulkItem, BulkJob, bulk_jobs
+from app.managers.queue import queue_manager
+from app.routes.search.cause_list.controllers import (
+    queue_digest_task,
+    queue_search_task,
+)
+from app.routes.search.cause_list.validators import SearchRequest
+from app.utils.helpers import get_weekend_dates
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+async def submit_bulk(searches: List[Any]) -> Dict[str, Any]:
+    """
+    Queue many searches as one bulk job.
+
+    Each item is validated as a SearchRequest on its own: invalid items are
+    reported with status "invalid" and their errors while the others are
+    queued, and only a submission without a single valid item is rejected.
+
+    Each search is queued as it would be by POST /search/cause-list, but the
+    defaults and weekend expansion are worked out once per distinct date and
+    every task is journaled in one transaction. Searches for the same date are
+    queued together, so the queue runs them as one batch with a single scrape
+    and PDF pass.
+    """
+    await queue_manager.start_processor()
+
+    default_date = (datetime.now() + timedelta(days=1)).strftime("%d/%m/%Y")
+    default_recipients = settings.EMAIL_RECIPIENTS.split(",")
+    expanded_dates: Dict[str, List[str]] = {}
+
+    items = []
+    with queue_manager.bulk_writes():
+        for raw_search in searches:
+            try:
+                search = SearchRequest.parse_obj(raw_search)
+            except ValidationError as e:
+                search_terms = (
+                    raw_search.get("search_terms")
+                    if isinstance(raw_search, dict)
+                    else None
+                )
+                items.append(BulkItem(search_terms, [], [], errors=e.errors()))
+                continue
+            date = search.date or default_date
+            if date not in expanded_dates:
+                expanded_dates[date] = get_weekend_dates(date)
+            dates = expanded_dates[date]
+            recipient_emails = search.recipient_emails or default_recipients
+            notify_mode = search.notify_mode or settings.NOTIFY_MODE
+
+            if search.digest and len(dates) > 1:
+                task_ids = [
+                    await queue_digest_task(
+                        search_terms=search.search_terms,
+                        dates=dates,
+                        recipient_emails=recipient_emails,
+                        case_details=search.case_details,
+                        max_attempts=3,
+                        notify_mode=notify_mode,
+                        profile=search.profile,
+                    )
+                ]
+            else:
+                task_ids = [
+                    await queue_search_task(
+                        search_terms=search.search_terms,
+                        date=process_date,
+                        recipient_emails=recipient_emails,
+                        case_details=search.case_details,
+                        max_attempts=3,
+                        notify_mode=notify_mode,
+                        profile=search.profile,
+                    )
+                    for process_date in dates
+                ]
+            items.append(BulkItem(search.search_terms, dates, task_ids))
+
+    job = BulkJob(items)
+    queued_count = sum(1 for item in items if item.errors is None)
+    if not queued_count:
+        raise HTTPException(status_code=422, detail=job.status()["items"])
+    bulk_jobs.add(job)
+    task_count = len({task_id for item in items for task_id in item.task_ids})
+    logger.info(
+        "Bulk job %s queued %s of %s search(es) as %s task(s)",
+        job.job_id,
+        queued_count,
+        len(items),
+        task_count,
+    )
+    return {
+        "message": f"{queued_count} of {len(items)} search(es) queued as {task_count} task(s)",
+        **job.status(),
+        "queue_size": queue_manager.get_queue_status()["queue_size"],
+    }
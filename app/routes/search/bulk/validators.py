@@ -0,0 +1,21 @@
+from typing import Any, List
+
+from pydantic import BaseModel, validator
+
+from app.config import settings
+
+
+class BulkSearchRequest(BaseModel):
+    # Each item is validated on its own as a SearchRequest, so one bad item
+    # is reported in its own status instead of failing the whole body
+    searches: List[Any]
+
+    @validator("searches")
+    def validate_searches(cls, values):
+        if not values:
+            raise ValueError("At least one search is required.")
+        if len(values) > settings.BULK_MAX_SEARCHES:
+            raise ValueError(
+                f"At most {settings.BULK_MAX_SEARCHES} searches can be submitted at once."
+            )
+        return values
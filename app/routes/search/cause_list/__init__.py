@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
+from app.managers.outbox import outbox
 from app.managers.queue import queue_manager
+from app.managers.watcher import publication_watcher
 from app.routes.search.cause_list.controllers import scrape_search_and_notify
 from app.routes.search.cause_list.validators import SearchRequest
 
@@ -10,11 +12,21 @@ router = APIRouter()
 @router.post("/")
 async def search_cause_list(body: SearchRequest):
     return await scrape_search_and_notify(
-        body.search_terms, body.date, body.recipient_emails, body.case_details
+        body.search_terms,
+        body.date,
+        body.recipient_emails,
+        body.case_details,
+        body.digest,
+        body.notify_mode,
+        body.profile,
     )
 
 
 @router.get("/queue-status")
 async def get_queue_status():
-    """Get the current status of the search queue."""
-    return queue_manager.get_queue_status()
+    """Get the current status of the search queue, email outbox and watcher."""
+    return {
+        **queue_manager.get_queue_status(),
+        "outbox": outbox.get_status(),
+        "watcher": publication_watcher.get_status(),
+    }
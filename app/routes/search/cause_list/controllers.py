@@ -1,18 +1,47 @@
 import asyncio
-import json
-from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from fastapi import HTTPException
 
 from app.config import settings
+from app.managers.outbox import Outbox, outbox
 from app.managers.pdf_searcher import PDFSearcher
-from app.managers.queue import queue_manager
+from app.managers.pdf_tracker import pdf_tracker
+from app.managers.progress import progress_hub
+from app.managers.queue import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    queue_manager,
+)
+from app.managers.result_tracker import (
+    NOTIFY_ALWAYS,
+    NOTIFY_ON_CHANGE,
+    result_fingerprint,
+    result_tracker,
+    search_key,
+)
 from app.managers.scraper import Scraper
-from app.services.emailer import Emailer
+from app.utils.budget import TaskCancelled
 from app.utils.error_handler import ErrorHandler
 from app.utils.helpers import get_weekend_dates
+from app.utils.log import get_logger, lazy_json
+from app.utils.metrics import span
+
+logger = get_logger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def merge_emails(recipient_emails: List[str], new_emails: List[str]) -> None:
+    """Append the emails not already in recipient_emails (case-insensitively)."""
+    known = {email.lower() for email in recipient_emails}
+    for email in new_emails:
+        if email.lower() not in known:
+            recipient_emails.append(email)
+            known.add(email.lower())
 
 
 @dataclass
@@ -21,6 +50,91 @@ class QueuedSearch:
     date: str
     recipient_emails: List[str]
     case_details: Optional[Dict[str, str]] = None
+    task_id: Optional[str] = None
+    # Progress checkpoints: scraped, searched, emailed
+    stages: Dict[str, Any] = field(default_factory=dict)
+    # "always", or "on_change" to skip the email when results are unchanged
+    notify_mode: str = NOTIFY_ALWAYS
+
+    def merge(self, other: "QueuedSearch") -> None:
+        """Fold a duplicate request into this search."""
+        merge_emails(self.recipient_emails, other.recipient_emails)
+        if other.notify_mode == NOTIFY_ALWAYS:
+            self.notify_mode = NOTIFY_ALWAYS
+
+    @property
+    def result_key(self) -> str:
+        """Key of this search's last emailed results in the result tracker."""
+        return search_key(self.search_terms, self.date, self.case_details)
+
+
+@dataclass
+class QueuedDigest:
+    """
+    All dates of an expanded request, processed as one task with one email.
+
+    Each date is tracked as its own QueuedSearch (sharing the digest's task
+    id, so their checkpoints persist the digest); the case details that do
+    not depend on the date are fetched once into stages["case_bundle"].
+    """
+
+    search_terms: List[str]
+    dates: List[str]
+    recipient_emails: List[str]
+    case_details: Optional[Dict[str, str]] = None
+    task_id: Optional[str] = None
+    searches: List[QueuedSearch] = field(default_factory=list)
+    # Progress checkpoints: case_bundle, emailed
+    stages: Dict[str, Any] = field(default_factory=dict)
+    notify_mode: str = NOTIFY_ALWAYS
+
+    def __post_init__(self) -> None:
+        if not self.searches:
+            self.searches = [
+                QueuedSearch(
+                    self.search_terms,
+                    date,
+                    self.recipient_emails,
+                    self.case_details,
+                    task_id=self.task_id,
+                    notify_mode=self.notify_mode,
+                )
+                for date in self.dates
+            ]
+
+    @property
+    def date(self) -> str:
+        return ", ".join(self.dates)
+
+    def merge(self, other: "QueuedDigest") -> None:
+        """Fold a duplicate request into this digest."""
+        merge_emails(self.recipient_emails, other.recipient_emails)
+        if other.notify_mode == NOTIFY_ALWAYS:
+            self.notify_mode = NOTIFY_ALWAYS
+        # The searches share the digest's recipient list only until the task
+        # is restored from the queue store, which gives each its own copy
+        for queued in self.searches:
+            queued.merge(other)
+
+
+def search_task_id(
+    search_terms: List[str],
+    date: str,
+    case_details: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Build the queue task id for a search.
+
+    Searches for the same date, the same case-insensitive set of terms and the
+    same case details share an id, so the queue can coalesce them.
+    """
+    terms = sorted({term.strip().lower() for term in search_terms if term.strip()})
+    task_id = f"search_{date}_{'_'.join(terms)}"
+    if case_details:
+        task_id += (
+            f"_{case_details['type']}-{case_details['no']}-{case_details['year']}"
+        )
+    return task_id
 
 
 async def scrape_search_and_notify(
@@ -28,6 +142,9 @@ async def scrape_search_and_notify(
     date: Optional[str] = None,
     recipient_emails: Optional[List[str]] = None,
     case_details: Dict[str, str] = None,
+    digest: bool = False,
+    notify_mode: Optional[str] = None,
+    profile: bool = False,
 ) -> Dict[str, Any]:
     # Ensure queue processor is running
     await queue_manager.start_processor()
@@ -38,46 +155,149 @@ async def scrape_search_and_notify(
     if not date:
         date = (datetime.now() + timedelta(days=1)).strftime("%d/%m/%Y")
 
+    notify_mode = notify_mode or settings.NOTIFY_MODE
+
     # Get all dates to process based on weekend logic
     dates_to_process = get_weekend_dates(date)
 
-    print(f"Processing dates: {dates_to_process}", flush=True)
+    logger.info("Processing dates: %s", dates_to_process)
 
-    # Queue all the searches
-    for process_date in dates_to_process:
-        await queue_search_task(
+    # Queue all the searches, or one digest covering every date
+    task_ids = []
+    if digest and len(dates_to_process) > 1:
+        task_id = await queue_digest_task(
             search_terms=search_terms,
-            date=process_date,
+            dates=dates_to_process,
             recipient_emails=recipient_emails,
             case_details=case_details,
             max_attempts=3,
+            notify_mode=notify_mode,
+            profile=profile,
         )
-        print(f"Queued search for date: {process_date}", flush=True)
+        task_ids.append(task_id)
+        logger.info("Queued digest search for dates: %s", dates_to_process)
+    else:
+        for process_date in dates_to_process:
+            task_id = await queue_search_task(
+                search_terms=search_terms,
+                date=process_date,
+                recipient_emails=recipient_emails,
+                case_details=case_details,
+                max_attempts=3,
+                notify_mode=notify_mode,
+                profile=profile,
+            )
+            task_ids.append(task_id)
+            logger.info("Queued search for date: %s", process_date)
 
     return {
         "message": f"Search and notification process queued for {len(dates_to_process)} date(s)",
         "dates": dates_to_process,
+        "task_ids": task_ids,
         "queue_size": queue_manager.get_queue_status()["queue_size"],
     }
 
 
+def search_schedule(date: str) -> Tuple[int, float, float]:
+    """
+    Work out when a search for a hearing date should run.
+
+    Hearings tomorrow or sooner are high priority, within three days normal,
+    later ones low; within a priority, earlier hearings go first. A search is
+    stale once its hearing day (in IST) is over.
+
+    Args:
+        date: Hearing date in DD/MM/YYYY format
+
+    Returns:
+        Tuple of (priority, order_key, deadline) for queue_manager.add_task
+    """
+    hearing_date = datetime.strptime(date, "%d/%m/%Y").replace(tzinfo=IST)
+    days_until = (hearing_date.date() - datetime.now(IST).date()).days
+    if days_until <= 1:
+        priority = PRIORITY_HIGH
+    elif days_until <= 3:
+        priority = PRIORITY_NORMAL
+    else:
+        priority = PRIORITY_LOW
+    deadline = (hearing_date + timedelta(days=1)).timestamp()
+    return priority, hearing_date.timestamp(), deadline
+
+
 async def queue_search_task(
     search_terms: List[str],
     date: str,
     recipient_emails: List[str],
     case_details: Optional[Dict[str, str]] = None,
     max_attempts: int = 3,
-):
-    """Queue a search task with the standard search method."""
+    notify_mode: str = NOTIFY_ALWAYS,
+    profile: bool = False,
+) -> str:
+    """Queue a search task with the standard search method and return its id."""
 
-    task_id = f"search_{date}_{'_'.join(search_terms)}"
-    queued_search = QueuedSearch(search_terms, date, recipient_emails, case_details)
-    await queue_manager.add_task(
+    task_id = queue_manager.follow_up_id(
+        search_task_id(search_terms, date, case_details)
+    )
+    priority, order_key, deadline = search_schedule(date)
+    queued_search = QueuedSearch(
+        search_terms,
+        date,
+        list(recipient_emails),
+        case_details,
+        task_id=task_id,
+        notify_mode=notify_mode,
+    )
+    task = await queue_manager.add_task(
         process_single_search,
         queued_search,
         max_attempts=max_attempts,
         task_id=task_id,
+        batch_key=f"cause_list_{date}",
+        batch_method=process_search_batch,
+        priority=priority,
+        order_key=order_key,
+        deadline=deadline,
+        profile=profile,
+        on_duplicate=lambda pending: pending.method_args[0].merge(queued_search),
+    )
+    return task.task_id
+
+
+async def queue_digest_task(
+    search_terms: List[str],
+    dates: List[str],
+    recipient_emails: List[str],
+    case_details: Optional[Dict[str, str]] = None,
+    max_attempts: int = 3,
+    notify_mode: str = NOTIFY_ALWAYS,
+    profile: bool = False,
+) -> str:
+    """Queue one digest task covering all dates and return its id."""
+
+    search_id = search_task_id(search_terms, "+".join(dates), case_details)
+    task_id = queue_manager.follow_up_id("digest_" + search_id[len("search_") :])
+    priority, order_key, _ = search_schedule(dates[0])
+    _, _, deadline = search_schedule(dates[-1])
+    queued_digest = QueuedDigest(
+        search_terms,
+        list(dates),
+        list(recipient_emails),
+        case_details,
+        task_id,
+        notify_mode=notify_mode,
+    )
+    task = await queue_manager.add_task(
+        process_digest,
+        queued_digest,
+        max_attempts=max_attempts,
+        task_id=task_id,
+        priority=priority,
+        order_key=order_key,
+        deadline=deadline,
+        profile=profile,
+        on_duplicate=lambda pending: pending.method_args[0].merge(queued_digest),
     )
+    return task.task_id
 
 
 async def process_single_search(queued_search: QueuedSearch) -> bool:
@@ -90,100 +310,446 @@ async def process_single_search(queued_search: QueuedSearch) -> bool:
     Returns:
         True if successful, False if failed after max attempts
     """
+    results = await process_search_batch([queued_search])
+    return results[0]
+
+
+async def process_search_batch(queued_searches: List[QueuedSearch]) -> List[bool]:
+    """
+    Process several searches for the same date with one scrape and PDF pass.
+
+    The cause list is scraped once and every PDF is downloaded and searched
+    once for the union of all search terms; the hits are then split back out
+    so each search gets its own results and email.
+
+    Each search records the stages it has completed (scraped, searched,
+    emailed) and checkpoints them to the queue store, so a search resumed
+    after a restart skips the stages that are already done.
+
+    Args:
+        queued_searches: Searches that all share the same date
+
+    Returns:
+        One success flag per search, in the same order
+    """
+    date = queued_searches[0].date
     scraper = Scraper()
-    searcher = PDFSearcher(search_terms=queued_search.search_terms)
-    emailer = Emailer()
-    error_handler = ErrorHandler(emailer, queued_search.recipient_emails)
+    pending = [queued for queued in queued_searches if "emailed" not in queued.stages]
 
     try:
         # Step 1 & 2: Scrape the page and get PDF links & Case details in parallel
-        pdf_result, case_result = await asyncio.gather(
-            asyncio.to_thread(
-                scraper.parse_table_and_download_pdfs,
-                queued_search.date,
-                queued_search.search_terms,
-            ),
-            asyncio.to_thread(
-                scraper.get_case_details_and_judge_details,
-                queued_search.case_details,
-                queued_search.search_terms,
-                queued_search.date,
-            ),
+        to_scrape = [
+            queued
+            for queued in pending
+            if "scraped" not in queued.stages and "searched" not in queued.stages
+        ]
+        if to_scrape:
+            await _scrape_stage(scraper, date, to_scrape)
+
+        # Step 3: Search for the terms in the PDFs (run in separate thread)
+        to_search = [queued for queued in pending if "searched" not in queued.stages]
+        if to_search:
+            await _search_stage(date, to_search)
+    except TaskCancelled:
+        # Cancelled or out of time: the queue decides whether to retry
+        raise
+    except Exception as e:
+        for queued in pending:
+            _handle_search_error(outbox, queued, e)
+        return ["emailed" in queued.stages for queued in queued_searches]
+
+    # Step 4: Send each search its email
+    with span("notify", date=date, searches=len(queued_searches)):
+        return [_notify_search(outbox, queued) for queued in queued_searches]
+
+
+async def process_digest(queued_digest: QueuedDigest) -> bool:
+    """
+    Process every date of an expanded request as one digest.
+
+    The case details are fetched once and reused for each date, the cause
+    lists for all dates are scraped concurrently and searched in one PDF
+    pass, and the results go out as a single email.
+
+    Args:
+        queued_digest: The digest to process
+
+    Returns:
+        True if the digest email was queued, False otherwise
+    """
+    if "emailed" in queued_digest.stages:
+        return True
+
+    scraper = Scraper()
+    searches = queued_digest.searches
+    try:
+        to_scrape = [
+            queued
+            for queued in searches
+            if "scraped" not in queued.stages and "searched" not in queued.stages
+        ]
+        if to_scrape:
+            if "case_bundle" not in queued_digest.stages:
+                with span("case_bundle"):
+                    queued_digest.stages["case_bundle"] = await asyncio.to_thread(
+                        scraper.fetch_case_bundle, queued_digest.case_details
+                    )
+                queue_manager.checkpoint(queued_digest.task_id)
+            # None (case not found or not fetched) is kept too, so the dates
+            # do not each try again
+            case_bundle = queued_digest.stages["case_bundle"]
+            await asyncio.gather(
+                *(
+                    _scrape_stage(
+                        scraper, queued.date, [queued], case_bundle, shared_case=True
+                    )
+                    for queued in to_scrape
+                )
+            )
+
+        to_search = [queued for queued in searches if "searched" not in queued.stages]
+        if to_search:
+            await _search_stage(queued_digest.date, to_search)
+    except TaskCancelled:
+        raise
+    except Exception as e:
+        _handle_search_error(outbox, queued_digest, e)
+        return False
+
+    with span("notify", date=queued_digest.date, searches=1):
+        return _notify_digest(outbox, queued_digest)
+
+
+async def _scrape_stage(
+    scraper: Scraper,
+    date: str,
+    queued_searches: List[QueuedSearch],
+    case_bundle: Optional[Dict[str, Any]] = None,
+    shared_case: bool = False,
+) -> None:
+    """
+    Scrape the cause list for a date and fetch each search's case details.
+
+    Args:
+        case_bundle: Case details already fetched with Scraper.fetch_case_bundle
+            for searches that share one case (digests); only the date-specific
+            judge cause list is then fetched
+        shared_case: Whether case_bundle was fetched for these searches; if
+            so, a None case_bundle means there are no case details to show
+            and they are not fetched again
+    """
+
+    def cause_list_pdfs():
+        with span("cause_list_scrape", date=date) as fields:
+            pdfs = scraper.fetch_cause_list_pdfs(date)
+            fields["pdfs"] = len(pdfs)
+        for queued in queued_searches:
+            progress_hub.publish(
+                queued.task_id,
+                "pdfs_found",
+                date=date,
+                # Copies: the searcher adds page counts to the originals
+                pdfs=[dict(pdf) for pdf in pdfs],
+            )
+        return pdfs
+
+    def case_result(queued: QueuedSearch):
+        if not queued.case_details:
+            return None
+        if shared_case and case_bundle is None:
+            return None
+        with span("case_details", date=date):
+            if shared_case:
+                result = scraper.case_result_for_date(
+                    case_bundle, queued.search_terms, date
+                )
+            else:
+                result = scraper.get_case_details_and_judge_details(
+                    queued.case_details, queued.search_terms, date
+                )
+        if result is None:
+            # The case was not found
+            return None
+        _, term_found_in_regular_cause_list, case_status_url = result
+        progress_hub.publish(
+            queued.task_id,
+            "case_details",
+            date=date,
+            term_found_in_regular_cause_list=term_found_in_regular_cause_list,
+            case_status_url=case_status_url,
         )
+        return result
 
-        # Unpack the PDF results
-        existing_pdfs, new_pdfs = pdf_result
-        pdfs = existing_pdfs + new_pdfs  # Combined list for backward compatibility
+    pdfs, *case_results = await asyncio.gather(
+        asyncio.to_thread(cause_list_pdfs),
+        *(asyncio.to_thread(case_result, queued) for queued in queued_searches),
+    )
 
-        case_details_html, term_found_in_regular_cause_list, case_status_url = (
-            case_result if case_result is not None else (None, "", "")
+    for queued, case_result in zip(queued_searches, case_results):
+        queued.stages["scraped"] = {
+            "pdfs": pdfs,
+            "case_result": list(case_result) if case_result is not None else None,
+        }
+        queue_manager.checkpoint(queued.task_id)
+
+
+async def _search_stage(date: str, queued_searches: List[QueuedSearch]) -> None:
+    # Searches resumed from a checkpoint carry their own copies of the PDF list
+    pdfs_by_url = {}
+    for queued in queued_searches:
+        for pdf in queued.stages["scraped"]["pdfs"]:
+            pdfs_by_url.setdefault(pdf["pdf_url"], pdf)
+    pdfs = list(pdfs_by_url.values())
+    search_terms = list(
+        dict.fromkeys(
+            term for queued in queued_searches for term in queued.search_terms
         )
+    )
 
-        if not pdfs:
-            send_email(
-                emailer,
-                queued_search.recipient_emails,
-                queued_search.search_terms,
-                queued_search.date,
-                existing_pdfs,
-                new_pdfs,
-                [],
-                case_details_html,
-                term_found_in_regular_cause_list,
-                case_status_url,
+    search_urls = {
+        id(queued): {pdf["pdf_url"] for pdf in queued.stages["scraped"]["pdfs"]}
+        for queued in queued_searches
+    }
+
+    def on_result(pdf: Dict[str, str], result: Optional[Dict[str, Any]]) -> None:
+        """Tell each search about a PDF of its cause list as soon as it is searched."""
+        found_pages = result["found_pages"] if result else {}
+        for queued in queued_searches:
+            if pdf["pdf_url"] not in search_urls[id(queued)]:
+                continue
+            progress_hub.publish(
+                queued.task_id,
+                "pdf_searched",
+                date=queued.date,
+                pdf_name=pdf["pdf_name"],
+                pdf_url=pdf["pdf_url"],
+                # None when the PDF could not be downloaded or read
+                num_pages=pdf.get("num_pages"),
+                found_pages={
+                    term: found_pages.get(term, []) for term in queued.search_terms
+                },
             )
-            print(f"ALERT! No Cause Lists found for {queued_search.date}", flush=True)
-            return True
 
-        print(
-            f"PROGRESS! Cause Lists found for {queued_search.date}: ",
-            json.dumps(pdfs, indent=2),
-            flush=True,
+    results = []
+    if pdfs:
+        logger.info("%s Cause List(s) found for %s", len(pdfs), date)
+        logger.debug("Cause Lists found for %s: %s", date, lazy_json(pdfs))
+
+        searcher = PDFSearcher(search_terms=search_terms)
+        with span("pdf_search", date=date, pdfs=len(pdfs)) as fields:
+            results = await asyncio.to_thread(searcher.search_pdf, pdfs, on_result)
+            fields["results"] = len(results)
+
+        logger.info("Search complete for %s: %s result(s)", date, len(results))
+        logger.debug("Cause List Search Results for %s: %s", date, lazy_json(results))
+
+    for queued in queued_searches:
+        search_pdfs = [
+            pdfs_by_url[pdf["pdf_url"]] for pdf in queued.stages["scraped"]["pdfs"]
+        ]
+        existing_pdfs, new_pdfs = pdf_tracker.separate_existing_and_new_pdfs(
+            search_pdfs, queued.search_terms
+        )
+        queued.stages["searched"] = {
+            "existing_pdfs": existing_pdfs,
+            "new_pdfs": new_pdfs,
+            "results": [
+                result
+                for result in PDFSearcher.filter_results(results, queued.search_terms)
+                if result["pdf_url"] in search_urls[id(queued)]
+            ],
+        }
+        queue_manager.checkpoint(queued.task_id)
+        progress_hub.publish(
+            queued.task_id,
+            "search_complete",
+            date=queued.date,
+            pdfs=len(search_pdfs),
+            results=len(queued.stages["searched"]["results"]),
         )
 
-        # Step 3: Search for the terms in the PDFs (run in separate thread)
-        results = await asyncio.to_thread(searcher.search_pdf, pdfs)
 
-        print(
-            f"PROGRESS! Cause List Search Results for {queued_search.date}: ",
-            json.dumps(results, indent=2),
-            flush=True,
+def _notify_search(emailer: Outbox, queued_search: QueuedSearch) -> bool:
+    """
+    Queue one search's email for its share of a search run. The outbox
+    delivers it in the background; the search is done once it is queued.
+    """
+    if "emailed" in queued_search.stages:
+        return True
+    if queue_manager.is_cancelled(queued_search.task_id):
+        logger.info("Task %s was cancelled, not emailing", queued_search.task_id)
+        return False
+
+    try:
+        searched = queued_search.stages["searched"]
+        case_result = queued_search.stages["scraped"]["case_result"]
+        case_details_html, term_found_in_regular_cause_list, case_status_url = (
+            case_result if case_result is not None else (None, "", "")
         )
 
-        # Step 4: If results found, send an email notification
-        send_email(
+        fingerprint = _search_fingerprint(queued_search)
+        if queued_search.notify_mode == NOTIFY_ON_CHANGE and not (
+            result_tracker.has_changed(queued_search.result_key, fingerprint)
+        ):
+            logger.info("No changes for %s since the last email", queued_search.date)
+            queued_search.stages["emailed"] = False
+            queue_manager.checkpoint(queued_search.task_id)
+            progress_hub.publish(
+                queued_search.task_id,
+                "email_skipped",
+                date=queued_search.date,
+                reason="unchanged",
+            )
+            return True
+
+        message_id = send_email(
             emailer,
             queued_search.recipient_emails,
             queued_search.search_terms,
             queued_search.date,
-            existing_pdfs,
-            new_pdfs,
-            results,
+            searched["existing_pdfs"],
+            searched["new_pdfs"],
+            searched["results"],
             case_details_html,
             term_found_in_regular_cause_list,
             case_status_url,
         )
-
-        print(
-            f"SUCCESS! Search completed and email sent for {queued_search.date}! ",
-            json.dumps(results, indent=2),
-            flush=True,
+        queued_search.stages["emailed"] = True
+        queue_manager.checkpoint(queued_search.task_id)
+        result_tracker.record(queued_search.result_key, queued_search.date, fingerprint)
+        progress_hub.email_queued(
+            queued_search.task_id, message_id, date=queued_search.date
         )
+
+        if not searched["existing_pdfs"] and not searched["new_pdfs"]:
+            logger.warning("No Cause Lists found for %s", queued_search.date)
+        else:
+            logger.info(
+                "Search completed and email queued for %s (%s result(s))",
+                queued_search.date,
+                len(searched["results"]),
+            )
         return True
 
     except Exception as e:
-        error_message, stack_trace = error_handler.handle_exception(
-            e, {"search_terms": queued_search.search_terms, "date": queued_search.date}
+        _handle_search_error(emailer, queued_search, e)
+        return False
+
+
+def _notify_digest(emailer: Outbox, queued_digest: QueuedDigest) -> bool:
+    """Queue the single email covering every date of a digest."""
+    if queue_manager.is_cancelled(queued_digest.task_id):
+        logger.info("Task %s was cancelled, not emailing", queued_digest.task_id)
+        return False
+
+    try:
+        # The digest's own recipients are the ones its email goes to
+        fingerprints = [
+            _search_fingerprint(queued, queued_digest.recipient_emails)
+            for queued in queued_digest.searches
+        ]
+        if queued_digest.notify_mode == NOTIFY_ON_CHANGE and not any(
+            result_tracker.has_changed(queued.result_key, fingerprint)
+            for queued, fingerprint in zip(queued_digest.searches, fingerprints)
+        ):
+            logger.info("No changes for %s since the last email", queued_digest.date)
+            queued_digest.stages["emailed"] = False
+            queue_manager.checkpoint(queued_digest.task_id)
+            progress_hub.publish(
+                queued_digest.task_id,
+                "email_skipped",
+                date=queued_digest.date,
+                reason="unchanged",
+            )
+            return True
+
+        days = []
+        for queued in queued_digest.searches:
+            searched = queued.stages["searched"]
+            case_result = queued.stages["scraped"]["case_result"]
+            case_details_html, term_found_in_regular_cause_list, case_status_url = (
+                case_result if case_result is not None else (None, "", "")
+            )
+            days.append(
+                build_email_context(
+                    queued.search_terms,
+                    queued.date,
+                    searched["existing_pdfs"],
+                    searched["new_pdfs"],
+                    searched["results"],
+                    case_details_html,
+                    term_found_in_regular_cause_list,
+                    case_status_url,
+                )
+            )
+
+        context = {
+            "search_terms": queued_digest.search_terms,
+            "dates": queued_digest.dates,
+            "days": days,
+            # Date-independent, so the same on every day
+            "case_details_html": days[0]["case_details_html"],
+            "urls": days[0]["urls"],
+        }
+        try:
+            message_id = emailer.send_email(
+                recipients=queued_digest.recipient_emails,
+                subject=(
+                    f"Cause List Search Results for {queued_digest.search_terms} "
+                    f"on {queued_digest.date}"
+                ),
+                template_name="digest_template.html",
+                context=context,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error sending email: {e}")
+        queued_digest.stages["emailed"] = True
+        queue_manager.checkpoint(queued_digest.task_id)
+        for queued, fingerprint in zip(queued_digest.searches, fingerprints):
+            result_tracker.record(queued.result_key, queued.date, fingerprint)
+        progress_hub.email_queued(
+            queued_digest.task_id, message_id, date=queued_digest.date
         )
-        print(
-            f"ERROR! Search failed for {queued_search.date}: {error_message}",
-            flush=True,
+
+        logger.info(
+            "Digest search completed and email queued for %s (%s result(s))",
+            queued_digest.date,
+            sum(len(day["results"]) for day in days),
         )
+        return True
+
+    except Exception as e:
+        _handle_search_error(emailer, queued_digest, e)
         return False
 
 
+def _search_fingerprint(
+    queued_search: QueuedSearch, recipient_emails: Optional[List[str]] = None
+) -> str:
+    """Fingerprint of a search's results, for recipient_emails (default its own)."""
+    searched = queued_search.stages["searched"]
+    return result_fingerprint(
+        searched["existing_pdfs"] + searched["new_pdfs"],
+        searched["results"],
+        queued_search.stages["scraped"]["case_result"],
+        recipient_emails or queued_search.recipient_emails,
+    )
+
+
+def _handle_search_error(
+    emailer: Outbox,
+    queued_search: Union[QueuedSearch, QueuedDigest],
+    error: Exception,
+) -> None:
+    error_handler = ErrorHandler(emailer, queued_search.recipient_emails)
+    error_message, stack_trace = error_handler.handle_exception(
+        error, {"search_terms": queued_search.search_terms, "date": queued_search.date}
+    )
+    logger.error("Search failed for %s: %s", queued_search.date, error_message)
+
+
 def send_email(
-    emailer: Emailer,
+    emailer: Outbox,
     email_list: List[str],
     search_terms: str,
     date: str,
@@ -193,11 +759,43 @@ def send_email(
     case_details_html: Optional[str] = None,
     term_found_in_regular_cause_list: Optional[str] = None,
     case_status_url: Optional[str] = None,
-) -> None:
+) -> str:
+    """Queue a search's email and return its outbox message id."""
+    context = build_email_context(
+        search_terms,
+        date,
+        existing_pdfs,
+        new_pdfs,
+        results,
+        case_details_html,
+        term_found_in_regular_cause_list,
+        case_status_url,
+    )
+    try:
+        return emailer.send_email(
+            recipients=email_list,
+            subject=f"Cause List Search Results for {search_terms} on {date}",
+            template_name="cause_list_template.html",
+            context=context,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error sending email: {e}")
+
+
+def build_email_context(
+    search_terms: str,
+    date: str,
+    existing_pdfs: List[Dict[str, str]],
+    new_pdfs: List[Dict[str, str]],
+    results: List[Dict[str, Any]],
+    case_details_html: Optional[str] = None,
+    term_found_in_regular_cause_list: Optional[str] = None,
+    case_status_url: Optional[str] = None,
+) -> Dict[str, Any]:
     # Combine existing and new PDFs for backward compatibility
     all_pdfs = existing_pdfs + new_pdfs
 
-    context = {
+    return {
         "search_terms": search_terms,
         "date": date,
         "results": results,
@@ -213,12 +811,3 @@ def send_email(
             "case_status_url": case_status_url or settings.CASE_SEARCH_URL,
         },
     }
-    try:
-        emailer.send_email(
-            recipients=email_list,
-            subject=f"Cause List Search Results for {search_terms} on {date}",
-            template_name="cause_list_template.html",
-            context=context,
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error sending email: {e}")
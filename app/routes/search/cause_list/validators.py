@@ -3,12 +3,20 @@ from typing import Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, validator
 
+from app.managers.result_tracker import NOTIFY_MODES
+
 
 class SearchRequest(BaseModel):
     search_terms: List[str]
     date: Optional[str]
     recipient_emails: Optional[List[EmailStr]]
     case_details: Optional[Dict[str, str]]
+    # Process all dates of a weekend expansion as one task with one email
+    digest: bool = False
+    # "always" or "on_change"; defaults to the NOTIFY_MODE setting
+    notify_mode: Optional[str]
+    # Record a sampling profile of the search, see GET /search/tasks/{id}/profile
+    profile: bool = False
 
     @validator("search_terms")
     def validate_search_terms(cls, values):
@@ -37,3 +45,9 @@ class SearchRequest(BaseModel):
             if not all(isinstance(v, str) for v in value.values()):
                 raise ValueError("All values in case_details must be strings.")
         return value
+
+    @validator("notify_mode")
+    def validate_notify_mode(cls, value):
+        if value and value not in NOTIFY_MODES:
+            raise ValueError(f"notify_mode must be one of: {', '.join(NOTIFY_MODES)}.")
+        return value
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from app.managers.pdf_cache import pdf_cache
+from app.routes.search.lookup.controllers import lookup
+
+router = APIRouter()
+
+
+@router.get("")
+async def lookup_cause_lists(
+    search_terms: List[str] = Query(...), date: Optional[str] = None
+):
+    """
+    Where search_terms are listed on a date (default tomorrow), answered from
+    the cached cause lists. While the cache is cold, answers 202 with what it
+    has and the id of a queued task that fills it.
+    """
+    if not pdf_cache.enabled:
+        raise HTTPException(
+            status_code=503, detail="Lookups need the PDF cache (PDF_CACHE_TTL)"
+        )
+    search_terms = [term.strip() for term in search_terms if term.strip()]
+    if not search_terms:
+        raise HTTPException(
+            status_code=422, detail="At least one search term is required."
+        )
+    if date:
+        date = date.strip()
+        try:
+            datetime.strptime(date, "%d/%m/%Y")
+        except ValueError:
+            raise HTTPException(
+                status_code=422, detail="Invalid date format. Use DD/MM/YYYY."
+            )
+    else:
+        date = (datetime.now() + timedelta(days=1)).strftime("%d/%m/%Y")
+
+    answer = await lookup(search_terms, date)
+    if not answer["complete"]:
+        return JSONResponse(answer, status_code=202)
+    return answer
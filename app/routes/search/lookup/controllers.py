@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.managers.pdf_cache import pdf_cache
+from app.managers.pdf_searcher import PDFSearcher
+from app.managers.progress import progress_hub
+from app.managers.queue import queue_manager
+from app.managers.scraper import Scraper
+from app.routes.search.cause_list.controllers import search_schedule, search_task_id
+from app.utils.log import get_logger
+from app.utils.metrics import span
+
+logger = get_logger(__name__)
+
+
+def cached_lookup(search_terms: List[str], date: str) -> Dict[str, Any]:
+    """
+    Search the cached text of a date's cause lists.
+
+    Returns:
+        The hits, plus "complete": False (and the PDFs left unsearched) when the
+        date's cause lists were not scraped within LOOKUP_MAX_AGE or some of
+        them have no cached text
+    """
+    cause_lists = pdf_cache.get_cause_list(date, settings.LOOKUP_MAX_AGE)
+    if cause_lists is None:
+        return {"complete": False, "cause_lists": None, "results": []}
+    pdfs, fetched_at = cause_lists
+
+    results, unsearched = [], []
+    for pdf in pdfs:
+        pages = pdf_cache.get_pages(pdf["pdf_url"])
+        if pages is None:
+            unsearched.append(pdf)
+            continue
+        found_pages = PDFSearcher.find_terms(pages, search_terms)
+        if any(found_pages.values()):
+            results.append(
+                {
+                    "pdf_name": pdf["pdf_name"],
+                    "pdf_url": pdf["pdf_url"],
+                    "found_pages": found_pages,
+                    "num_pages": len(pages),
+                }
+            )
+    return {
+        "complete": not unsearched,
+        "cause_lists": len(pdfs),
+        "cause_lists_fetched_at": datetime.fromtimestamp(fetched_at).isoformat(),
+        "unsearched": unsearched,
+        "results": results,
+    }
+
+
+async def lookup(search_terms: List[str], date: str) -> Dict[str, Any]:
+    """
+    Answer a lookup from the cache, or queue a task that fills the cache.
+
+    Returns:
+        The cached answer, with "task_id" set if a cache fill was queued
+    """
+    with span("lookup", date=date) as fields:
+        answer = await asyncio.to_thread(cached_lookup, search_terms, date)
+        fields["complete"] = answer["complete"]
+
+    task_id = None
+    if not answer["complete"]:
+        task_id = await queue_lookup_task(search_terms, date)
+    return {
+        "date": date,
+        "search_terms": search_terms,
+        "listed": bool(answer["results"]),
+        **answer,
+        "task_id": task_id,
+    }
+
+
+async def queue_lookup_task(search_terms: List[str], date: str) -> str:
+    """Queue a task that scrapes a date's cause lists into the cache."""
+    await queue_manager.start_processor()
+
+    search_id = search_task_id(search_terms, date)
+    task_id = "lookup_" + search_id[len("search_") :]
+    if task_id in queue_manager.running_tasks:
+        return task_id
+    priority, order_key, deadline = search_schedule(date)
+    task = await queue_manager.add_task(
+        fill_lookup_cache,
+        search_terms,
+        date,
+        task_id,
+        max_attempts=3,
+        task_id=task_id,
+        priority=priority,
+        order_key=order_key,
+        deadline=deadline,
+        # A lookup for the same terms and date is already on its way
+        on_duplicate=lambda pending: None,
+    )
+    return task.task_id
+
+
+async def fill_lookup_cache(
+    search_terms: List[str], date: str, task_id: Optional[str] = None
+) -> None:
+    """
+    Scrape a date's cause lists and extract their text into the PDF cache,
+    reporting the hits for search_terms as progress events. Sends no email.
+    """
+    scraper = Scraper()
+
+    def cause_list_pdfs():
+        with span("cause_list_scrape", date=date) as fields:
+            pdfs = scraper.fetch_cause_list_pdfs(date)
+            fields["pdfs"] = len(pdfs)
+        return pdfs
+
+    def on_result(pdf: Dict[str, str], result: Optional[Dict[str, Any]]) -> None:
+        progress_hub.publish(
+            task_id,
+            "pdf_searched",
+            date=date,
+            pdf_name=pdf["pdf_name"],
+            pdf_url=pdf["pdf_url"],
+            num_pages=pdf.get("num_pages"),
+            found_pages=(
+                result["found_pages"] if result else {term: [] for term in search_terms}
+            ),
+        )
+
+    pdfs = await asyncio.to_thread(cause_list_pdfs)
+    progress_hub.publish(
+        task_id, "pdfs_found", date=date, pdfs=[dict(pdf) for pdf in pdfs]
+    )
+
+    results = []
+    if pdfs:
+        searcher = PDFSearcher(search_terms=search_terms)
+        with span("pdf_search", date=date, pdfs=len(pdfs)) as fields:
+            results = await asyncio.to_thread(searcher.search_pdf, pdfs, on_result)
+            fields["results"] = len(results)
+    progress_hub.publish(
+        task_id, "search_complete", date=date, pdfs=len(pdfs), results=len(results)
+    )
+    logger.info("Lookup cache filled for %s: %s Cause List(s)", date, len(pdfs))
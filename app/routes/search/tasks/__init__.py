@@ -0,0 +1,84 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from app.managers.progress import progress_hub
+from app.managers.queue import queue_manager
+from app.utils.profiler import profile_store
+
+router = APIRouter()
+
+
+def progress_events(
+    progress_id: str, last_event_id: Optional[str]
+) -> StreamingResponse:
+    """Stream a task's (or bulk job's) progress events as server-sent events."""
+    try:
+        after = int(last_event_id or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    async def events():
+        async for entry in progress_hub.subscribe(progress_id, after):
+            if entry is None:
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(entry["data"], default=str)
+            yield f"id: {entry['id']}\nevent: {entry['event']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{task_id:path}/events")
+async def stream_task_events(task_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-sent events for a task's progress, from the first event (or the
+    one after Last-Event-ID) until the task is over and its email is out.
+    """
+    if not progress_hub.has_task(task_id):
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return progress_events(task_id, last_event_id)
+
+
+@router.get("/{task_id:path}/profile")
+async def get_task_profile(task_id: str, format: str = "summary"):
+    """
+    Profile of a task's latest run: a JSON summary of the hottest functions,
+    or with format=folded the collapsed stacks for flame graph tools.
+    """
+    if format == "folded":
+        collapsed = profile_store.load_collapsed(task_id)
+        if collapsed is not None:
+            return PlainTextResponse(
+                collapsed,
+                headers={
+                    "Content-Disposition": 'attachment; filename="profile.folded"'
+                },
+            )
+    elif format == "summary":
+        summary = profile_store.load_summary(task_id)
+        if summary is not None:
+            return summary
+    else:
+        raise HTTPException(
+            status_code=400, detail="format must be one of: summary, folded"
+        )
+    raise HTTPException(status_code=404, detail=f"No profile for task {task_id}")
+
+
+@router.delete("/{task_id:path}")
+async def cancel_task(task_id: str):
+    """Cancel a queued or running task."""
+    previous_state = queue_manager.cancel_task(task_id)
+    if previous_state is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return {
+        "task_id": task_id,
+        "status": "cancelling" if previous_state == "running" else "cancelled",
+    }
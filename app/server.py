@@ -2,9 +2,18 @@ import asyncio
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import Response
 
+from app.config import settings
+from app.managers.outbox import outbox
+from app.managers.progress import progress_hub
 from app.managers.queue import queue_manager
+from app.managers.watcher import publication_watcher
 from app.routes import router
+from app.services.emailer import precompile_templates
+from app.services.emailer.pool import smtp_pool
+from app.utils.log import stop_logging
+from app.utils.metrics import CONTENT_TYPE, metrics
 
 # Load environment variables from .env
 load_dotenv()
@@ -17,16 +26,32 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Stage timings and counters in the Prometheus text format."""
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Start the queue processor on application startup."""
+    """Compile email templates, then start the outbox and queue processor."""
+    precompile_templates()
+    # Task event streams end once the task's emails are delivered
+    outbox.add_listener(progress_hub.email_outcome)
+    outbox.start()
     await queue_manager.start_processor()
+    if settings.WATCHER_ENABLED:
+        publication_watcher.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop the queue processor on application shutdown."""
+    """Stop the queue processor, drain the outbox, close SMTP sessions and flush logs."""
+    await publication_watcher.stop()
     await queue_manager.stop_processor()
+    await asyncio.to_thread(outbox.stop, settings.OUTBOX_FLUSH_TIMEOUT)
+    smtp_pool.close()
+    stop_logging()
 
 
 app.include_router(router)
@@ -1,12 +1,56 @@
-import smtplib
+import os
+import tempfile
 from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from typing import Any, Dict, List
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 from app.config import settings
+from app.services.emailer.pool import smtp_pool
+from app.utils.log import get_logger
+from app.utils.metrics import EMAILS, span
+
+logger = get_logger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+def _create_environment() -> Environment:
+    """
+    Build the shared template environment.
+
+    Compiled templates are kept in memory for the life of the process and
+    their bytecode is cached on disk (TEMPLATE_CACHE_DIR, under /tmp by
+    default so it also works on Lambda), so a fresh process skips parsing.
+    Templates only change on deploy, so they are not re-checked for edits.
+    """
+    cache_dir = settings.TEMPLATE_CACHE_DIR or os.path.join(
+        tempfile.gettempdir(), "cause-list-checker-templates"
+    )
+    bytecode_cache = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    except OSError as e:
+        logger.warning("Template bytecode cache disabled: %s", e)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+template_env = _create_environment()
+
+
+def precompile_templates() -> None:
+    """Compile every email template ahead of the first email."""
+    for template_name in template_env.list_templates(extensions=["html"]):
+        template_env.get_template(template_name)
 
 
 class Emailer:
@@ -16,27 +60,32 @@ class Emailer:
         self.sender_name = settings.SENDER_NAME
         self.smtp_server = settings.SMTP_SERVER
         self.smtp_port = settings.SMTP_PORT
-        self.env = Environment(
-            loader=FileSystemLoader("app/services/emailer/templates"),
-            autoescape=True,
-        )
+        self.pool = smtp_pool
+        self.env = template_env
 
-    def send_email(
-        self,
-        recipients: List[str],
-        subject: str,
-        template_name: str,
-        context: Dict[str, Any],
-    ) -> None:
+    def render(self, template_name: str, context: Dict[str, Any]) -> str:
+        """Render an email template to HTML."""
+        with span("email_render", template=template_name) as fields:
+            template = self.env.get_template(template_name)
+            html = template.render(
+                {
+                    **context,
+                    "generated_timestamp": datetime.now(
+                        timezone(timedelta(hours=5, minutes=30))
+                    ).strftime("%Y-%m-%d %H:%M:%S IST"),
+                }
+            )
+            fields["bytes"] = len(html)
+        return html
+
+    def send_html(self, recipients: List[str], subject: str, html_content: str) -> None:
         """
-        Send an email using a template
+        Send an already rendered email
 
         Args:
             recipients: List of email addresses
             subject: Email subject
-            template_name: Name of the template file
-            context: Dictionary of variables to pass to the template
-            attachments: Optional list of attachments, each with filename, content, and content_type
+            html_content: Rendered HTML body
         """
         try:
             # Create the email
@@ -44,24 +93,31 @@ class Emailer:
             msg["From"] = f"{self.sender_name} <{self.sender_email}>"
             msg["To"] = ", ".join(recipients)
             msg["Subject"] = subject
-
-            # Render the HTML template
-            template = self.env.get_template(template_name)
-            html_content = template.render(
-                {
-                    **context,
-                    "generated_timestamp": datetime.now(
-                        timezone(timedelta(hours=5, minutes=30))
-                    ).strftime("%Y-%m-%d %H:%M:%S IST"),
-                }
-            )
             msg.attach(MIMEText(html_content, "html"))
 
-            # Connect to the SMTP server
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipients, msg.as_string())
+            # Send over a pooled, already authenticated session
+            with span("smtp_send", recipients=len(recipients)):
+                self.pool.sendmail(self.sender_email, recipients, msg.as_string())
+            EMAILS.inc(outcome="sent")
         except Exception as e:
-            print(f"Error sending email: {e}", flush=True)
+            EMAILS.inc(outcome="failed")
+            logger.error("Error sending email: %s", e)
             raise e
+
+    def send_email(
+        self,
+        recipients: List[str],
+        subject: str,
+        template_name: str,
+        context: Dict[str, Any],
+    ) -> None:
+        """
+        Send an email using a template
+
+        Args:
+            recipients: List of email addresses
+            subject: Email subject
+            template_name: Name of the template file
+            context: Dictionary of variables to pass to the template
+        """
+        self.send_html(recipients, subject, self.render(template_name, context))
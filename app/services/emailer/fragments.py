@@ -0,0 +1,97 @@
+"""
+HTML Fragment Renderer
+
+Renders the HTML snippets embedded in result emails (case details, judge
+cause list tables) from the templates in templates/fragments, using the
+shared compiled environment so values are escaped. Rendered fragments are
+kept in a small LRU cache keyed by a hash of the input payload, so the same
+case shown for several dates or recipients is only built once.
+"""
+
+import hashlib
+import json
+import marshal
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.services.emailer import template_env
+
+
+class FragmentCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: str, html: str) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+fragment_cache = FragmentCache(settings.FRAGMENT_CACHE_SIZE)
+
+
+def payload_key(template_name: str, payload: Dict[str, Any]) -> str:
+    """
+    Hash a template name and its input payload into a cache key.
+
+    Payloads are parsed API JSON, which marshal serialises several times
+    faster than json.dumps; the key is only used within this process. Other
+    values fall back to JSON.
+    """
+    try:
+        encoded = marshal.dumps(payload)
+    except ValueError:
+        encoded = json.dumps(
+            payload, sort_keys=True, default=str, separators=(",", ":")
+        ).encode()
+    return hashlib.sha256(template_name.encode() + b"\0" + encoded).hexdigest()
+
+
+def render_fragment(
+    template_name: str,
+    payload: Dict[str, Any],
+    prepare: Optional[Callable[..., Dict[str, Any]]] = None,
+) -> str:
+    """
+    Render a fragment template, reusing an earlier rendering of the same payload.
+
+    Args:
+        template_name: Template path under the emailer templates directory
+        payload: Raw input data; its hash is the cache key
+        prepare: Optional function turning the payload (as keyword arguments)
+            into the template context; only called on a cache miss
+
+    Returns:
+        Rendered HTML
+    """
+    key = payload_key(template_name, payload)
+    html = fragment_cache.get(key)
+    if html is None:
+        context = prepare(**payload) if prepare else payload
+        html = template_env.get_template(template_name).render(context)
+        fragment_cache.put(key, html)
+    return html
@@ -0,0 +1,182 @@
+"""
+SMTP Connection Pool
+
+Keeps authenticated SMTP sessions open between emails so that messages sent
+in close succession share one connect + STARTTLS + login handshake. Idle
+sessions are checked with NOOP before reuse, sessions older than the max age
+are closed, and a session that turns out to be dead is replaced with a fresh
+one transparently.
+"""
+
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, List, Optional
+
+from app.config import settings
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Errors that mean the session itself is unusable and must not go back to the pool
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, OSError)
+
+
+class PooledConnection:
+    def __init__(self, server: smtplib.SMTP) -> None:
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def close(self) -> None:
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        size: int = 2,
+        max_age: float = 300.0,
+        noop_after: float = 30.0,
+        timeout: float = 30.0,
+        starttls: bool = True,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_age = max_age
+        self.noop_after = noop_after
+        self.timeout = timeout
+        self.starttls = starttls
+        self._idle: Deque[PooledConnection] = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self.connects = 0
+        self.reuses = 0
+
+    def _connect(self) -> PooledConnection:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        return PooledConnection(server)
+
+    def _is_usable(self, connection: PooledConnection) -> bool:
+        now = time.monotonic()
+        if now - connection.created_at >= self.max_age:
+            return False
+        if now - connection.last_used < self.noop_after:
+            return True
+        try:
+            return connection.server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _take_idle(self) -> Optional[PooledConnection]:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection = self._idle.pop()
+            if self._is_usable(connection):
+                return connection
+            connection.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """
+        Check out an authenticated session, returning it to the pool afterwards.
+
+        Sessions that raised a connection error are closed instead of returned.
+        """
+        with self._slots:
+            connection = self._take_idle()
+            if connection is None:
+                connection = self._connect()
+            else:
+                self.reuses += 1
+            try:
+                yield connection
+            except CONNECTION_ERRORS:
+                connection.close()
+                raise
+            except smtplib.SMTPException:
+                # Protocol-level failure (e.g. a rejected recipient); reset the
+                # transaction so the session can be used again
+                try:
+                    connection.server.rset()
+                except Exception:
+                    connection.close()
+                    raise
+                self._release(connection)
+                raise
+            else:
+                self._release(connection)
+
+    def _release(self, connection: PooledConnection) -> None:
+        connection.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(connection)
+
+    def sendmail(self, from_addr: str, to_addrs: List[str], message: str) -> None:
+        """
+        Send a message over a pooled session.
+
+        A reused session can have been dropped by the server since the NOOP
+        check; in that case the message is sent once more over a new session.
+        """
+        for attempt in range(2):
+            reused = self._idle_count() > 0
+            try:
+                with self.connection() as connection:
+                    connection.server.sendmail(from_addr, to_addrs, message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                if attempt or not reused:
+                    raise
+                logger.info(
+                    "SMTP Pool: Pooled session was closed by the server, reconnecting"
+                )
+
+    def _idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def close(self) -> None:
+        """Close every idle session."""
+        with self._lock:
+            connections = list(self._idle)
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+smtp_pool = SMTPConnectionPool(
+    host=settings.SMTP_SERVER,
+    port=settings.SMTP_PORT,
+    username=settings.SENDER_EMAIL,
+    password=settings.SENDER_PASSWORD,
+    size=settings.SMTP_POOL_SIZE,
+    max_age=settings.SMTP_MAX_AGE,
+    noop_after=settings.SMTP_NOOP_AFTER,
+    timeout=settings.SMTP_TIMEOUT,
+    starttls=settings.SMTP_STARTTLS,
+)
@@ -0,0 +1,88 @@
+"""
+Task time budgets and cooperative cancellation.
+
+A TaskBudget carries the deadline and cancel flag of the task being run. The
+queue makes it current for the task; blocking code further down (HTTP
+requests, PDF downloads and parsing) picks it up with current_budget(), trims
+its timeouts to the time that is left and checks for cancellation between
+steps. Code running without a budget gets an unlimited one.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple, Union
+
+Timeout = Union[float, Tuple[float, float]]
+
+_current_budget: contextvars.ContextVar[Optional["TaskBudget"]] = (
+    contextvars.ContextVar("task_budget", default=None)
+)
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task that was cancelled."""
+
+
+class BudgetExhausted(TaskCancelled):
+    """Raised inside a task that ran out of time."""
+
+
+class TaskBudget:
+    def __init__(self, deadline: Optional[float] = None) -> None:
+        self.deadline = deadline
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None if there is no deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    def check(self) -> None:
+        """Raise if the task was cancelled or its time is up."""
+        if self.cancel_requested:
+            raise TaskCancelled("Task was cancelled")
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise BudgetExhausted("Task ran out of time")
+
+    def timeout(self, timeout: Timeout) -> Timeout:
+        """Trim a requests-style timeout so it does not outlast the budget."""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep, waking early if the task is cancelled or runs out of time."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self._cancel_event.wait(seconds)
+        self.check()
+
+
+def current_budget() -> TaskBudget:
+    """Return the budget of the task being run, or an unlimited one."""
+    return _current_budget.get() or TaskBudget()
+
+
+@contextmanager
+def use_budget(budget: TaskBudget) -> Iterator[TaskBudget]:
+    """Make budget current for this context, including asyncio.to_thread calls."""
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
@@ -0,0 +1,198 @@
+"""
+HTTP Cassette
+
+Records the HTTP traffic of real searches (the cause list form, every PHHC API
+call and every PDF download) to a cassette directory, and replays it later in
+place of the network. Searches can then be profiled and benchmarked offline
+against real pages, payloads and PDFs, with their quirks intact.
+
+A cassette is an index.jsonl of request/response records (method, URL, a hash
+of the request body, status, content type, body hash and the time the response
+took) plus a bodies/ directory of gzipped response bodies named by their hash,
+so a PDF downloaded for several searches is stored once.
+
+Enabled with HTTP_CASSETTE_MODE: "record" passes requests through and records
+them, "replay" answers them from HTTP_CASSETTE_DIR. The same request recorded
+several times is replayed in recorded order, repeating the last response once
+they run out. HTTP_CASSETTE_LATENCY_SCALE replays each response after its
+recorded time (1.0) or a multiple of it; the default 0 answers at once.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """Raised in replay mode for a request the cassette has no response for."""
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    body_hash = hashlib.sha256(body).hexdigest()[:16]
+    return f"{request.method} {request.url} {body_hash}"
+
+
+class Cassette:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.bodies_dir = os.path.join(directory, "bodies")
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self._lock = threading.Lock()
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.bodies_dir, body_hash + ".gz")
+
+    def record(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        elapsed: float,
+    ) -> None:
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()[:32]
+        entry = {
+            "key": request_key(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "content_type": response.headers.get("Content-Type", ""),
+            "body": body_hash,
+            "size": len(content),
+            "elapsed": round(elapsed, 4),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            os.makedirs(self.bodies_dir, exist_ok=True)
+            body_path = self._body_path(body_hash)
+            if not os.path.exists(body_path):
+                with gzip.open(body_path + ".tmp", "wb") as f:
+                    f.write(content)
+                os.replace(body_path + ".tmp", body_path)
+            with open(self.index_path, "a") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def load(self) -> Dict[str, List[dict]]:
+        """Recorded responses by request key, in recorded order."""
+        entries: Dict[str, List[dict]] = {}
+        try:
+            with open(self.index_path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries.setdefault(entry["key"], []).append(entry)
+        except FileNotFoundError:
+            logger.warning("HTTP Cassette: No cassette at %s", self.directory)
+        return entries
+
+    def read_body(self, body_hash: str) -> bytes:
+        with gzip.open(self._body_path(body_hash), "rb") as f:
+            return f.read()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests over the network and records each response."""
+
+    def __init__(self, cassette: Cassette, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Reads the whole body; callers that stream get it from memory
+        response.content
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers requests from a cassette instead of the network."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 0.0) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.entries = cassette.load()
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _next_entry(self, key: str) -> Optional[dict]:
+        with self._lock:
+            recorded = self.entries.get(key)
+            if not recorded:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return recorded[min(position, len(recorded) - 1)]
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        entry = self._next_entry(request_key(request))
+        if entry is None:
+            raise CassetteMiss(
+                f"No recorded response for {request.method} {request.url}",
+                request=request,
+            )
+        if self.latency_scale > 0:
+            time.sleep(entry["elapsed"] * self.latency_scale)
+
+        content = self.cassette.read_body(entry["body"])
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(
+            {"Content-Type": entry["content_type"], "Content-Length": str(len(content))}
+        )
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.raw = io.BytesIO(content)
+        response._content = content
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+# Shared by every session the process creates, so a replaced session carries on
+# where the last one stopped in the cassette
+_cassettes: Dict[str, Cassette] = {}
+_replay_adapters: Dict[str, ReplayAdapter] = {}
+_lock = threading.Lock()
+
+
+def cassette_adapter(
+    mode: str, directory: str, latency_scale: float, **adapter_kwargs
+) -> Optional[BaseAdapter]:
+    """The adapter for a cassette mode, or None when the cassette is off."""
+    if mode not in (RECORD, REPLAY):
+        if mode:
+            logger.warning("HTTP Cassette: Unknown mode '%s', ignoring", mode)
+        return None
+    with _lock:
+        cassette = _cassettes.setdefault(directory, Cassette(directory))
+        if mode == RECORD:
+            # A new connection pool per session, like the plain adapter
+            return RecordingAdapter(cassette, **adapter_kwargs)
+        if directory not in _replay_adapters:
+            _replay_adapters[directory] = ReplayAdapter(cassette, latency_scale)
+        return _replay_adapters[directory]
@@ -1,11 +1,15 @@
 import traceback
-from typing import Tuple
+from typing import Tuple, Union
 
+from app.managers.outbox import Outbox
 from app.services.emailer import Emailer
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
 
 
 class ErrorHandler:
-    def __init__(self, emailer: Emailer, recipients: list) -> None:
+    def __init__(self, emailer: Union[Emailer, Outbox], recipients: list) -> None:
         self.emailer = emailer
         self.recipients = recipients
 
@@ -13,7 +17,7 @@ class ErrorHandler:
         error_message = str(exception)
         stack_trace = traceback.format_exc()
 
-        print(f"Stack trace:\n{stack_trace}", flush=True)
+        logger.error("Stack trace:\n%s", stack_trace)
 
         context.update({"error_message": error_message})
 
@@ -25,6 +29,6 @@ class ErrorHandler:
                 context=context,
             )
         except Exception as email_error:
-            print(f"Error sending error email: {email_error}")
+            logger.error("Error sending error email: %s", email_error)
 
         return error_message, stack_trace
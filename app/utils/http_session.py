@@ -0,0 +1,81 @@
+"""
+Shared HTTP Session
+
+One requests session, and with it one connection pool, shared by the scraper
+and the PDF searcher. Keep-alive connections to the court's servers are then
+reused across requests, searches and warm Lambda invocations instead of a TLS
+handshake per request. The session is replaced after HTTP_SESSION_MAX_AGE
+seconds, or when a connection error suggests its pooled connections went stale.
+"""
+
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.config import settings
+from app.utils.cassette import cassette_adapter
+from app.utils.reuse import reuse_stats
+
+_session: Optional[requests.Session] = None
+_created_at = 0.0
+_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    """Create a new session with retry logic and SSL verification"""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1.0,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET", "POST"],
+        raise_on_status=False,
+    )
+    # Room for every PDF download of every date searched at once
+    adapter_kwargs = dict(max_retries=retry, pool_connections=10, pool_maxsize=40)
+    # Recording or replaying traffic, see app.utils.cassette
+    adapter = cassette_adapter(
+        settings.HTTP_CASSETTE_MODE,
+        settings.HTTP_CASSETTE_DIR,
+        settings.HTTP_CASSETTE_LATENCY_SCALE,
+        **adapter_kwargs,
+    ) or HTTPAdapter(**adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.verify = certifi.where()
+    # Requests used to get a fresh session each; keep them independent of
+    # whatever cookies other requests (or threads) were given
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it if it is missing or too old."""
+    global _session, _created_at
+    with _lock:
+        age = time.monotonic() - _created_at
+        if _session is not None and age < settings.HTTP_SESSION_MAX_AGE:
+            reuse_stats.reused("http_session")
+            return _session
+        # Requests still running on the old session finish on their own
+        _session = _create_session()
+        _created_at = time.monotonic()
+        reuse_stats.fresh("http_session")
+        return _session
+
+
+def reset_session(session: requests.Session) -> None:
+    """
+    Drop session after a connection error, unless another thread has already
+    replaced it.
+    """
+    global _session
+    with _lock:
+        if _session is session:
+            _session = None
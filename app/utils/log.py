@@ -0,0 +1,169 @@
+"""
+Logging
+
+Structured logging for the app and the Lambda handler, in place of print.
+
+Records are formatted where they are logged, but only when their level is
+enabled; arguments that are expensive to render (result sets as JSON) are
+wrapped in lazy_json so they are never serialised for a disabled level. In
+the Docker app the formatted records are then handed to a queue and written
+to stdout by a background thread, so neither the event loop nor the worker
+threads wait on the write. Lambda writes directly, so nothing is left
+unwritten when the container is frozen between invocations.
+
+LOG_FORMAT "json" writes one JSON object per line, with any fields passed
+in extra= as keys; "text" writes plain lines. By default Lambda logs JSON
+(for CloudWatch Logs Insights) and the Docker app text.
+
+Messages that can repeat for every page or request (a PDF with hundreds of
+unreadable pages) are logged with extra=SAMPLED: of those, only the first
+LOG_SAMPLE_BURST per message and logger are written in each LOG_SAMPLE_WINDOW
+seconds, and the next one written reports how many were dropped.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+ROOT_LOGGER = "cause_list"
+# Pass as extra= to rate-limit a noisy message
+SAMPLED = {"sampled": True}
+
+# Attributes every LogRecord has; anything else came from extra=
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "sampled",
+}
+
+
+class lazy_json:
+    """Serialise an object to JSON only if the log message is formatted."""
+
+    def __init__(self, value: Any, indent: Optional[int] = 2) -> None:
+        self.value = value
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, indent=self.indent, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Let through the first `burst` sampled records per message each window."""
+
+    def __init__(self, burst: int, window: float) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        # (logger, message template) -> [window start, passed, dropped]
+        self._counts: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None or now - counts[0] >= self.window:
+                dropped = counts[2] if counts else 0
+                counts = self._counts[key] = [now, 0, 0]
+            else:
+                dropped = 0
+            if counts[1] >= self.burst:
+                counts[2] += 1
+                return False
+            counts[1] += 1
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            line += f" ({suppressed} similar message(s) suppressed)"
+        return line
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def _configure() -> None:
+    global _listener, _configured
+    on_lambda = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
+    log_format = settings.LOG_FORMAT or ("json" if on_lambda else "text")
+
+    formatter = JsonFormatter() if log_format == "json" else TextFormatter()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if on_lambda:
+        handler: logging.Handler = stream_handler
+    else:
+        # QueueHandler formats in the logging thread; the listener only writes
+        handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+        _listener = logging.handlers.QueueListener(handler.queue, stream_handler)
+        _listener.start()
+        atexit.register(stop_logging)
+    handler.setFormatter(formatter)
+    handler.addFilter(
+        SamplingFilter(settings.LOG_SAMPLE_BURST, settings.LOG_SAMPLE_WINDOW)
+    )
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.addHandler(handler)
+    # Lambda's runtime puts its own handler on the root logger
+    root.propagate = False
+    _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module, e.g. get_logger(__name__)."""
+    with _configure_lock:
+        if not _configured:
+            _configure()
+    if name.startswith("app."):
+        name = name[len("app.") :]
+    return logging.getLogger(ROOT_LOGGER).getChild(name)
+
+
+def stop_logging() -> None:
+    """Write out queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,216 @@
+"""
+Metrics
+
+Timings and counters for the stages of a search: the cause list scrape, each
+PHHC API endpoint, PDF downloads and text extraction, email rendering and SMTP
+delivery. They are kept in process and served in the Prometheus text format
+on /metrics. On Lambda, where nothing scrapes the process, every timed stage
+is also logged, as a JSON log line with an "event": "span" field.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from app.utils.log import get_logger
+from app.utils.reuse import reuse_stats
+
+logger = get_logger(__name__)
+
+# Starlette appends "; charset=utf-8"
+CONTENT_TYPE = "text/plain; version=0.0.4"
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Lambda has no /metrics to scrape, so spans go to the log instead
+LOG_SPANS = os.environ.get("AWS_LAMBDA_FUNCTION_NAME") is not None
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, Any]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(list(zip(self.label_names, key)))
+                lines.append(f"{self.name}{labels} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (count per bucket, sum, count)
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._values.items()):
+                pairs = list(zip(self.label_names, key))
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    labels = _format_labels(pairs + [("le", f"{bound:g}")])
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(pairs + [("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(pairs)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(pairs)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(
+        self, name: str, help_text: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        # State reused between searches (see app.utils.reuse)
+        name = "cause_list_reuse_total"
+        lines.append(f"# HELP {name} Lookups of reusable state by outcome")
+        lines.append(f"# TYPE {name} counter")
+        for kind, counts in sorted(reuse_stats.snapshot().items()):
+            for outcome, value in sorted(counts.items()):
+                labels = _format_labels([("kind", kind), ("outcome", outcome)])
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "cause_list_stage_duration_seconds",
+    "Time spent in each stage of a search",
+    ("stage",),
+)
+STAGE_ERRORS = metrics.counter(
+    "cause_list_stage_errors_total",
+    "Stages that ended with an exception",
+    ("stage",),
+)
+HTTP_SECONDS = metrics.histogram(
+    "cause_list_http_request_duration_seconds",
+    "Time per HTTP request made by the scraper, by endpoint",
+    ("method", "endpoint"),
+)
+HTTP_REQUESTS = metrics.counter(
+    "cause_list_http_requests_total",
+    "HTTP requests made by the scraper, by endpoint and outcome",
+    ("method", "endpoint", "outcome"),
+)
+PDF_BYTES = metrics.counter(
+    "cause_list_pdf_downloaded_bytes_total", "Bytes of cause list PDFs downloaded"
+)
+PDF_PAGES = metrics.counter(
+    "cause_list_pdf_parsed_pages_total", "Cause list PDF pages extracted"
+)
+EMAILS = metrics.counter(
+    "cause_list_emails_total", "Emails handed to SMTP, by outcome", ("outcome",)
+)
+
+
+def log_span(stage: str, duration: float, **fields: Any) -> None:
+    """Log a timed stage when running on Lambda."""
+    if LOG_SPANS:
+        duration_ms = round(duration * 1000, 1)
+        logger.info(
+            "%s took %sms",
+            stage,
+            duration_ms,
+            extra={
+                "event": "span",
+                "stage": stage,
+                "duration_ms": duration_ms,
+                **fields,
+            },
+        )
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a stage of a search.
+
+    Yields a dict of extra fields (sizes, counts) that the caller can add to;
+    they are only used for the Lambda log line, not as metric labels.
+    """
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        STAGE_ERRORS.inc(stage=stage)
+        fields["error"] = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_SECONDS.observe(duration, stage=stage)
+        log_span(stage, duration, **fields)
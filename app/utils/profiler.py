@@ -0,0 +1,199 @@
+"""
+Task Profiler
+
+A sampling profiler for queued tasks. While a profiled task runs, a
+background thread takes the Python stack of every thread every
+PROFILE_SAMPLE_INTERVAL seconds and counts the stacks that pass through the
+app's code: the controller on the event loop, its asyncio.to_thread calls and
+the search_pdf download pool alike. Stacks without app code (idle workers,
+the event loop waiting) are left out, and so is the email outbox thread,
+which delivers for every task. The queue runs one task or batch at a time, so
+what is sampled while it runs belongs to it.
+
+Nothing runs unless a task asks to be profiled. Profiles are kept under
+PROFILE_DIR, one per task id (the latest attempt), as collapsed stacks for
+flame graph tools plus a JSON summary of the hottest functions.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(APP_ROOT)
+# Threads that serve every task, not the one being profiled
+IGNORED_THREADS = {"email-outbox", "task-profiler"}
+SUMMARY_TOP = 25
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(PROJECT_ROOT):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self._thread = threading.Thread(
+            target=self._run, name="task-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.time() - self.started_at
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if names.get(thread_id) in IGNORED_THREADS:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_ROOT)
+                    stack.append(code)
+                    frame = frame.f_back
+                if in_app:
+                    # Root first, as collapsed stack formats expect
+                    self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """One "frame;frame;frame count" line per distinct stack."""
+        lines = [
+            ";".join(_frame_label(code) for code in stack) + f" {count}"
+            for stack, count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        app_counts: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[_frame_label(stack[-1])] += count
+            for code in set(stack):
+                total_counts[_frame_label(code)] += count
+                if code.co_filename.startswith(APP_ROOT):
+                    app_counts[_frame_label(code)] += count
+
+        def top(counts: Counter) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "function": label,
+                    "samples": count,
+                    "seconds": round(count * self.interval, 3),
+                }
+                for label, count in counts.most_common(SUMMARY_TOP)
+            ]
+
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration, 3),
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            # Thread-samples; several threads sampled at once can exceed duration
+            "stack_samples": sum(self.stacks.values()),
+            "top_self": top(self_counts),
+            "top_total": top(total_counts),
+            # Inclusive time of the app's own functions
+            "top_app": top(app_counts),
+        }
+
+
+class ProfileStore:
+    def __init__(self, directory: str, max_profiles: int) -> None:
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def _paths(self, task_id: str) -> Tuple[str, str]:
+        key = hashlib.sha256(task_id.encode()).hexdigest()[:32]
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".folded"
+
+    def _write(self, path: str, data: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self, task_ids: List[str], profiler: SamplingProfiler) -> None:
+        collapsed = profiler.collapsed()
+        summary = profiler.summary()
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                for task_id in task_ids:
+                    summary_path, collapsed_path = self._paths(task_id)
+                    self._write(collapsed_path, collapsed)
+                    self._write(
+                        summary_path,
+                        json.dumps({"task_id": task_id, "batch": task_ids, **summary}),
+                    )
+            except OSError as e:
+                logger.error("Profiler: Error saving profile: %s", e)
+                return
+            self._evict()
+
+    def _evict(self) -> None:
+        """Keep the newest max_profiles profiles."""
+        try:
+            summaries = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".json")
+            ]
+            summaries.sort(key=os.path.getmtime, reverse=True)
+            for summary_path in summaries[self.max_profiles :]:
+                os.remove(summary_path)
+                os.remove(summary_path[: -len(".json")] + ".folded")
+        except OSError:
+            pass
+
+    def load_summary(self, task_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._paths(task_id)[0]) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_collapsed(self, task_id: str) -> Optional[str]:
+        try:
+            with open(self._paths(task_id)[1]) as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
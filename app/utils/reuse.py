@@ -0,0 +1,39 @@
+"""
+Reuse Counters
+
+Counts how often state kept between searches (the HTTP session, the active
+judges list, cached PDFs and their extracted text, tracker state read from
+SSM) was reused instead of being built again. The Lambda handler reports and
+resets them on every invocation, which shows what a warm container saved.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict
+
+
+class ReuseStats:
+    def __init__(self) -> None:
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"reused": 0, "fresh": 0}
+        )
+        self._lock = threading.Lock()
+
+    def reused(self, name: str) -> None:
+        with self._lock:
+            self._counts[name]["reused"] += 1
+
+    def fresh(self, name: str) -> None:
+        with self._lock:
+            self._counts[name]["fresh"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._counts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+reuse_stats = ReuseStats()
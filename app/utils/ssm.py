@@ -0,0 +1,92 @@
+"""
+SSM Parameter
+
+JSON state kept in an SSM Parameter Store parameter by the trackers on
+Lambda. A warm container remembers the version it last read or wrote: every
+read still fetches the parameter, since other containers may have written it
+since, but a version that has not changed is not parsed again.
+"""
+
+import json
+import threading
+from typing import Any, Optional
+
+from app.utils.log import get_logger
+from app.utils.reuse import reuse_stats
+
+logger = get_logger(__name__)
+
+# Returned by SSMParameter.read when the caller's copy is still current
+UNCHANGED = object()
+
+
+class SSMParameter:
+    def __init__(self, name: str, label: str, stat_name: str) -> None:
+        self.name = name
+        self.label = label
+        self.stat_name = stat_name
+        self._client = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("ssm")
+        return self._client
+
+    def read(self) -> Any:
+        """
+        Return the parsed parameter value, UNCHANGED if it is the same version
+        this container last read or wrote, or None if it is missing or
+        unreadable.
+        """
+        with self._lock:
+            try:
+                response = self._get_client().get_parameter(Name=self.name)
+            except Exception as e:
+                self._version = None
+                if "ParameterNotFound" in str(
+                    type(e).__name__
+                ) or "ParameterNotFound" in str(e):
+                    logger.info(
+                        "%s: No SSM parameter found. Starting fresh.", self.label
+                    )
+                else:
+                    logger.warning(
+                        "%s: Error reading SSM: %s. Falling back to empty.",
+                        self.label,
+                        e,
+                    )
+                return None
+
+            version = response["Parameter"].get("Version")
+            if version is not None and version == self._version:
+                reuse_stats.reused(self.stat_name)
+                return UNCHANGED
+
+            reuse_stats.fresh(self.stat_name)
+            try:
+                value = json.loads(response["Parameter"]["Value"])
+            except ValueError as e:
+                logger.error("%s: Error parsing SSM value: %s", self.label, e)
+                self._version = None
+                return None
+            self._version = version
+            return value
+
+    def write(self, value: Any) -> None:
+        with self._lock:
+            try:
+                response = self._get_client().put_parameter(
+                    Name=self.name,
+                    Value=json.dumps(value, separators=(",", ":")),
+                    Type="String",
+                    Overwrite=True,
+                )
+            except Exception as e:
+                self._version = None
+                logger.error("%s: Error writing SSM: %s", self.label, e)
+                return
+            self._version = response.get("Version")
@@ -0,0 +1,170 @@
+"""
+Case details fragment benchmark.
+
+Times building the case details HTML for a case with many judgments, on the
+same payload: the scraper's builder from before the fragment templates
+(baseline_case_details.py), a cold fragment render (context preparation,
+date formatting and template, with both caches cleared), and a repeat render
+of the same payload served from the fragment cache.
+
+Run from the repository root:
+
+    python benchmarks/case_details_benchmark.py [--judgments 1000] [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are required at import time but unused here
+for name in (
+    "AUTH_TOKEN",
+    "CASE_SEARCH_URL",
+    "CL_BASE_URL",
+    "CL_FORM_ACTION_URL",
+    "CL_JUDGE_WISE_REGULAR_URL",
+    "EMAIL_RECIPIENTS",
+    "PHHC_API_BASE_URL",
+    "SENDER_EMAIL",
+    "SENDER_PASSWORD",
+    "SENDER_NAME",
+):
+    os.environ.setdefault(name, "benchmark")
+
+import baseline_case_details  # noqa: E402
+
+from app.managers import scraper as scraper_module  # noqa: E402
+from app.managers.scraper import Scraper  # noqa: E402
+from app.services.emailer.fragments import fragment_cache  # noqa: E402
+
+
+def build_case(judgments: int) -> dict:
+    case_data = {
+        "case_type": "CWP",
+        "case_no": "12345",
+        "case_year": "2023",
+        "status": {"status_desc": "PENDING"},
+        "t_status_date": "2025-08-06T00:00:00",
+        "bench_name": "HON'BLE MR. JUSTICE A",
+        "reg_date": "2023-01-02T00:00:00",
+        "case_diary_no": "D-1",
+        "category": "12",
+        "cat_desc": "Service",
+        "pet_name": "Ram & Co",
+        "res_name": "State of Punjab",
+        "pet_adv_name": "Adv P",
+        "district": {"name": "Ludhiana"},
+        "list_type": "R",
+        "main_case_filling_no": "CWP, 1, 2020",
+        "listing_or_proposal_date": "2026-10-20T00:00:00+05:30",
+    }
+    return {
+        "case_data": case_data,
+        "listing_history": [
+            {
+                "cl_date": f"2025-0{1 + i % 9}-1{i % 10}T00:00:00",
+                "cl_type": "U",
+                "sr_no": i,
+                "benchDetails": {"bench_name": f"Bench {i}"},
+            }
+            for i in range(50)
+        ],
+        "related_cases": [
+            {
+                "case_documents": {
+                    "case_type": "CM",
+                    "case_no": str(100 + i),
+                    "case_year": "2024",
+                },
+                "order_details": [
+                    {"order": f"/orders/cm{i}.pdf", "orderdate": f"2024-05-{1 + i:02d}"}
+                ],
+            }
+            for i in range(5)
+        ],
+        "copy_petition": {
+            "items": [
+                {
+                    "pet_code": "CP",
+                    "petrf_no": 900 + i,
+                    "pet_date": "01-02-2025",
+                    "pet_type": "Urgent",
+                    "applname": "Adv P",
+                    "pet_status": "Ready",
+                }
+                for i in range(5)
+            ]
+        },
+        "impugned_orders": {
+            "authority": "Labour Court",
+            "order_date": "2022-11-03T00:00:00",
+            "order_type": "F",
+            "district": "Ludhiana",
+        },
+        "judgments": [
+            {
+                "orderdate": f"2024-0{1 + i % 9}-0{1 + i % 9}",
+                "order_type": "I" if i % 3 else "F",
+                "bench_name": f"HON'BLE MR. JUSTICE {i}",
+                "order": f"/orders/{i}.pdf",
+            }
+            for i in range(judgments)
+        ],
+    }
+
+
+def measure(label: str, run, runs: int) -> None:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{label:<38} median {statistics.median(timings):8.2f} ms"
+        f"   min {min(timings):8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--judgments", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    scraper = Scraper()
+    case = build_case(args.judgments)
+    print(f"Case details with {args.judgments} judgments, {args.runs} runs\n")
+
+    baseline_case_details.PHHC_API_BASE_URL = scraper.phhc_api_base_url
+
+    def cold():
+        fragment_cache.clear()
+        scraper_module._format_api_date.cache_clear()
+        scraper._build_case_details_html(**case)
+
+    measure(
+        "Baseline builder (concatenation)",
+        lambda: baseline_case_details.build_case_details_html(**case),
+        args.runs,
+    )
+    measure("Fragment render (cache miss)", cold, args.runs)
+    scraper._build_case_details_html(**case)
+    measure(
+        "Fragment render (cache hit)",
+        lambda: scraper._build_case_details_html(**case),
+        args.runs,
+    )
+    html = scraper._build_case_details_html(**case)
+    baseline_html = baseline_case_details.build_case_details_html(**case)
+    print(
+        f"\nRendered {len(html) / 1024:.0f} KiB"
+        f" (baseline {len(baseline_html) / 1024:.0f} KiB, unescaped)"
+    )
+
+
+if __name__ == "__main__":
+    main()
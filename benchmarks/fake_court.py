@@ -0,0 +1,308 @@
+"""
+Local stand-ins for the services a search talks to.
+
+FakeCourt serves the cause list form (view_causeList.php), generated cause
+list PDFs and the PHHC API endpoints used for case details, with configurable
+latency and error rate. StubSMTP accepts mail without TLS and counts it. The
+offline benchmark points the app at both, so it never touches
+highcourtchd.gov.in, the PHHC API or a real mail server.
+"""
+
+import http.server
+import json
+import random
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Found on some pages of every generated cause list
+SEARCH_TERM = "CWP-1234-2024"
+CASE_DETAILS = {"type": "CWP", "no": "1234", "year": "2024"}
+BENCH_NAME = "HON'BLE MR. JUSTICE BENCHMARK ONE"
+LINES_PER_PAGE = 60
+
+
+def build_pdf(index: int, pages: int) -> bytes:
+    """A cause list PDF with pages of case entries, SEARCH_TERM on every fifth."""
+    import fitz
+
+    document = fitz.open()
+    for page_num in range(pages):
+        lines = [
+            f"{row + 1}. CRM-M-{index * 10000 + page_num * 100 + row}-2024 "
+            f"Petitioner {row} vs State of Punjab and others"
+            for row in range(LINES_PER_PAGE)
+        ]
+        if (index + page_num) % 5 == 0:
+            lines[LINES_PER_PAGE // 2] = (
+                f"31. {SEARCH_TERM} Benchmark vs Union of India"
+            )
+        page = document.new_page()
+        page.insert_text((36, 36), "\n".join(lines), fontsize=7)
+    content = document.tobytes()
+    document.close()
+    return content
+
+
+def cause_list_html(date: str, pdfs: int) -> str:
+    date_key = date.replace("/", "-")
+    rows = "".join(
+        f'<tr><td><a href="#" onclick="window.open(\'pdfs/{date_key}/{index}.pdf\')">'
+        f"View</a></td><td>List {index}</td><td>{'Main' if index % 2 == 0 else 'Supplementary'}"
+        "</td></tr>"
+        for index in range(pdfs)
+    )
+    return (
+        "<html><body><table id='tables11'>"
+        "<tr><th colspan='3'>Cause List</th></tr>"
+        "<tr><th>PDF</th><th>List Type</th><th>Main/Sup</th></tr>"
+        f"{rows}</table></body></html>"
+    )
+
+
+class FakeCourt:
+    """The court website and the PHHC API on a local port."""
+
+    def __init__(
+        self,
+        pdfs: int = 5,
+        pages: int = 20,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.pdfs = pdfs
+        self.pages = pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests: Dict[str, int] = {}
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._pdf_bytes: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[http.server.ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def settings_env(self) -> Dict[str, str]:
+        """Environment variables that point the app's settings at this server."""
+        return {
+            "CL_BASE_URL": self.base_url + "/",
+            "CL_FORM_ACTION_URL": self.base_url + "/view_causeList.php",
+            "CL_JUDGE_WISE_REGULAR_URL": self.base_url + "/judge_wise.php",
+            "CASE_SEARCH_URL": self.base_url + "/case_search.php",
+            "PHHC_API_BASE_URL": self.base_url + "/api",
+        }
+
+    def start(self) -> "FakeCourt":
+        court = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            # Keep-alive, like the real servers
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                court._handle(self)
+
+            def do_POST(self) -> None:
+                court._handle(self)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _pdf(self, index: int) -> bytes:
+        with self._lock:
+            if index not in self._pdf_bytes:
+                self._pdf_bytes[index] = build_pdf(index, self.pages)
+            return self._pdf_bytes[index]
+
+    def _handle(self, handler: http.server.BaseHTTPRequestHandler) -> None:
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        url = urlparse(handler.path)
+        endpoint = "/pdfs/" if url.path.startswith("/pdfs/") else url.path
+
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            self._send(handler, 503, b"Service Unavailable", "text/plain")
+            return
+
+        if url.path == "/view_causeList.php":
+            form = parse_qs(body.decode())
+            date = form.get("t_f_date", [""])[0]
+            html = cause_list_html(date, self.pdfs).encode()
+            self._send(handler, 200, html, "text/html")
+        elif url.path.startswith("/pdfs/"):
+            index = int(url.path.rsplit("/", 1)[1].split(".")[0])
+            self._send(handler, 200, self._pdf(index), "application/pdf")
+        elif url.path.startswith("/api/"):
+            data = self._api(url.path[len("/api") :], parse_qs(url.query))
+            if data is None:
+                self._send(handler, 404, b"Not Found", "text/plain")
+            else:
+                self._send(handler, 200, json.dumps(data).encode(), "application/json")
+        else:
+            self._send(handler, 404, b"Not Found", "text/plain")
+
+    def _api(self, path: str, params: Dict[str, list]) -> Optional[object]:
+        if path == "/cis_filing/public/getCase":
+            return {
+                "case_type": CASE_DETAILS["type"],
+                "case_no": CASE_DETAILS["no"],
+                "case_year": CASE_DETAILS["year"],
+                "bench_name": BENCH_NAME,
+                "status": {"status_desc": "PENDING"},
+                "pet_name": "Benchmark",
+                "res_name": "Union of India",
+                "district": {"name": "Chandigarh"},
+                "reg_date": "2024-01-15T00:00:00",
+            }
+        if path == "/case_listing_detail/public/search":
+            today = datetime.now()
+            return {
+                "data": [
+                    {
+                        "cl_date": (today + timedelta(days=day)).strftime(
+                            "%Y-%m-%dT00:00:00"
+                        ),
+                        "cl_type": "REGULAR",
+                        "sr_no": str(10 + day),
+                        "benchDetails": {"bench_name": BENCH_NAME},
+                    }
+                    for day in range(-30, 30, 3)
+                ]
+            }
+        if path == "/cis/judges/active-bench":
+            return [
+                {"judge_name": "MR. JUSTICE BENCHMARK ONE", "judge_code": 1},
+                {"judge_name": "MRS. JUSTICE BENCHMARK TWO", "judge_code": 2},
+            ]
+        if path == "/cis_filing/public/getRegularCauseList":
+            entries = [
+                {
+                    "sr_no": str(row + 1),
+                    "case_type": "CRM-M",
+                    "case_no": str(row + 1000),
+                    "case_year": "2024",
+                    "pet_name": f"Petitioner {row}",
+                    "res_name": "State of Punjab",
+                }
+                for row in range(200)
+            ]
+            entries[42].update(
+                case_type=CASE_DETAILS["type"],
+                case_no=CASE_DETAILS["no"],
+                pet_name="Benchmark",
+            )
+            return entries
+        if path == "/HC-Copying-Applications-Case-Details-Public/":
+            return {"items": []}
+        if path == "/cis_filing/public/getImpugnedOrderDetails":
+            return {}
+        if path == "/cis_filing/public/relatedCases" or path.startswith(
+            "/cis_filing/public/judgmentDetails/"
+        ):
+            return []
+        return None
+
+    @staticmethod
+    def _send(
+        handler: http.server.BaseHTTPRequestHandler,
+        status: int,
+        body: bytes,
+        content_type: str,
+    ) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+class StubSMTP:
+    """An SMTP server that accepts any login and message, without TLS."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def settings_env(self) -> Dict[str, str]:
+        return {
+            "SMTP_SERVER": "127.0.0.1",
+            "SMTP_PORT": str(self.port),
+            "SMTP_STARTTLS": "false",
+        }
+
+    def start(self) -> "StubSMTP":
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str) -> None:
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self) -> None:
+                with stub._lock:
+                    stub.connections += 1
+                self.reply("220 stub ESMTP")
+                for line in self.rfile:
+                    verb = line.split(b" ", 1)[0].strip().upper()
+                    if verb == b"EHLO":
+                        self.reply("250-stub")
+                        self.reply("250-AUTH PLAIN")
+                        self.reply("250 8BITMIME")
+                    elif verb == b"AUTH":
+                        self.reply("235 2.7.0 Accepted")
+                    elif verb == b"DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        for data_line in self.rfile:
+                            if data_line == b".\r\n":
+                                break
+                        with stub._lock:
+                            stub.messages += 1
+                        self.reply("250 OK")
+                    elif verb == b"QUIT":
+                        self.reply("221 Bye")
+                        return
+                    elif verb in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                        self.reply("250 OK")
+                    else:
+                        self.reply("502 Command not implemented")
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
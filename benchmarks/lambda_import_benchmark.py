@@ -0,0 +1,160 @@
+"""
+Lambda cold start import benchmark.
+
+Runs fresh interpreters with `python -X importtime` to report what importing
+lambda_handler costs a cold container, which modules dominate it, and what the
+dependencies deferred to the first real invocation (scraper, PyMuPDF, Jinja2
+emailer) add on top. Also times a cold handler call that fails validation,
+which no longer loads any of them.
+
+Run from the repository root:
+
+    python benchmarks/lambda_import_benchmark.py [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+HANDLER_IMPORT = "import lambda_handler"
+DEFERRED_IMPORTS = (
+    "import lambda_handler; import fitz; "
+    "from app.managers.scraper import Scraper; "
+    "from app.managers.pdf_searcher import PDFSearcher; "
+    "from app.managers.outbox import outbox; "
+    "from app.utils.error_handler import ErrorHandler"
+)
+INVALID_INVOCATION = (
+    "import lambda_handler; lambda_handler.handler({'detail': {}}, None)"
+)
+
+
+def benchmark_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Settings are required at import time but unused here
+    for name in (
+        "AUTH_TOKEN",
+        "CASE_SEARCH_URL",
+        "CL_BASE_URL",
+        "CL_FORM_ACTION_URL",
+        "CL_JUDGE_WISE_REGULAR_URL",
+        "EMAIL_RECIPIENTS",
+        "PHHC_API_BASE_URL",
+        "SENDER_EMAIL",
+        "SENDER_PASSWORD",
+        "SENDER_NAME",
+    ):
+        env.setdefault(name, "benchmark")
+    # The warm-up makes network calls; measure the lazy path only
+    env["LAMBDA_INIT_WARMUP"] = "false"
+    env["PYTHONPATH"] = ROOT
+    return env
+
+
+def importtime(code: str) -> List[Tuple[int, int, int, str]]:
+    """Run code in a new interpreter; return (self us, cumulative us, depth, module)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=benchmark_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, module))
+    return rows
+
+
+def total_ms(rows: List[Tuple[int, int, int, str]], startup: Set[str]) -> float:
+    """Cumulative time of the top-level imports, leaving out interpreter startup."""
+    return (
+        sum(
+            cumulative
+            for _, cumulative, depth, module in rows
+            if depth == 0 and module not in startup
+        )
+        / 1000
+    )
+
+
+def direct_imports(
+    rows: List[Tuple[int, int, int, str]], parent: str
+) -> List[Tuple[int, int, int, str]]:
+    """Rows imported directly by a top-level module (listed before it)."""
+    children = []
+    for row in rows:
+        if row[2] == 1:
+            children.append(row)
+        elif row[2] == 0:
+            if row[3] == parent:
+                return children
+            children = []
+    return []
+
+
+def wall_ms(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=benchmark_env(),
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    startup = {module for _, _, _, module in importtime("pass")}
+    handler_totals, deferred_totals = [], []
+    for _ in range(args.runs):
+        handler_rows = importtime(HANDLER_IMPORT)
+        handler_totals.append(total_ms(handler_rows, startup))
+        deferred_totals.append(total_ms(importtime(DEFERRED_IMPORTS), startup))
+
+    print(f"Import time over {args.runs} cold interpreter(s), median\n")
+    handler_ms = statistics.median(handler_totals)
+    deferred_ms = statistics.median(deferred_totals)
+    print(f"{'import lambda_handler (init phase)':<42} {handler_ms:8.1f} ms")
+    print(f"{'+ deferred dependencies (first use)':<42} {deferred_ms:8.1f} ms")
+    print(f"{'  of which deferred':<42} {deferred_ms - handler_ms:8.1f} ms")
+
+    invalid = statistics.median(wall_ms(INVALID_INVOCATION) for _ in range(args.runs))
+    baseline = statistics.median(wall_ms("pass") for _ in range(args.runs))
+    print(
+        f"{'Invalid invocation, cold process':<42} {invalid:8.1f} ms"
+        f"   (interpreter start {baseline:.1f} ms)"
+    )
+
+    print("\nSlowest direct imports of lambda_handler (last run)\n")
+    direct = sorted(
+        direct_imports(handler_rows, "lambda_handler"), key=lambda row: -row[1]
+    )
+    for self_us, cumulative_us, _, module in direct[: args.top]:
+        print(
+            f"{module:<42} {cumulative_us / 1000:8.1f} ms"
+            f"   self {self_us / 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Offline end-to-end benchmark.
+
+Runs whole searches against local stand-ins for the court website, the PHHC
+API and the mail server (see fake_court.py): the cause list scrape, PDF
+downloads and text search, case details and email delivery. Two scenarios:
+
+    search  process_single_search, as the queue runs it in the Docker app
+    lambda  lambda_handler.handler with an EventBridge event
+
+With --cassette DIR the searches replay HTTP traffic recorded from the real
+sites with HTTP_CASSETTE_MODE=record (see app/utils/cassette.py) instead of
+using the fake server, so real pages, payloads and PDFs can be benchmarked
+offline. The app's URL settings, the date, terms and case details must then
+match the recording.
+
+Reports latency percentiles, throughput, CPU time and peak RSS per scenario.
+Each scenario runs in its own interpreter so their memory does not mix. Pass
+--json to save the numbers and --baseline to compare against a saved run;
+the exit status is 1 when a scenario got slower or bigger than --tolerance,
+so the benchmark can gate CI.
+
+The PDF searcher still waits 0.5-1 s before each download, as it does against
+the real site, so latency has that floor whatever the server latency.
+
+Run from the repository root:
+
+    python benchmarks/offline_benchmark.py [--scenario all] [--iterations 10]
+        [--pdfs 5] [--pages 20] [--latency 0.05] [--error-rate 0]
+        [--case-details] [--warm-cache] [--json out.json] [--baseline base.json]
+        [--cassette DIR --date DD/MM/YYYY --term TERM --case TYPE/NO/YEAR]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_court import CASE_DETAILS, SEARCH_TERM, FakeCourt, StubSMTP  # noqa: E402
+
+SCENARIOS = ("search", "lambda")
+RECIPIENT = "benchmark@example.com"
+# Compared against --baseline
+GATED_METRICS = ("p50_ms", "p90_ms", "cpu_ms_per_run", "peak_rss_mb")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def configure_app(
+    court: Optional[FakeCourt], smtp: StubSMTP, args: argparse.Namespace
+) -> None:
+    """Point the app's settings at the local servers; must run before importing it."""
+    os.environ.pop("AWS_LAMBDA_FUNCTION_NAME", None)
+    if court is not None:
+        os.environ.update(court.settings_env())
+    else:
+        os.environ.update(
+            {
+                "HTTP_CASSETTE_MODE": "replay",
+                "HTTP_CASSETTE_DIR": args.cassette,
+                "HTTP_CASSETTE_LATENCY_SCALE": str(args.replay_latency),
+            }
+        )
+    os.environ.update(smtp.settings_env())
+    os.environ.update(
+        {
+            "AUTH_TOKEN": "benchmark",
+            "EMAIL_RECIPIENTS": RECIPIENT,
+            "SENDER_EMAIL": "sender@example.com",
+            "SENDER_PASSWORD": "benchmark",
+            "SENDER_NAME": "Benchmark",
+            # Nothing journaled to disk, emails sent as soon as they are queued
+            "OUTBOX_DB_PATH": "",
+            "QUEUE_DB_PATH": "",
+            "OUTBOX_BATCH_WINDOW": "0",
+            "NOTIFY_MODE": "always",
+            "LAMBDA_INIT_WARMUP": "false",
+            "PDF_CACHE_DIR": tempfile.mkdtemp(prefix="offline-benchmark-"),
+            # Without --warm-cache every run downloads and parses every PDF
+            "PDF_CACHE_TTL": "1800" if args.warm_cache else "0",
+            # The app's log writer keeps the real stdout; quiet it at the source
+            "LOG_LEVEL": "INFO" if args.verbose else "WARNING",
+        }
+    )
+
+
+def search_runner(
+    date: str, terms: List[str], case_details: Optional[Dict[str, str]]
+) -> Callable[[], bool]:
+    import asyncio
+
+    from app.config import settings
+    from app.managers.outbox import outbox
+    from app.routes.search.cause_list.controllers import (
+        QueuedSearch,
+        process_single_search,
+    )
+
+    def run() -> bool:
+        queued = QueuedSearch(
+            search_terms=list(terms),
+            date=date,
+            recipient_emails=[RECIPIENT],
+            case_details=dict(case_details) if case_details else None,
+        )
+        success = asyncio.run(process_single_search(queued))
+        return outbox.flush(settings.OUTBOX_FLUSH_TIMEOUT) and success
+
+    return run
+
+
+def lambda_runner(
+    date: str, terms: List[str], case_details: Optional[Dict[str, str]]
+) -> Callable[[], bool]:
+    import lambda_handler
+
+    detail: Dict[str, Any] = {
+        "search_terms": list(terms),
+        "recipient_emails": [RECIPIENT],
+        "date": date,
+    }
+    if case_details:
+        detail["case_details"] = dict(case_details)
+
+    def run() -> bool:
+        response = lambda_handler.handler({"detail": detail}, None)
+        return response["statusCode"] == 200
+
+    return run
+
+
+def server_counts(court: Optional[FakeCourt]) -> Tuple[int, int]:
+    """Requests and errors served so far; replayed requests are not counted."""
+    if court is None:
+        return 0, 0
+    return sum(court.requests.values()), court.errors
+
+
+def run_scenario(args: argparse.Namespace) -> Dict[str, Any]:
+    court = None
+    if not args.cassette:
+        court = FakeCourt(
+            pdfs=args.pdfs,
+            pages=args.pages,
+            latency=args.latency,
+            error_rate=args.error_rate,
+        ).start()
+    smtp = StubSMTP().start()
+    configure_app(court, smtp, args)
+
+    from app.managers.pdf_tracker import pdf_tracker
+    from app.managers.result_tracker import result_tracker
+
+    date = args.date or time.strftime("%d/%m/%Y", time.localtime(time.time() + 86400))
+    case_details = CASE_DETAILS if args.case_details else None
+    if args.case:
+        case_type, case_no, case_year = args.case.split("/")
+        case_details = {"type": case_type, "no": case_no, "year": case_year}
+    runners = {"search": search_runner, "lambda": lambda_runner}
+    run = runners[args.scenario](date, args.term or [SEARCH_TERM], case_details)
+
+    latencies, failures = [], 0
+    output = sys.stdout if args.verbose else open(os.devnull, "w")
+    with contextlib.redirect_stdout(output):
+        for iteration in range(args.warmup + args.iterations):
+            # Every run should see the cause lists as new
+            pdf_tracker.clear_existing_pdfs()
+            result_tracker.clear()
+            if iteration == args.warmup:
+                usage_start = resource.getrusage(resource.RUSAGE_SELF)
+                wall_start = time.perf_counter()
+                requests_start, errors_start = server_counts(court)
+                emails_start = smtp.messages
+            start = time.perf_counter()
+            success = run()
+            if iteration >= args.warmup:
+                latencies.append(time.perf_counter() - start)
+                failures += not success
+        wall = time.perf_counter() - wall_start
+        usage_end = resource.getrusage(resource.RUSAGE_SELF)
+        requests_end, errors_end = server_counts(court)
+
+    cpu = (usage_end.ru_utime - usage_start.ru_utime) + (
+        usage_end.ru_stime - usage_start.ru_stime
+    )
+    if court is not None:
+        court.stop()
+    smtp.stop()
+    return {
+        "scenario": args.scenario,
+        "runs": len(latencies),
+        "failures": failures,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p90_ms": percentile(latencies, 0.90) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "runs_per_min": len(latencies) / wall * 60,
+        "cpu_ms_per_run": cpu / len(latencies) * 1000,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": usage_end.ru_maxrss / 1024,
+        "server_requests": requests_end - requests_start,
+        "server_errors": errors_end - errors_start,
+        "emails": smtp.messages - emails_start,
+    }
+
+
+def run_in_subprocess(args: argparse.Namespace, scenario: str) -> Dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix=".json") as result_file:
+        command = [sys.executable, os.path.abspath(__file__), "--scenario", scenario]
+        for name in (
+            "iterations",
+            "warmup",
+            "pdfs",
+            "pages",
+            "latency",
+            "error_rate",
+            "cassette",
+            "replay_latency",
+            "date",
+            "case",
+        ):
+            if getattr(args, name) is not None:
+                command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+        for term in args.term or []:
+            command += ["--term", term]
+        for flag in ("case_details", "warm_cache", "verbose"):
+            if getattr(args, flag):
+                command.append(f"--{flag.replace('_', '-')}")
+        command += ["--json", result_file.name, "--child"]
+        subprocess.run(command, cwd=ROOT, check=True)
+        with open(result_file.name) as f:
+            return json.load(f)[scenario]
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    columns = (
+        ("runs", "runs", "{:.0f}"),
+        ("failures", "failed", "{:.0f}"),
+        ("p50_ms", "p50 ms", "{:.0f}"),
+        ("p90_ms", "p90 ms", "{:.0f}"),
+        ("p99_ms", "p99 ms", "{:.0f}"),
+        ("runs_per_min", "runs/min", "{:.1f}"),
+        ("cpu_ms_per_run", "CPU ms/run", "{:.0f}"),
+        ("peak_rss_mb", "peak RSS MB", "{:.1f}"),
+        ("server_requests", "requests", "{:.0f}"),
+        ("emails", "emails", "{:.0f}"),
+    )
+    print(f"{'scenario':<10}" + "".join(f"{label:>12}" for _, label, _ in columns))
+    for scenario, result in results.items():
+        cells = "".join(f"{fmt.format(result[key]):>12}" for key, _, fmt in columns)
+        print(f"{scenario:<10}{cells}")
+
+
+def regressions(
+    results: Dict[str, Dict[str, Any]], baseline_path: str, tolerance: float
+) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    found = []
+    for scenario, result in results.items():
+        if scenario not in baseline:
+            continue
+        for metric in GATED_METRICS:
+            before, after = baseline[scenario][metric], result[metric]
+            if before > 0 and after > before * (1 + tolerance):
+                found.append(
+                    f"{scenario} {metric}: {before:.1f} -> {after:.1f} "
+                    f"(+{(after / before - 1) * 100:.0f}%)"
+                )
+        if result["failures"] > baseline[scenario]["failures"]:
+            found.append(
+                f"{scenario} failures: {baseline[scenario]['failures']} -> "
+                f"{result['failures']}"
+            )
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured runs")
+    parser.add_argument("--pdfs", type=int, default=5, help="cause lists per date")
+    parser.add_argument("--pages", type=int, default=20, help="pages per PDF")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="server seconds per request"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of requests given a 503"
+    )
+    parser.add_argument("--case-details", action="store_true")
+    parser.add_argument(
+        "--warm-cache", action="store_true", help="keep the PDF cache between runs"
+    )
+    parser.add_argument("--cassette", help="replay this recorded HTTP cassette")
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=1.0,
+        help="multiple of recorded response times to wait; 0 for none",
+    )
+    parser.add_argument("--date", help="cause list date, DD/MM/YYYY")
+    parser.add_argument("--term", action="append", help="search term (repeatable)")
+    parser.add_argument("--case", help="case details as TYPE/NO/YEAR")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%"
+    )
+    parser.add_argument("--verbose", action="store_true", help="show app output")
+    # Set on the per-scenario interpreters started for --scenario all
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario == "all":
+        results = {
+            scenario: run_in_subprocess(args, scenario) for scenario in SCENARIOS
+        }
+    else:
+        results = {args.scenario: run_scenario(args)}
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.child:
+        return
+
+    if args.cassette:
+        source = (
+            f"Replaying {args.cassette} at {args.replay_latency:g}x recorded latency"
+        )
+    else:
+        source = (
+            f"{args.pdfs} PDF(s) x {args.pages} page(s), {args.latency * 1000:.0f} ms "
+            f"server latency, {args.error_rate:.0%} errors"
+        )
+    case_details = "with" if args.case_details or args.case else "without"
+    print(
+        f"{source}, {case_details} case details, "
+        f"{'warm' if args.warm_cache else 'cold'} PDF cache\n"
+    )
+    print_report(results)
+
+    if args.baseline:
+        found = regressions(results, args.baseline, args.tolerance)
+        if found:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
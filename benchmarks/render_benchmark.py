@@ -0,0 +1,132 @@
+"""
+Email render benchmark.
+
+Compares rendering the cause list email for a large result set through a
+fresh Jinja Environment per email (how Emailer used to work), through the
+shared compiled environment, and loading the template in a new environment
+from the on-disk bytecode cache (a new process or Lambda container).
+
+Run from the repository root:
+
+    python benchmarks/render_benchmark.py [--hits 500] [--runs 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are required at import time but unused for rendering
+for name in (
+    "AUTH_TOKEN",
+    "CASE_SEARCH_URL",
+    "CL_BASE_URL",
+    "CL_FORM_ACTION_URL",
+    "CL_JUDGE_WISE_REGULAR_URL",
+    "EMAIL_RECIPIENTS",
+    "PHHC_API_BASE_URL",
+    "SENDER_EMAIL",
+    "SENDER_PASSWORD",
+    "SENDER_NAME",
+):
+    os.environ.setdefault(name, "benchmark")
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader  # noqa: E402
+
+from app.services.emailer import TEMPLATES_DIR, Emailer, template_env  # noqa: E402
+
+TEMPLATE_NAME = "cause_list_template.html"
+
+
+def build_context(hits: int) -> dict:
+    terms = ["CWP-12345-2023", "State of Punjab", "Criminal Appeal 789"]
+    pdfs = [
+        {
+            "pdf_name": f"Cause List {i} | {'Main' if i % 2 else 'Sup'}",
+            "pdf_url": f"https://example.com/cl/{i}.pdf",
+            "num_pages": 40 + i % 60,
+        }
+        for i in range(max(1, hits // 3))
+    ]
+    results = [
+        {
+            **pdfs[i % len(pdfs)],
+            "found_pages": {
+                term: [(i * 7 + j) % 90 + 1 for j in range(i % 5)] for term in terms
+            },
+        }
+        for i in range(hits)
+    ]
+    return {
+        "search_terms": terms,
+        "date": "15/12/2024",
+        "results": results,
+        "pdfs": pdfs,
+        "existing_pdfs": pdfs[: len(pdfs) // 2],
+        "new_pdfs": pdfs[len(pdfs) // 2 :],
+        "case_details_html": "<table><tr><td>Case</td></tr></table>",
+        "term_found_in_regular_cause_list": "",
+        "urls": {
+            "cl_base_url": "https://example.com",
+            "case_search_url": "https://example.com",
+            "cl_judge_wise_regular_url": "https://example.com",
+            "case_status_url": "https://example.com",
+        },
+    }
+
+
+def measure(label: str, render, runs: int) -> None:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{label:<34} median {statistics.median(timings):8.2f} ms"
+        f"   min {min(timings):8.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hits", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    context = build_context(args.hits)
+    print(f"Rendering {TEMPLATE_NAME} with {args.hits} hits, {args.runs} runs\n")
+
+    def per_email_environment():
+        env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+        env.get_template(TEMPLATE_NAME).render(context)
+
+    def bytecode_cached_environment():
+        env = Environment(
+            loader=FileSystemLoader(TEMPLATES_DIR),
+            autoescape=True,
+            bytecode_cache=FileSystemBytecodeCache(
+                template_env.bytecode_cache.directory
+            ),
+        )
+        env.get_template(TEMPLATE_NAME).render(context)
+
+    emailer = Emailer()
+    measure("New environment per email", per_email_environment, args.runs)
+    if template_env.bytecode_cache is not None:
+        # Make sure the cache is populated before timing cold loads from it
+        template_env.get_template(TEMPLATE_NAME)
+        measure(
+            "New environment, bytecode cache", bytecode_cached_environment, args.runs
+        )
+    measure(
+        "Shared environment (Emailer)",
+        lambda: emailer.render(TEMPLATE_NAME, context),
+        args.runs,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,28 +9,83 @@ Environment variables (set in Lambda configuration):
     CASE_SEARCH_URL, CL_BASE_URL, CL_FORM_ACTION_URL,
     CL_JUDGE_WISE_REGULAR_URL, EMAIL_RECIPIENTS, PHHC_API_BASE_URL,
     SENDER_EMAIL, SENDER_PASSWORD, SENDER_NAME, SMTP_SERVER, SMTP_PORT
+    LAMBDA_INIT_WARMUP (optional): "true" to load dependencies, templates and
+        the judges list during the container's init phase
+
+The scraper, PDF searcher (PyMuPDF) and emailer (Jinja2) are imported on first
+use, so an invocation rejected by validation does not pay for them.
 
 EventBridge rule input (JSON) — passed as event["detail"]:
     {
         "search_terms": ["<search term 1>", "<search term 2>"],
         "recipient_emails": ["user@example.com"],          // optional, falls back to EMAIL_RECIPIENTS
-        "case_details": {"type": "<type>", "no": "<no>", "year": "<year>"}  // optional
+        "case_details": {"type": "<type>", "no": "<no>", "year": "<year>"},  // optional
+        "date": "DD/MM/YYYY",                               // optional, defaults to tomorrow (IST)
+        "digest": true,                                     // optional, one email for all dates
+        "notify_mode": "on_change"                          // optional, skip emails when results are unchanged
     }
+
+Several search configs can share one invocation (one scrape and one PDF
+search per date for all of them, one email per config):
+    {
+        "date": "DD/MM/YYYY",                               // optional, default for every config
+        "configs": [{<search config as above>}, ...]
+    }
+The response body then reports each config's per-date results under "configs".
 """
 
 import json
 import re
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 from app.config import settings
-from app.managers.pdf_searcher import PDFSearcher
-from app.managers.scraper import Scraper
-from app.services.emailer import Emailer
-from app.utils.error_handler import ErrorHandler
+from app.managers.pdf_tracker import pdf_tracker
+from app.managers.result_tracker import NOTIFY_ON_CHANGE, result_fingerprint, result_tracker, search_key
+from app.utils.budget import TaskBudget, use_budget
 from app.utils.helpers import get_weekend_dates
+from app.utils.log import get_logger, lazy_json
+from app.utils.metrics import span
+from app.utils.reuse import reuse_stats
+
+logger = get_logger("lambda_handler")
 
 IST = timezone(timedelta(hours=5, minutes=30))
+# Lambda stops an init phase after 10 seconds; leave the warm-up well inside it
+WARMUP_BUDGET_SECONDS = 5.0
+
+# Kept by a warm container between invocations
+_invocations = 0
+_scraper = None
+
+
+def _warm_up():
+    """Do the first invocation's one-off work during the init phase."""
+    import ssl
+
+    import certifi
+    import fitz  # noqa: F401
+
+    from app.managers.outbox import outbox  # noqa: F401
+    from app.managers.pdf_searcher import PDFSearcher  # noqa: F401
+    from app.managers.scraper import Scraper
+    from app.services.emailer import precompile_templates
+
+    precompile_templates()
+    # Loads OpenSSL and reads the CA bundle the scraper verifies against
+    ssl.create_default_context(cafile=certifi.where())
+    # Caches the active judges list for JUDGE_CACHE_TTL seconds
+    with use_budget(TaskBudget(deadline=time.time() + WARMUP_BUDGET_SECONDS)):
+        Scraper()._fetch_active_judges()
+
+
+if settings.LAMBDA_INIT_WARMUP:
+    try:
+        _warm_up()
+    except Exception as e:
+        logger.warning("Init warm-up failed: %s", e)
 
 
 def _redact_email(email: str) -> str:
@@ -68,83 +123,305 @@ def _build_context(
     }
 
 
-def process_date(scraper, searcher, emailer, error_handler, search_terms, date, recipients, case_details):
+def search_date(scraper, search_terms, date):
+    """Scrape the cause lists for one date and search them for every config's terms."""
+    from app.managers.pdf_searcher import PDFSearcher
+
+    with span("cause_list_scrape", date=date) as fields:
+        pdfs = scraper.fetch_cause_list_pdfs(date)
+        fields["pdfs"] = len(pdfs)
+    if not pdfs:
+        logger.warning("No Cause Lists found for %s", date)
+        return {"pdfs": pdfs, "results": []}
+
+    logger.info("%s Cause List(s) found for %s", len(pdfs), date)
+    with span("pdf_search", date=date, pdfs=len(pdfs)) as fields:
+        results = PDFSearcher(search_terms=search_terms).search_pdf(pdfs)
+        fields["results"] = len(results)
+    logger.info("Search complete for %s: %s result(s)", date, len(results))
+    return {"pdfs": pdfs, "results": results}
+
+
+def fetch_case_bundle(scraper, case_details):
+    with span("case_bundle"):
+        return scraper.fetch_case_bundle(case_details)
+
+
+def case_result_for_date(scraper, case_bundle, search_terms, date):
+    """Judge cause list details for one date, from a future for the shared case fetch."""
+    bundle = case_bundle.result()
+    if bundle is None:
+        return None
+    with span("case_details", date=date):
+        return scraper.case_result_for_date(bundle, search_terms, date)
+
+
+def narrow_search(search_terms, date_search, case_result):
+    """
+    Narrow a date's shared search (futures from search_date and
+    case_result_for_date) down to one config's terms, and split its PDFs into
+    new and already seen ones.
+    """
+    from app.managers.pdf_searcher import PDFSearcher
+
+    searched = date_search.result()
+    existing_pdfs, new_pdfs = pdf_tracker.separate_existing_and_new_pdfs(searched["pdfs"], search_terms)
+    return {
+        "existing_pdfs": existing_pdfs,
+        "new_pdfs": new_pdfs,
+        "results": PDFSearcher.filter_results(searched["results"], search_terms),
+        "case_result": case_result.result() if case_result is not None else None,
+    }
+
+
+def _context_for(search_terms, date, searched):
+    case_details_html, term_found_in_regular_cause_list, case_status_url = (
+        searched["case_result"] if searched["case_result"] is not None else (None, "", "")
+    )
+    return _build_context(
+        search_terms, date, searched["existing_pdfs"], searched["new_pdfs"], searched["results"],
+        case_details_html, term_found_in_regular_cause_list, case_status_url,
+    )
+
+
+def _fingerprint_for(searched, recipients):
+    return result_fingerprint(
+        searched["existing_pdfs"] + searched["new_pdfs"], searched["results"],
+        searched["case_result"], recipients,
+    )
+
+
+def process_date(outbox, error_handler, search_terms, date, recipients, case_details, notify_mode, search):
+    """Wait for one date's search ((date_search, case_result) futures) and queue its email."""
     try:
-        existing_pdfs, new_pdfs = scraper.parse_table_and_download_pdfs(date, search_terms)
-        pdfs = existing_pdfs + new_pdfs
+        searched = narrow_search(search_terms, *search)
 
-        case_result = scraper.get_case_details_and_judge_details(case_details, search_terms, date)
-        case_details_html, term_found_in_regular_cause_list, case_status_url = (
-            case_result if case_result is not None else (None, "", "")
-        )
+        key = search_key(search_terms, date, case_details)
+        fingerprint = _fingerprint_for(searched, recipients)
+        if notify_mode == NOTIFY_ON_CHANGE and not result_tracker.has_changed(key, fingerprint):
+            logger.info("No changes for %s since the last email", date)
+            return True
 
-        if not pdfs:
-            results = []
-            print(f"ALERT! No Cause Lists found for {date}")
-        else:
-            print(f"PROGRESS! {len(pdfs)} Cause List(s) found for {date}")
-            results = searcher.search_pdf(pdfs)
-            print(f"PROGRESS! Search complete for {date}: {len(results)} result(s)")
-
-        context = _build_context(
-            search_terms, date, existing_pdfs, new_pdfs, results,
-            case_details_html, term_found_in_regular_cause_list, case_status_url,
-        )
-        emailer.send_email(
+        outbox.send_email(
             recipients=recipients,
             subject=f"Cause List Search Results for {search_terms} on {date}",
             template_name="cause_list_template.html",
-            context=context,
+            context=_context_for(search_terms, date, searched),
         )
-        print(f"SUCCESS! Email sent for {date}")
+        result_tracker.record(key, date, fingerprint)
+        logger.info("Email queued for %s", date)
         return True
 
     except Exception as e:
         error_handler.handle_exception(e, {"search_terms": search_terms, "date": date})
-        print(f"ERROR! Failed for {date}: {e}")
+        logger.error("Failed for %s: %s", date, e)
         traceback.print_exc()
         return False
 
 
+def process_digest(outbox, error_handler, search_terms, dates, recipients, case_details, notify_mode, searches):
+    """Wait for every date's search and send them as a single email."""
+    try:
+        searched_days = [narrow_search(search_terms, *search) for search in searches]
+        days = [
+            _context_for(search_terms, date, searched)
+            for date, searched in zip(dates, searched_days)
+        ]
+        fingerprints = [_fingerprint_for(searched, recipients) for searched in searched_days]
+
+        keys = [search_key(search_terms, date, case_details) for date in dates]
+        if notify_mode == NOTIFY_ON_CHANGE and not any(
+            result_tracker.has_changed(key, fingerprint) for key, fingerprint in zip(keys, fingerprints)
+        ):
+            logger.info("No changes for %s since the last email", ', '.join(dates))
+            return True
+
+        outbox.send_email(
+            recipients=recipients,
+            subject=f"Cause List Search Results for {search_terms} on {', '.join(dates)}",
+            template_name="digest_template.html",
+            context={
+                "search_terms": search_terms,
+                "dates": dates,
+                "days": days,
+                "case_details_html": days[0]["case_details_html"],
+                "urls": days[0]["urls"],
+            },
+        )
+        for key, date, fingerprint in zip(keys, dates, fingerprints):
+            result_tracker.record(key, date, fingerprint)
+        logger.info("Digest email queued for %s", ', '.join(dates))
+        return True
+
+    except Exception as e:
+        error_handler.handle_exception(e, {"search_terms": search_terms, "date": ", ".join(dates)})
+        logger.error("Digest failed for %s: %s", ', '.join(dates), e)
+        traceback.print_exc()
+        return False
+
+
+def _parse_config(config, default_date):
+    """Normalise one search config, or return {"error": ...} if it is invalid."""
+    search_terms = config.get("search_terms") if isinstance(config, dict) else None
+    if not search_terms:
+        return {"error": "search_terms is required"}
+    try:
+        dates = get_weekend_dates(config.get("date") or default_date)
+    except (TypeError, ValueError):
+        return {"error": "date must be in DD/MM/YYYY format"}
+    return {
+        "search_terms": search_terms,
+        "case_details": config.get("case_details"),
+        "recipients": config.get("recipient_emails") or settings.EMAIL_RECIPIENTS.split(","),
+        "notify_mode": config.get("notify_mode") or settings.NOTIFY_MODE,
+        "digest": bool(config.get("digest")),
+        "dates": dates,
+    }
+
+
+def _get_scraper():
+    global _scraper
+    if _scraper is None:
+        from app.managers.scraper import Scraper
+
+        _scraper = Scraper()
+    return _scraper
+
+
 def handler(event, context):
     """AWS Lambda entry point. Accepts EventBridge events and Function URL requests."""
+    global _invocations
+    _invocations += 1
+    reuse_stats.reset()
+
     if "body" in event:
         detail = json.loads(event["body"])
     else:
         detail = event.get("detail", event)
 
-    search_terms = detail.get("search_terms", [])
-    if not search_terms:
-        return {"statusCode": 400, "body": "search_terms is required"}
+    batch = "configs" in detail
+    raw_configs = detail["configs"] if batch else [detail]
+    if not isinstance(raw_configs, list) or not raw_configs:
+        return {"statusCode": 400, "body": "configs must be a non-empty list"}
 
-    case_details = detail.get("case_details")
-    recipients = detail.get("recipient_emails") or settings.EMAIL_RECIPIENTS.split(",")
+    default_date = detail.get("date") or (datetime.now(IST) + timedelta(days=1)).strftime("%d/%m/%Y")
+    configs = [_parse_config(config, default_date) for config in raw_configs]
+    valid_configs = [config for config in configs if "error" not in config]
+    if not valid_configs:
+        return {"statusCode": 400, "body": configs[0]["error"]}
 
-    target_date = detail.get("date") or (datetime.now(IST) + timedelta(days=1)).strftime("%d/%m/%Y")
-    dates_to_process = get_weekend_dates(target_date)
+    for index, config in enumerate(configs):
+        prefix = f"Config {index}: " if batch else ""
+        if "error" in config:
+            logger.warning("%s%s, skipping", prefix, config["error"])
+            continue
+        logger.info("%sSearch terms: %s", prefix, config['search_terms'])
+        logger.info("%sCase details: %s", prefix, config['case_details'])
+        logger.info("%sRecipients: %s", prefix, [_redact_email(e) for e in config['recipients']])
+        logger.info("%sDates to process: %s", prefix, config['dates'])
 
-    print(f"Search terms: {search_terms}")
-    print(f"Case details: {case_details}")
-    print(f"Recipients: {[_redact_email(e) for e in recipients]}")
-    print(f"Dates to process: {dates_to_process}")
+    from app.managers.outbox import outbox
+    from app.utils.error_handler import ErrorHandler
 
-    scraper = Scraper()
-    searcher = PDFSearcher(search_terms=search_terms)
-    emailer = Emailer()
-    error_handler = ErrorHandler(emailer, recipients)
+    scraper = _get_scraper()
 
-    results_summary = []
-    for date in dates_to_process:
-        success = process_date(
-            scraper, searcher, emailer, error_handler,
-            search_terms, date, recipients, case_details,
-        )
-        results_summary.append({"date": date, "success": success})
+    # Each date is scraped and searched once, for the terms of every config
+    # that covers it
+    all_dates = list(dict.fromkeys(date for config in valid_configs for date in config["dates"]))
+    terms_by_date = {
+        date: list(dict.fromkeys(
+            term for config in valid_configs if date in config["dates"] for term in config["search_terms"]
+        ))
+        for date in all_dates
+    }
+
+    # Dates are scraped and searched concurrently, alongside one case details
+    # fetch per case; emails are queued in config and date order. Tasks only
+    # wait on tasks submitted before them, so a small pool cannot deadlock.
+    config_results = []
+    with ThreadPoolExecutor(max_workers=max(1, settings.LAMBDA_MAX_WORKERS)) as executor:
+        case_bundles = {}
+        for config in valid_configs:
+            if config["case_details"]:
+                case_key = json.dumps(config["case_details"], sort_keys=True)
+                if case_key not in case_bundles:
+                    case_bundles[case_key] = executor.submit(fetch_case_bundle, scraper, config["case_details"])
+        date_searches = {
+            date: executor.submit(search_date, scraper, terms_by_date[date], date)
+            for date in all_dates
+        }
+
+        config_searches = []
+        for config in configs:
+            if "error" in config:
+                config_searches.append(None)
+                continue
+            case_bundle = (
+                case_bundles[json.dumps(config["case_details"], sort_keys=True)]
+                if config["case_details"] else None
+            )
+            config_searches.append([
+                (
+                    date_searches[date],
+                    executor.submit(case_result_for_date, scraper, case_bundle, config["search_terms"], date)
+                    if case_bundle is not None else None,
+                )
+                for date in config["dates"]
+            ])
+
+        for config, searches in zip(configs, config_searches):
+            if "error" in config:
+                config_results.append(None)
+                continue
+            error_handler = ErrorHandler(outbox, config["recipients"])
+            if config["digest"] and len(config["dates"]) > 1:
+                success = process_digest(
+                    outbox, error_handler,
+                    config["search_terms"], config["dates"], config["recipients"],
+                    config["case_details"], config["notify_mode"], searches,
+                )
+                config_results.append([{"date": date, "success": success} for date in config["dates"]])
+            else:
+                config_results.append([
+                    {
+                        "date": date,
+                        "success": process_date(
+                            outbox, error_handler,
+                            config["search_terms"], date, config["recipients"],
+                            config["case_details"], config["notify_mode"], search,
+                        ),
+                    }
+                    for date, search in zip(config["dates"], searches)
+                ])
+
+    # The container may be frozen once we return, so deliver queued emails now
+    if not outbox.flush(settings.OUTBOX_FLUSH_TIMEOUT):
+        logger.warning("%s email(s) could not be delivered", outbox.get_status()['pending'])
+
+    # What this invocation got from earlier ones in the same container
+    reuse = {"invocation": _invocations, **reuse_stats.snapshot()}
+    logger.info("Reuse: %s", lazy_json(reuse, indent=None), extra={"event": "reuse"})
+
+    if not batch:
+        return {
+            "statusCode": 200,
+            "body": json.dumps({
+                "message": f"Processed {len(valid_configs[0]['dates'])} date(s)",
+                "results": config_results[0],
+                "reuse": reuse,
+            }),
+        }
 
     return {
         "statusCode": 200,
         "body": json.dumps({
-            "message": f"Processed {len(dates_to_process)} date(s)",
-            "results": results_summary,
+            "message": f"Processed {len(valid_configs)} of {len(configs)} config(s) over {len(all_dates)} date(s)",
+            "configs": [
+                {"search_terms": config["search_terms"], "results": results}
+                if "error" not in config
+                else {"error": config["error"]}
+                for config, results in zip(configs, config_results)
+            ],
+            "reuse": reuse,
         }),
     }